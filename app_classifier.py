@@ -0,0 +1,121 @@
+import re
+from metrics import metrics
+
+# Sites that are tracked through a browser's cmdline rather than a process name
+SITE_DOMAINS = {
+    "YouTube": ["youtube.com"],
+    "Netflix": ["netflix.com"],
+    "Amazon Prime": ["primevideo.com"],
+    "Twitch": ["twitch.tv"],
+    "Instagram": ["instagram.com"],
+    "Twitter": ["twitter.com"],
+    "Facebook": ["facebook.com"]
+}
+
+DOMAIN_PATTERN = re.compile(r"^[a-z0-9-]+(\.[a-z0-9-]+)+$")
+
+
+class AppClassifier:
+    """Rule-driven process classifier compiled into combined regexes"""
+
+    def __init__(self, max_cache_size=4096):
+        self.max_cache_size = max_cache_size
+        self.signature = None
+        self.version = 0
+        self.name_rules = {}  # process name keyword -> (process_name, app_name)
+        self.site_rules = {}  # domain -> (process_name, app_name)
+        self.name_pattern = None
+        self.site_pattern = None
+        self.cache = {}
+        self.match_sites = True  # Off when site time comes from browser history instead
+
+    def update_rules(self, tracked_apps, user_apps=()):
+        """Rebuild the patterns if the tracked app set changed"""
+        signature = (tuple(sorted(tracked_apps.items())), frozenset(user_apps))
+        if signature == self.signature:
+            return False
+
+        name_rules = {}
+        site_rules = {}
+        known_apps = set()
+
+        for key, app_name in tracked_apps.items():
+            known_apps.add(app_name)
+            if app_name in SITE_DOMAINS:
+                for domain in SITE_DOMAINS[app_name]:
+                    site_rules[domain] = (key, app_name)
+            else:
+                name_rules[key.lower()] = (key, app_name)
+
+        for app_name in user_apps:
+            if app_name in known_apps:
+                continue
+            key = app_name.lower().replace(" ", "")
+            if not key:
+                continue
+            if app_name in SITE_DOMAINS:
+                for domain in SITE_DOMAINS[app_name]:
+                    site_rules.setdefault(domain, (key, app_name))
+            elif DOMAIN_PATTERN.match(key):
+                site_rules.setdefault(key, (key, app_name))
+            else:
+                name_rules.setdefault(key, (key, app_name))
+
+        self.name_rules = name_rules
+        self.site_rules = site_rules
+        self.name_pattern = self._compile(name_rules)
+        self.site_pattern = self._compile(site_rules)
+        self.cache.clear()
+        self.signature = signature
+        self.version += 1
+        return True
+
+    def _compile(self, rules):
+        if not rules:
+            return None
+        # Longest first so e.g. "msedgewebview" wins over "msedge" at the same offset
+        keywords = sorted(rules, key=len, reverse=True)
+        return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+    @staticmethod
+    def search_longest(pattern, text):
+        """The longest keyword anywhere in text, or None
+
+        Plain alternation takes the leftmost match, which would let a short
+        keyword such as "go" claim "google-chrome" before "chrome" is tried.
+        """
+        best = None
+        match = pattern.search(text)
+        while match:
+            if best is None or len(match.group(0)) > len(best):
+                best = match.group(0)
+            # Restart one past the match's start, since a longer keyword may overlap it
+            match = pattern.search(text, match.start() + 1)
+        return best
+
+    def classify(self, process_name, cmdline):
+        """Return (process_name, app_name) for a process, or None"""
+        key = (process_name, hash(tuple(cmdline)))
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        with metrics.timer("classify_seconds"):
+            result = None
+            # Site matches in the cmdline take priority over the process name
+            if self.match_sites and self.site_pattern and cmdline:
+                args = "\0".join(arg for arg in cmdline if isinstance(arg, str)).lower()
+                match = self.search_longest(self.site_pattern, args)
+                if match:
+                    result = self.site_rules[match]
+
+            if result is None and self.name_pattern:
+                match = self.search_longest(self.name_pattern, process_name.lower())
+                if match:
+                    result = self.name_rules[match]
+
+        if len(self.cache) >= self.max_cache_size:
+            self.cache.clear()
+        self.cache[key] = result
+        return result
@@ -1,15 +1,42 @@
-import tkinter as tk
-from tkinter import ttk
-import json
-from datetime import datetime, timedelta
+import time
+STARTUP_T0 = time.perf_counter()
+
+import argparse
+import queue
 import threading
-from usage_monitor import UsageMonitor
-from data_manager import DataManager
-from notification_system import NotificationSystem
-from ui_components import StatsFrame, SettingsFrame, CustomStyle
+from retention import RetentionEngine
+from usage_monitor import TRACKED_APPS, UsageMonitor
+from data_manager import DEFAULT_DATA_FILE, DataFileLock, DataManager
+from metrics import metrics, SamplingProfiler
+from notification_system import NotificationSystem, ConsoleNotificationSystem, create_backend
+from tracker_service import TrackerService, default_socket_path, service_running
 
-class AppTracker:
+class StartupTimer:
+    """Checkpoints relative to process start, reported by --startup-timing"""
     def __init__(self):
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - STARTUP_T0))
+
+    def report(self):
+        print("Startup timings:")
+        for name, elapsed in self.marks:
+            print(f"  {elapsed * 1000:8.1f} ms  {name}")
+
+class AppTracker:
+    def __init__(self, data_manager=None, timer=None, sync_dir=None, data_file=DEFAULT_DATA_FILE):
+        self.timer = timer
+        self.sync_dir = sync_dir
+        self.data_file = data_file
+        self.mark("core imports")
+
+        # GUI modules are imported here so --headless never loads tkinter or matplotlib
+        import tkinter as tk
+        from tkinter import ttk
+        from ui_components import CustomStyle
+        self.mark("gui imports")
+
         self.root = tk.Tk()
         self.root.title("🎮 Digital Wellness Trainer")  # Gamified title
         self.root.geometry("900x700")
@@ -24,34 +51,123 @@ class AppTracker:
         except:
             pass  # Icon loading is optional
 
-        # Initialize components
-        self.data_manager = DataManager()
+        self.data_manager = None
+        self.file_lock = None
+        self.usage_monitor = None
+        self.usage_sync = None
+        self.retention = None
+        # Notifications are queued by the monitor and shown from the Tk thread
         self.notification_system = NotificationSystem()
-        self.usage_monitor = UsageMonitor(self.data_manager, self.notification_system)
+        self.notification_system.attach(self.root)
 
         # Create main container with padding
         self.main_container = ttk.Frame(self.root, padding="10", style="Main.TFrame")
         self.main_container.pack(expand=True, fill='both')
 
+        # Shown until the data has loaded, so the window can paint right away
+        self.loading_label = ttk.Label(self.main_container,
+                                       text="⏳ Loading your progress...",
+                                       style="Title.TLabel")
+        self.loading_label.pack(expand=True)
+        self.root.bind("<Map>", self.on_map, add="+")
+        self.mark("window built")
+
+        # Load data off the UI thread; a remote data manager means a headless
+        # tracker service is already monitoring, so the UI is only a client
+        self.loaded = queue.Queue()
+        threading.Thread(target=self.load_data, args=(data_manager,), daemon=True).start()
+        self.root.after(20, self.poll_loaded)
+
+    def mark(self, name):
+        if self.timer:
+            self.timer.mark(name)
+
+    def on_map(self, event):
+        if event.widget is self.root:
+            self.root.unbind("<Map>")
+            self.mark("first paint")
+
+    def load_data(self, data_manager):
+        """Runs on a worker thread: open the data store"""
+        try:
+            if data_manager is None:
+                self.file_lock = DataFileLock(self.data_file).acquire()
+                data_manager, local = DataManager(self.data_file), True
+            else:
+                local = False
+            self.loaded.put((data_manager, local, None))
+        except Exception as e:
+            self.loaded.put((None, False, e))
+
+    def poll_loaded(self):
+        """Wait on the Tk thread for load_data to finish"""
+        try:
+            data_manager, local, error = self.loaded.get_nowait()
+        except queue.Empty:
+            self.root.after(20, self.poll_loaded)
+            return
+        if error:
+            # Raising here would only print a traceback from the Tk callback
+            print(f"Error loading data: {error!r}")
+            self.loading_label.configure(text=f"❌ Couldn't load your progress:\n{error}",
+                                         wraplength=700, justify='center')
+            return
+        self.mark("data loaded")
+        self.setup_tabs(data_manager, local)
+
+    def setup_tabs(self, data_manager, local):
+        """Build the tabs and start monitoring once data is available"""
+        from tkinter import ttk
+        from ui_components import StatsFrame, SettingsFrame
+
+        self.data_manager = data_manager
+        backend = self.data_manager.data["settings"].get("notification_backend")
+        if backend:
+            self.notification_system.backend = create_backend(backend, self.root)
+        if local:
+            self.usage_monitor = UsageMonitor(self.data_manager, self.notification_system)
+
+        # With a sync folder the Progress tab shows totals across devices;
+        # a headless service does the exporting when there is one
+        stats_source = self.data_manager
+        sync_dir = self.sync_dir or self.data_manager.data["settings"].get("sync_dir")
+        if sync_dir:
+            from device_sync import CombinedUsage, UsageSync
+            self.usage_sync = UsageSync(self.data_manager, sync_dir, export=local)
+            self.usage_sync.start()
+            stats_source = CombinedUsage(self.data_manager, self.usage_sync.merger)
+        if local:
+            self.retention = RetentionEngine(self.data_manager, TRACKED_APPS.values(), downsample=not sync_dir)
+            self.retention.start()
+
+        self.loading_label.destroy()
+
         # Create notebook for tabs with custom styling
         self.notebook = ttk.Notebook(self.main_container)
         self.notebook.pack(expand=True, fill='both', padx=5, pady=5)
 
         # Create main frames
-        self.stats_frame = StatsFrame(self.notebook, self.data_manager)
+        self.stats_frame = StatsFrame(self.notebook, stats_source)
         self.settings_frame = SettingsFrame(self.notebook, self.data_manager)
+        self.stats_frame.on_chart_ready = self.on_chart_ready
 
         # Add frames to notebook with emojis
         self.notebook.add(self.stats_frame, text=" 📊 Progress ")
         self.notebook.add(self.settings_frame, text=" ⚙️ Setup ")
 
         # Start monitoring thread
-        self.monitor_thread = threading.Thread(target=self.usage_monitor.start_monitoring, daemon=True)
-        self.monitor_thread.start()
+        if self.usage_monitor:
+            self.monitor_thread = threading.Thread(target=self.usage_monitor.start_monitoring, daemon=True)
+            self.monitor_thread.start()
 
         # Schedule periodic updates
         self.schedule_updates()
 
+    def on_chart_ready(self):
+        self.mark("chart ready")
+        if self.timer:
+            self.timer.report()
+
     def schedule_updates(self):
         """Schedule periodic UI updates"""
         self.stats_frame.update_stats()
@@ -64,10 +180,89 @@ class AppTracker:
 
     def on_closing(self):
         """Handle application closing"""
-        self.usage_monitor.stop_monitoring()
-        self.data_manager.save_data()
+        if self.usage_sync:
+            self.usage_sync.stop()
+        if self.retention:
+            self.retention.stop()
+        if self.usage_monitor:
+            self.usage_monitor.stop_monitoring()
+            self.monitor_thread.join(timeout=2)  # Let the monitor flush its last batch
+        if self.data_manager:
+            self.data_manager.close()
+        if self.file_lock:
+            self.file_lock.release()
         self.root.destroy()
 
+def run_headless(socket_path, sync_dir=None, data_file=DEFAULT_DATA_FILE):
+    """Track usage without a GUI, serving data over a Unix socket"""
+    file_lock = DataFileLock(data_file).acquire()  # Held until the process exits
+    data_manager = DataManager(data_file)
+    notification_system = ConsoleNotificationSystem()
+    notification_system.start()
+    usage_monitor = UsageMonitor(data_manager, notification_system)
+    sync_dir = sync_dir or data_manager.data["settings"].get("sync_dir")
+    if sync_dir:
+        from device_sync import UsageSync
+        UsageSync(data_manager, sync_dir).start()
+    RetentionEngine(data_manager, TRACKED_APPS.values(), downsample=not sync_dir).start()
+    TrackerService(data_manager, usage_monitor, socket_path).run()
+
+def setup_instrumentation(args):
+    """Enable metrics export and profiling requested on the command line"""
+    if args.metrics_file or args.metrics_port:
+        metrics.enable()
+    if args.metrics_file:
+        metrics.start_textfile_writer(args.metrics_file)
+    if args.metrics_port:
+        metrics.start_http_server(args.metrics_port)
+    if args.profile:
+        profiler = SamplingProfiler()
+        profiler.start()
+        return profiler
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Digital Wellness Trainer")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the tracker as a background service without the GUI")
+    parser.add_argument("--socket", default=default_socket_path(),
+                        help="Unix socket used by the tracker service")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="print import, first-paint and chart timings")
+    parser.add_argument("--metrics-file",
+                        help="periodically write Prometheus metrics to this file")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on this localhost port")
+    parser.add_argument("--profile",
+                        help="sample stacks while running and write collapsed stacks here on exit")
+    parser.add_argument("--sync-dir",
+                        help="shared folder for combining usage across devices")
+    parser.add_argument("--data-file", default=DEFAULT_DATA_FILE,
+                        help="where usage is kept; a .db or .sqlite file uses the SQLite backend, "
+                             "a .hist file the mmap'd binary history")
+    args = parser.parse_args()
+
+    profiler = setup_instrumentation(args)
+    try:
+        if args.headless:
+            run_headless(args.socket, args.sync_dir, args.data_file)
+            return
+
+        # Attach to a running tracker service if there is one
+        data_manager = None
+        if service_running(args.socket):
+            from tracker_client import RemoteDataManager
+            data_manager = RemoteDataManager(args.socket)
+
+        app = AppTracker(data_manager, StartupTimer() if args.startup_timing else None, args.sync_dir,
+                         args.data_file)
+        app.run()
+    finally:
+        if args.metrics_file:
+            metrics.write_textfile(args.metrics_file)
+        if profiler:
+            profiler.stop()
+            profiler.dump(args.profile)
+
 if __name__ == "__main__":
-    app = AppTracker()
-    app.run()
\ No newline at end of file
+    main()
@@ -0,0 +1,214 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import shutil
+import subprocess
+import psutil
+
+DEFAULT_POLICY = "all"
+
+
+class X11FocusProvider:
+    """PID of the focused window via EWMH _NET_ACTIVE_WINDOW and _NET_WM_PID"""
+    name = "x11"
+
+    def __init__(self):
+        x11_path = ctypes.util.find_library("X11")
+        if not x11_path:
+            raise OSError("libX11 not found")
+        self.xlib = ctypes.cdll.LoadLibrary(x11_path)
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.xlib.XInternAtom.restype = ctypes.c_ulong
+        self.xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        self.xlib.XGetWindowProperty.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long,
+            ctypes.c_int, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p)]
+        self.xlib.XFree.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+        self.display = self.xlib.XOpenDisplay(None)
+        if not self.display:
+            raise OSError("cannot open X display")
+        self.root = self.xlib.XDefaultRootWindow(self.display)
+        self.active_window_atom = self.xlib.XInternAtom(self.display, b"_NET_ACTIVE_WINDOW", True)
+        self.wm_pid_atom = self.xlib.XInternAtom(self.display, b"_NET_WM_PID", True)
+        if not self.active_window_atom or not self.wm_pid_atom:
+            self.close()
+            raise OSError("window manager does not support EWMH")
+
+    def _cardinal(self, window, atom):
+        """First 32-bit item of a window property, or None"""
+        actual_type, actual_format = ctypes.c_ulong(), ctypes.c_int()
+        nitems, bytes_after = ctypes.c_ulong(), ctypes.c_ulong()
+        prop = ctypes.c_void_p()
+        status = self.xlib.XGetWindowProperty(
+            self.display, window, atom, 0, 1, False, 0,  # AnyPropertyType
+            ctypes.byref(actual_type), ctypes.byref(actual_format),
+            ctypes.byref(nitems), ctypes.byref(bytes_after), ctypes.byref(prop))
+        if status != 0 or not prop.value:
+            return None
+        try:
+            if actual_format.value != 32 or nitems.value < 1:
+                return None
+            # Format 32 properties come back as an array of C longs
+            return ctypes.cast(prop, ctypes.POINTER(ctypes.c_ulong))[0]
+        finally:
+            self.xlib.XFree(prop)
+
+    def focused_pid(self):
+        window = self._cardinal(self.root, self.active_window_atom)
+        if not window:
+            return None
+        return self._cardinal(window, self.wm_pid_atom)
+
+    def close(self):
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+
+class SwayFocusProvider:
+    """PID of the focused window from sway's IPC tree"""
+    name = "sway"
+
+    def __init__(self):
+        if not os.environ.get("SWAYSOCK") or not shutil.which("swaymsg"):
+            raise OSError("not running under sway")
+
+    def focused_pid(self):
+        result = subprocess.run(["swaymsg", "-t", "get_tree", "-r"],
+                                capture_output=True, text=True, timeout=2)
+        nodes = [json.loads(result.stdout)]
+        while nodes:
+            node = nodes.pop()
+            if node.get("focused"):
+                return node.get("pid")
+            nodes.extend(node.get("nodes", ()))
+            nodes.extend(node.get("floating_nodes", ()))
+        return None
+
+    def close(self):
+        pass
+
+
+class HyprlandFocusProvider:
+    """PID of the focused window from hyprctl"""
+    name = "hyprland"
+
+    def __init__(self):
+        if not os.environ.get("HYPRLAND_INSTANCE_SIGNATURE") or not shutil.which("hyprctl"):
+            raise OSError("not running under Hyprland")
+
+    def focused_pid(self):
+        result = subprocess.run(["hyprctl", "activewindow", "-j"],
+                                capture_output=True, text=True, timeout=2)
+        return json.loads(result.stdout or "{}").get("pid")
+
+    def close(self):
+        pass
+
+
+def create_focus_provider():
+    """Pick a focus provider for this session, or None if none is available
+
+    Wayland has no portable way to ask for the focused window, so only
+    compositors with their own IPC are supported there.
+    """
+    providers = [SwayFocusProvider, HyprlandFocusProvider]
+    if os.environ.get("DISPLAY"):
+        providers.append(X11FocusProvider)  # Also covers XWayland-only setups
+    for provider in providers:
+        try:
+            return provider()
+        except (OSError, subprocess.SubprocessError, ValueError):
+            continue
+    return None
+
+
+class AllRunningPolicy:
+    """Every tracked app that is running gets the full tick"""
+    name = "all"
+
+    def shares(self, tracker):
+        return {app_name: 1.0 for app_name in tracker.apps()}
+
+    def close(self):
+        pass
+
+
+class FocusedPolicy:
+    """Only the app owning the focused window gets the tick"""
+    name = "focused"
+
+    def __init__(self, focus_provider):
+        self.focus_provider = focus_provider
+
+    def shares(self, tracker):
+        try:
+            pid = self.focus_provider.focused_pid()
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return {}
+        match = tracker.matched.get(pid)
+        if not match:
+            return {}
+        return {match[1]: 1.0}
+
+    def close(self):
+        self.focus_provider.close()
+
+
+class CpuSharePolicy:
+    """Split the tick between running apps by their share of CPU time
+
+    Apps that used no CPU since the last tick share evenly, so an idle
+    browser still counts when nothing else is busy.
+    """
+    name = "cpu"
+
+    def __init__(self, provider=psutil):
+        self.provider = provider
+        self.cpu_times = {}  # pid -> user + system seconds at the last tick
+
+    def shares(self, tracker):
+        apps = tracker.apps()
+        if not apps:
+            self.cpu_times = {}
+            return {}
+        usage = {}
+        cpu_times = {}
+        for app_name, pids in apps.items():
+            used = 0.0
+            for pid in pids:
+                try:
+                    times = self.provider.Process(pid).cpu_times()
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                cpu_times[pid] = times.user + times.system
+                used += cpu_times[pid] - self.cpu_times.get(pid, cpu_times[pid])
+            usage[app_name] = used
+        self.cpu_times = cpu_times
+        total = sum(usage.values())
+        if total <= 0:
+            return {app_name: 1.0 / len(apps) for app_name in apps}
+        return {app_name: used / total for app_name, used in usage.items()}
+
+    def close(self):
+        pass
+
+
+def create_policy(name=DEFAULT_POLICY):
+    """Build the attribution policy named in settings ("all", "focused" or "cpu")"""
+    if name == "focused":
+        focus_provider = create_focus_provider()
+        if focus_provider:
+            return FocusedPolicy(focus_provider)
+        print("No focus provider for this session; attributing to all running apps")
+    elif name == "cpu":
+        return CpuSharePolicy()
+    return AllRunningPolicy()
@@ -0,0 +1,433 @@
+"""Benchmark harness for the monitor, storage and UI hot paths
+
+    python benchmarks/run_benchmarks.py                  # run, compare with baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline  # record a new baseline
+    python benchmarks/run_benchmarks.py --years 5 --apps 500 --processes 10000
+    python benchmarks/run_benchmarks.py --only monitor_tick json_load
+
+Each benchmark runs in its own subprocess so peak RSS is per benchmark.
+Exits with status 1 if any metric regressed past the tolerance.
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import FakeProcessTable, SITES, app_names, write_history
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Metrics compared against the baseline, with an absolute slack so tiny
+# timings don't flag noise as a regression
+COMPARED_METRICS = {
+    "p50_ms": 0.05,
+    "p99_ms": 0.2,
+    "cpu_ms_per_op": 0.05,
+    "peak_rss_mb": 5.0,
+    "write_bytes_per_op": 512
+}
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+class Recorder:
+    """Collects per-operation latency, CPU time and file I/O for one benchmark"""
+
+    def __init__(self):
+        self.latencies = []
+        self.cpu = 0.0
+        self.process = psutil.Process()
+        self.io_start = self.io_counters()
+
+    def io_counters(self):
+        if not hasattr(self.process, "io_counters"):
+            return None
+        counters = self.process.io_counters()
+        # *_chars include page-cache I/O, which is what the code actually asks for
+        return (getattr(counters, "read_chars", counters.read_bytes),
+                getattr(counters, "write_chars", counters.write_bytes))
+
+    @contextlib.contextmanager
+    def op(self):
+        cpu_start = time.process_time()
+        start = time.perf_counter()
+        yield
+        self.latencies.append(time.perf_counter() - start)
+        self.cpu += time.process_time() - cpu_start
+
+    def result(self, **extra):
+        latencies = sorted(self.latencies)
+        ops = len(latencies)
+        result = {
+            "ops": ops,
+            "p50_ms": latencies[ops // 2] * 1000,
+            "p99_ms": latencies[min(ops - 1, int(ops * 0.99))] * 1000,
+            "cpu_ms_per_op": self.cpu / ops * 1000,
+            # ru_maxrss is KiB on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        }
+        io_end = self.io_counters()
+        if io_end and self.io_start:
+            result["read_bytes_per_op"] = (io_end[0] - self.io_start[0]) / ops
+            result["write_bytes_per_op"] = (io_end[1] - self.io_start[1]) / ops
+        result.update(extra)
+        return result
+
+
+@benchmark
+def monitor_tick(args, workdir):
+    """One monitor tick (process churn + classification) over a fake process table"""
+    from data_manager import DataManager
+    from process_tracker import PollingBackend, ProcessTracker
+    from usage_monitor import UsageMonitor
+
+    table = FakeProcessTable(args.processes)
+    data_manager = DataManager(os.path.join(workdir, "usage_data.json"))
+    monitor = UsageMonitor(data_manager, None)
+    monitor.process_tracker.close()
+    monitor.process_tracker = ProcessTracker(monitor.classifier.classify,
+                                             PollingBackend(table, table.last_pid), provider=table)
+
+    recorder = Recorder()
+    with recorder.op():
+        monitor.get_active_apps()  # Initial scan classifies everything
+    initial_ms = recorder.latencies.pop() * 1000
+    recorder.cpu = 0.0
+
+    for _ in range(args.ticks):
+        table.churn(args.churn)
+        with recorder.op():
+            monitor.get_active_apps()
+    return recorder.result(initial_scan_ms=initial_ms)
+
+
+@benchmark
+def classify(args, workdir):
+    """Classifying never-seen processes against hundreds of rules"""
+    from app_classifier import AppClassifier
+    from usage_monitor import TRACKED_APPS
+
+    classifier = AppClassifier()
+    user_apps = app_names(args.apps) + [f"site{i}.example.com" for i in range(args.apps)] + SITES
+    classifier.update_rules(TRACKED_APPS, user_apps)
+    table = FakeProcessTable(args.processes)
+
+    recorder = Recorder()
+    for name, cmdline, _ in table.processes.values():
+        with recorder.op():
+            classifier.classify(name, cmdline)
+    return recorder.result(rules=len(classifier.name_rules) + len(classifier.site_rules))
+
+
+def make_history(args, workdir):
+    path = os.path.join(workdir, "usage_data.json")
+    write_history(path, args.years, args.apps)
+    return path
+
+
+@benchmark
+def json_load(args, workdir):
+    """DataManager startup from a large JSON snapshot"""
+    from data_manager import DataManager
+
+    path = make_history(args, workdir)
+    recorder = Recorder()
+    for _ in range(args.repeat):
+        with recorder.op():
+            DataManager(path)
+    return recorder.result(file_mb=os.path.getsize(path) / 2**20)
+
+
+@benchmark
+def json_save(args, workdir):
+    """Full snapshot rewrite of a large history"""
+    from data_manager import DataManager
+
+    data_manager = DataManager(make_history(args, workdir))
+    recorder = Recorder()
+    for _ in range(args.repeat):
+        with recorder.op():
+            data_manager.save_data()
+    return recorder.result()
+
+
+@benchmark
+def usage_flush(args, workdir):
+    """Batched usage update plus journal flush on a large history"""
+    from data_manager import DataManager
+
+    data_manager = DataManager(make_history(args, workdir))
+    increments = {app_name: 5 for app_name in app_names(5)}
+    recorder = Recorder()
+    for _ in range(args.ticks):
+        with recorder.op():
+            data_manager.update_usage_batch(increments)
+            data_manager.flush()
+    return recorder.result()
+
+
+@benchmark
+def sqlite_load(args, workdir):
+    """DataManager startup from SQLite plus a weekly query for every app"""
+    from data_manager import DataManager
+
+    make_history(args, workdir)
+    db_path = os.path.join(workdir, "usage_data.db")
+    DataManager(db_path).close()  # Migrates the JSON file
+
+    recorder = Recorder()
+    for _ in range(args.repeat):
+        with recorder.op():
+            data_manager = DataManager(db_path)
+            for app_name in data_manager.get_usage_apps():
+                data_manager.get_weekly_usage(app_name)
+        data_manager.close()
+    return recorder.result()
+
+
+@benchmark
+def binary_load(args, workdir):
+    """DataManager startup from the mmap'd history file plus a weekly query for every app"""
+    from data_manager import DataManager
+
+    make_history(args, workdir)
+    hist_path = os.path.join(workdir, "usage_data.hist")
+    DataManager(hist_path).close()  # Imports the JSON file
+
+    recorder = Recorder()
+    for _ in range(args.repeat):
+        with recorder.op():
+            data_manager = DataManager(hist_path)
+            for app_name in data_manager.get_usage_apps():
+                data_manager.get_weekly_usage(app_name)
+        data_manager.close()
+    return recorder.result()
+
+
+@benchmark
+def history_query(args, workdir):
+    """Last-30-days rollup query for all apps (after the one-off build)"""
+    from data_manager import DataManager
+
+    data_manager = DataManager(make_history(args, workdir))
+    recorder = Recorder()
+    with recorder.op():
+        data_manager.get_usage_history("day", 30)
+    build_ms = recorder.latencies.pop() * 1000
+    recorder.cpu = 0.0
+    for _ in range(args.ticks):
+        with recorder.op():
+            data_manager.get_usage_history("day", 30)
+    return recorder.result(build_ms=build_ms)
+
+
+class HeadlessChart:
+    """StatsFrame's chart state on a plain Agg canvas, for hosts without a display
+
+    StatsFrame.update_chart and on_draw run against it unchanged, so the
+    data queries, change detection and blitting are what gets measured.
+    """
+
+    def __init__(self, data_manager):
+        import matplotlib.style
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        matplotlib.style.use('dark_background')
+        self.data_manager = data_manager
+        self.lines = {}
+        self.chart_dates = None
+        self.chart_data = None
+        self.background = None
+        self.fig = Figure(figsize=(10, 5))
+        self.ax = self.fig.add_subplot()
+        self.ax.set_ylim(0, 1)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.canvas.draw_idle = self.canvas.draw  # Nothing else would ever draw it
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def update_stats(self):
+        from ui_components import StatsFrame
+        for app_name in self.data_manager.get_usage_apps():
+            self.data_manager.get_today_usage(app_name)
+            self.data_manager.get_app_limit(app_name)
+        StatsFrame.update_chart(self)
+
+    def on_draw(self, event):
+        from ui_components import StatsFrame
+        StatsFrame.on_draw(self, event)
+
+    def draw_lines(self):
+        from ui_components import StatsFrame
+        StatsFrame.draw_lines(self)
+
+
+@benchmark
+def stats_update(args, workdir):
+    """StatsFrame.update_stats with a hidden Tk root and the Agg-backed canvas
+
+    Without a display only the chart is refreshed, on a plain Agg canvas.
+    """
+    import tkinter as tk
+    from data_manager import DataManager
+
+    path = os.path.join(workdir, "usage_data.json")
+    write_history(path, 0.1, args.ui_apps)
+    data_manager = DataManager(path)
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        frame = HeadlessChart(data_manager)
+        recorder = Recorder()
+        for i in range(args.ticks):
+            if i % 2:
+                data_manager.update_usage_batch({app_name: 60 for app_name in app_names(args.ui_apps)})
+            with recorder.op():
+                frame.update_stats()
+        return recorder.result(headless=True)
+    root.withdraw()
+
+    from ui_components import CustomStyle, StatsFrame
+    CustomStyle.apply()
+    frame = StatsFrame(root, data_manager)
+    frame.pack()
+    frame.build_chart()
+
+    recorder = Recorder()
+    for i in range(args.ticks):
+        if i % 2:
+            # Every other refresh sees new usage, the rest are no-change refreshes
+            data_manager.update_usage_batch({app_name: 60 for app_name in app_names(args.ui_apps)})
+        with recorder.op():
+            frame.update_stats()
+            root.update()
+    root.destroy()
+    return recorder.result()
+
+
+def run_worker(name, args):
+    with tempfile.TemporaryDirectory() as workdir:
+        result = BENCHMARKS[name](args, workdir)
+    print(json.dumps(result))
+
+
+def run_all(args):
+    names = args.only or list(BENCHMARKS)
+    params = ["--years", str(args.years), "--apps", str(args.apps),
+              "--processes", str(args.processes), "--churn", str(args.churn),
+              "--ticks", str(args.ticks), "--repeat", str(args.repeat),
+              "--ui-apps", str(args.ui_apps)]
+    results = {}
+    for name in names:
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", name] + params,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            results[name] = {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"}
+        else:
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+        print_result(name, results[name])
+    return results
+
+
+def print_result(name, result):
+    if "skipped" in result or "error" in result:
+        print(f"{name:16s} {result.get('skipped') or 'ERROR: ' + result['error']}")
+        return
+    io = f"  write/op {result['write_bytes_per_op']:10.0f} B" if "write_bytes_per_op" in result else ""
+    print(f"{name:16s} p50 {result['p50_ms']:9.3f} ms  p99 {result['p99_ms']:9.3f} ms  "
+          f"cpu/op {result['cpu_ms_per_op']:9.3f} ms  rss {result['peak_rss_mb']:7.1f} MB{io}")
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of human-readable regressions
+
+    A benchmark that errored, or that has no baseline entry to compare
+    with, counts as one too, so new benchmarks get recorded.
+    """
+    regressions = []
+    for name, result in results.items():
+        if "error" in result:
+            regressions.append(f"{name}: {result['error']}")
+            continue
+        base = baseline.get("results", {}).get(name)
+        if "skipped" in result:
+            continue
+        if not base or "p50_ms" not in base:
+            regressions.append(f"{name}: no baseline entry; re-record with --save-baseline")
+            continue
+        for metric, slack in COMPARED_METRICS.items():
+            if metric not in base or metric not in result:
+                continue
+            if metric == "p99_ms" and base.get("ops", 0) < 100:
+                continue  # With a handful of runs p99 is just the slowest one
+            if result[metric] > base[metric] * (1 + tolerance) and result[metric] - base[metric] > slack:
+                regressions.append(f"{name}.{metric}: {base[metric]:.3f} -> {result[metric]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen time tracker benchmarks")
+    parser.add_argument("--years", type=float, default=1, help="years of synthetic history")
+    parser.add_argument("--apps", type=int, default=500, help="apps in the synthetic history")
+    parser.add_argument("--processes", type=int, default=5000, help="processes in the fake process table")
+    parser.add_argument("--churn", type=int, default=5, help="processes replaced per tick")
+    parser.add_argument("--ticks", type=int, default=200, help="iterations for per-tick benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="iterations for load/save benchmarks")
+    parser.add_argument("--ui-apps", type=int, default=40, help="apps shown in the UI benchmark")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args)
+        return
+
+    results = run_all(args)
+    params = {key: getattr(args, key) for key in ("years", "apps", "processes", "churn", "ticks", "repeat", "ui_apps")}
+
+    if args.save_baseline:
+        failed = [name for name, result in results.items() if "error" in result]
+        if failed:
+            print(f"Not saving a baseline with failed benchmarks: {', '.join(failed)}")
+            sys.exit(1)
+        with open(args.baseline, 'w') as f:
+            json.dump({"params": params, "results": results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --save-baseline first")
+        return
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get("params") != params:
+        print(f"Note: baseline was recorded with {baseline.get('params')}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
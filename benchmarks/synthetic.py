@@ -0,0 +1,99 @@
+"""Synthetic process tables and usage histories for the benchmarks"""
+import contextlib
+import json
+import random
+from datetime import date, timedelta
+import psutil
+
+PROCESS_NAMES = ["bash", "python3", "code", "slack", "systemd", "sshd", "node",
+                 "chrome", "firefox", "msedge", "java", "postgres", "nginx", "Xorg"]
+SITES = ["youtube.com", "netflix.com", "twitch.tv", "example.org", "docs.python.org"]
+
+
+class FakeProcess:
+    """Just enough of psutil.Process for ProcessTracker"""
+
+    def __init__(self, table, pid):
+        if pid not in table.processes:
+            raise psutil.NoSuchProcess(pid)
+        self.entry = table.processes[pid]
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+    def name(self):
+        return self.entry[0]
+
+    def cmdline(self):
+        return self.entry[1]
+
+    def create_time(self):
+        return self.entry[2]
+
+
+class FakeProcessTable:
+    """Stand-in for the psutil module with N processes and long cmdlines
+
+    Passed as the provider to ProcessTracker and PollingBackend.
+    """
+
+    def __init__(self, count, cmdline_args=40, seed=0):
+        self.random = random.Random(seed)
+        self.cmdline_args = cmdline_args
+        self.processes = {}  # pid -> (name, cmdline, create time)
+        self.next_pid = 1
+        for _ in range(count):
+            self.spawn()
+
+    def spawn(self):
+        name = self.random.choice(PROCESS_NAMES)
+        cmdline = [f"/usr/bin/{name}"]
+        for i in range(self.cmdline_args):
+            cmdline.append(f"--flag-{i}={self.random.getrandbits(64):016x}")
+        if self.random.random() < 0.01:
+            cmdline.append(f"https://www.{self.random.choice(SITES)}/watch")
+        self.processes[self.next_pid] = (name, cmdline, float(self.next_pid))
+        self.next_pid += 1
+
+    def churn(self, count):
+        """Replace count random processes with new ones"""
+        for pid in self.random.sample(list(self.processes), min(count, len(self.processes))):
+            del self.processes[pid]
+            self.spawn()
+
+    def pids(self):
+        return list(self.processes)
+
+    def last_pid(self):
+        """Stand-in for /proc/sys/kernel/ns_last_pid"""
+        return self.next_pid - 1
+
+    def Process(self, pid):
+        return FakeProcess(self, pid)
+
+
+def app_names(count):
+    return [f"App {i:03d}" for i in range(count)]
+
+
+def synthetic_usage(years, apps, seed=0, density=0.6):
+    """Nested {app: {"YYYY-MM-DD": seconds}} covering the last n years"""
+    rng = random.Random(seed)
+    today = date.today()
+    days = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(int(years * 365))]
+    usage = {}
+    for app_name in app_names(apps):
+        usage[app_name] = {day: rng.randrange(60, 4 * 3600) for day in days if rng.random() < density}
+    return usage
+
+
+def write_history(path, years, apps, seed=0):
+    """Write a usage_data.json-style snapshot with synthetic history"""
+    data = {
+        "usage": synthetic_usage(years, apps, seed),
+        "limits": {app_name: 60 for app_name in app_names(apps)},
+        "settings": {"notification_enabled": True}
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return data
@@ -0,0 +1,301 @@
+"""Per-site usage from the browsers' own history databases
+
+Tracked sites are almost never visible in a browser's cmdline, so instead
+the Chromium and Firefox history databases are read every minute. Browsers
+keep them locked, so each pass copies the database (and its WAL) to a
+temporary directory and opens the copy read-only.
+
+Each profile keeps a watermark of the last visit id it has consumed, so a
+pass only reads visits added since; a watermark above the database's
+highest id means history was cleared, and reading restarts from the last
+visit time seen instead.
+
+Chromium records how long each visit lasted once the page is left, so
+visits to tracked sites that are still open are re-checked on later
+passes. Firefox doesn't record durations; a visit lasts until the next one
+in the same profile, capped like Chromium's.
+"""
+import glob
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+from metrics import metrics
+
+INGEST_INTERVAL = 60.0
+MAX_VISIT_SECONDS = 1800  # A tab left open in the background isn't usage
+MAX_OPEN_SECONDS = 12 * 3600  # Stop waiting for an open visit to be closed after this
+
+CHROMIUM_EPOCH_OFFSET = 11644473600  # Seconds between 1601-01-01 and 1970-01-01
+
+CHROMIUM_DIRS = [
+    "~/.config/google-chrome",
+    "~/.config/chromium",
+    "~/.config/microsoft-edge",
+    "~/.config/BraveSoftware/Brave-Browser",
+    "~/Library/Application Support/Google/Chrome",
+    "~/Library/Application Support/Microsoft Edge",
+    "~/AppData/Local/Google/Chrome/User Data",
+    "~/AppData/Local/Microsoft/Edge/User Data"
+]
+FIREFOX_DIRS = [
+    "~/.mozilla/firefox",
+    "~/snap/firefox/common/.mozilla/firefox",
+    "~/Library/Application Support/Firefox/Profiles",
+    "~/AppData/Roaming/Mozilla/Firefox/Profiles"
+]
+
+def find_profiles():
+    """[(kind, history database path)] for every local browser profile"""
+    profiles = []
+    for base in CHROMIUM_DIRS:
+        for path in sorted(glob.glob(os.path.join(os.path.expanduser(base), "*", "History"))):
+            profiles.append(("chromium", path))
+    for base in FIREFOX_DIRS:
+        for path in sorted(glob.glob(os.path.join(os.path.expanduser(base), "*", "places.sqlite"))):
+            profiles.append(("firefox", path))
+    return profiles
+
+
+def site_for_url(url, domains):
+    """App name for a URL whose host is a tracked domain or a subdomain of one"""
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname
+    except ValueError:
+        return None
+    if parts.scheme not in ("http", "https") or not host:
+        return None
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        app_name = domains.get(".".join(labels[i:]))
+        if app_name:
+            return app_name
+    return None
+
+
+class HistorySnapshot:
+    """Read-only copy of a history database that the browser may have locked"""
+
+    def __init__(self, path):
+        self.tmp_dir = tempfile.TemporaryDirectory(prefix="screentime-history-")
+        copy = os.path.join(self.tmp_dir.name, os.path.basename(path))
+        try:
+            shutil.copyfile(path, copy)
+            # Firefox keeps recent visits in the WAL until it checkpoints
+            if os.path.exists(path + "-wal"):
+                shutil.copyfile(path + "-wal", copy + "-wal")
+            self.connection = sqlite3.connect(f"file:{copy}?mode=ro", uri=True)
+        except:
+            self.tmp_dir.cleanup()
+            raise
+
+    def __enter__(self):
+        return self.connection
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+        self.tmp_dir.cleanup()
+        return False
+
+
+class ProfileReader:
+    """Reads one profile's new visits as (id, unix time, duration or None, url)"""
+
+    def __init__(self, kind, path):
+        self.kind = kind
+        self.path = path
+
+    def max_id(self, db):
+        table = "visits" if self.kind == "chromium" else "moz_historyvisits"
+        return db.execute(f"SELECT MAX(id) FROM {table}").fetchone()[0] or 0
+
+    def visits(self, db, after_id, since):
+        """Visits with an id above after_id that started after since, by id"""
+        if self.kind == "chromium":
+            rows = db.execute(
+                "SELECT v.id, v.visit_time, v.visit_duration, u.url FROM visits v "
+                "JOIN urls u ON u.id = v.url WHERE v.id > ? AND v.visit_time > ? ORDER BY v.id",
+                (after_id, int((since + CHROMIUM_EPOCH_OFFSET) * 1000000)))
+            return [(visit_id, visit_time / 1000000 - CHROMIUM_EPOCH_OFFSET, duration / 1000000, url)
+                    for visit_id, visit_time, duration, url in rows]
+        rows = db.execute(
+            "SELECT v.id, v.visit_date, p.url FROM moz_historyvisits v "
+            "JOIN moz_places p ON p.id = v.place_id WHERE v.id > ? AND v.visit_date > ? ORDER BY v.id",
+            (after_id, int(since * 1000000)))
+        return [(visit_id, visit_date / 1000000, None, url) for visit_id, visit_date, url in rows]
+
+    def durations(self, db, visit_ids):
+        """{id: seconds} for Chromium visits that were still open last pass"""
+        if not visit_ids:
+            return {}
+        placeholders = ",".join("?" * len(visit_ids))
+        rows = db.execute(f"SELECT id, visit_duration FROM visits WHERE id IN ({placeholders})", visit_ids)
+        return {visit_id: duration / 1000000 for visit_id, duration in rows}
+
+
+class BrowserHistoryIngester:
+    """Credits time on tracked sites from new browser history visits
+
+    domains is a callable returning {domain: app_name}; it's read on every
+    pass so rule changes apply without restarting. Watermarks are kept in
+    state_file so visits are never counted twice across restarts.
+    on_credit, if given, is called with {date: {app_name: seconds}} after
+    each pass that credited anything, so limits can be checked.
+    """
+
+    def __init__(self, data_manager, domains, state_file, profiles=None,
+                 max_visit=MAX_VISIT_SECONDS, interval=INGEST_INTERVAL, on_credit=None):
+        self.data_manager = data_manager
+        self.domains = domains
+        self.on_credit = on_credit
+        self.state_file = state_file
+        self.profiles = profiles
+        self.max_visit = max_visit
+        self.interval = interval
+        self.state = {}       # database path -> watermark
+        self.signatures = {}  # database path -> (size, mtime) of the files last read
+        self.unfinished = set()  # Profiles with visits that may still gain a duration
+        if os.path.exists(state_file):
+            try:
+                with open(state_file, 'r') as f:
+                    self.state = json.load(f)
+            except (OSError, ValueError):
+                self.state = {}
+
+    def ingest(self, now=None):
+        """Read every profile once; returns {date: {app_name: seconds}} credited"""
+        now = time.time() if now is None else now
+        domains = self.domains()
+        credited = {}
+        read = False
+        with metrics.timer("browser_ingest_seconds"):
+            for kind, path in (find_profiles() if self.profiles is None else self.profiles):
+                try:
+                    read = self.ingest_profile(ProfileReader(kind, path), domains, now, credited) or read
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Error reading browser history {path}: {e}")
+        for date, increments in credited.items():
+            self.data_manager.update_usage_batch({app_name: round(seconds)
+                                                  for app_name, seconds in increments.items()}, date)
+        if read:
+            self.save_state()
+        if credited and self.on_credit:
+            self.on_credit(credited)
+        return credited
+
+    def ingest_profile(self, reader, domains, now, credited):
+        """Credit a profile's new visits; returns False if it was unchanged"""
+        signature = self.signature(reader.path)
+        if signature == self.signatures.get(reader.path) and reader.path not in self.unfinished:
+            return False  # Nothing written since the last pass
+        watermark = self.state.setdefault(reader.path, {
+            "last_id": 0,
+            "last_time": 0,
+            # A new profile starts from today rather than crediting its whole history
+            "since": datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0).timestamp(),
+            "open": {}
+        })
+
+        with HistorySnapshot(reader.path) as db:
+            if reader.max_id(db) < watermark["last_id"]:
+                # History was cleared or the profile recreated, so ids start over
+                watermark["last_id"] = 0
+                watermark["since"] = watermark["last_time"]
+            visits = reader.visits(db, watermark["last_id"], watermark["since"])
+            metrics.inc("browser_visits_total", len(visits))
+            if reader.kind == "chromium":
+                closed = reader.durations(db, [int(visit_id) for visit_id in watermark["open"]])
+                unfinished = self.credit_chromium(watermark, visits, closed, domains, now, credited)
+            else:
+                unfinished = self.credit_firefox(watermark, visits, domains, now, credited)
+        self.signatures[reader.path] = signature
+        if unfinished:
+            self.unfinished.add(reader.path)
+        else:
+            self.unfinished.discard(reader.path)
+        return True
+
+    def credit_chromium(self, watermark, visits, closed, domains, now, credited):
+        """Credit closed visits; returns whether tracked visits are still open"""
+        still_open = {}
+        for visit_id, (started, app_name) in watermark["open"].items():
+            duration = closed.get(int(visit_id), 0)
+            if duration > 0:
+                self.credit(credited, app_name, started, duration)
+            elif int(visit_id) in closed and now - started < MAX_OPEN_SECONDS:
+                still_open[visit_id] = (started, app_name)
+        for visit_id, started, duration, url in visits:
+            app_name = site_for_url(url, domains)
+            if app_name is None:
+                continue
+            if duration > 0:
+                self.credit(credited, app_name, started, duration)
+            elif now - started < MAX_OPEN_SECONDS:
+                still_open[str(visit_id)] = (started, app_name)
+        watermark["open"] = still_open
+        if visits:
+            watermark["last_id"] = visits[-1][0]
+            watermark["last_time"] = max(watermark["last_time"], max(visit[1] for visit in visits))
+        return bool(still_open)
+
+    def credit_firefox(self, watermark, visits, domains, now, credited):
+        """Credit visits that have ended; returns whether the latest one hasn't"""
+        consumed = None
+        waiting = False
+        for i, (visit_id, started, _, url) in enumerate(visits):
+            if i + 1 < len(visits):
+                duration = visits[i + 1][1] - started
+            elif now - started >= self.max_visit:
+                duration = self.max_visit
+            else:
+                waiting = True  # Still the latest visit; re-read it next pass once it has an end
+                break
+            app_name = site_for_url(url, domains)
+            if app_name is not None:
+                self.credit(credited, app_name, started, duration)
+            consumed = (visit_id, started)
+        if consumed:
+            watermark["last_id"] = consumed[0]
+            watermark["last_time"] = max(watermark["last_time"], consumed[1])
+        return waiting
+
+    def credit(self, credited, app_name, started, duration):
+        seconds = min(duration, self.max_visit)
+        if seconds <= 0:
+            return
+        date = datetime.fromtimestamp(started).strftime("%Y-%m-%d")
+        increments = credited.setdefault(date, {})
+        increments[app_name] = increments.get(app_name, 0) + seconds
+
+    def signature(self, path):
+        signature = []
+        for name in (path, path + "-wal"):
+            try:
+                stat = os.stat(name)
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def save_state(self):
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_file, self.state_file)
+
+    def start(self, stop_event):
+        """Ingest every interval seconds on a daemon thread until stop_event is set"""
+        def loop():
+            while not stop_event.is_set():
+                try:
+                    self.ingest()
+                except Exception as e:
+                    print(f"Error ingesting browser history: {e}")
+                stop_event.wait(self.interval)
+        threading.Thread(target=loop, daemon=True).start()
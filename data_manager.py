@@ -1,71 +1,197 @@
-import json
-from datetime import datetime, timedelta
-import os
+import threading
+from datetime import datetime
+from metrics import metrics
+from storage import create_storage
+from utils import get_date_range
+
+DEFAULT_DATA_FILE = "usage_data.json"
+
+class DataFileLock:
+    """Advisory lock on <data_file>.lock, held by whichever process writes the data file
+
+    Storage backends rewrite and compact their files in place, so a second
+    writer would corrupt them; the lock makes a second tracker or a local
+    export fail fast instead.
+    """
+    def __init__(self, data_file=DEFAULT_DATA_FILE):
+        self.data_file = data_file
+        self.file = None
+
+    def acquire(self):
+        try:
+            import fcntl
+        except ImportError:
+            return self  # No flock on this platform
+        self.file = open(self.data_file + ".lock", 'a')
+        try:
+            fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.file.close()
+            self.file = None
+            raise RuntimeError(f"{self.data_file} is open in a running tracker")
+        return self
+
+    def release(self):
+        if self.file:
+            self.file.close()  # Closing drops the flock
+            self.file = None
 
 class DataManager:
-    def __init__(self):
-        self.data_file = "usage_data.json"
+    def __init__(self, data_file=DEFAULT_DATA_FILE, flush_interval=5.0, storage=None):
+        self.data_file = data_file
+        self.limits_version = 0
+        self.removed_apps = {}  # app_name -> limits_version it was removed in
+        self.lock = threading.RLock()  # Shared by the monitor thread and the Tk thread
+        self.storage = storage or create_storage(data_file, flush_interval)
+        self.rollups = None  # Built from storage on the first history query
         self.load_data()
-        
+
     def load_data(self):
-        """Load usage data from file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    self.data = json.load(f)
-            except:
-                self.initialize_data()
-        else:
-            self.initialize_data()
-            
-    def initialize_data(self):
-        """Initialize empty data structure"""
-        self.data = {
-            "usage": {},
-            "limits": {},
-            "settings": {
-                "notification_enabled": True
-            }
-        }
-        
+        """Load limits and settings; usage stays with the storage backend"""
+        self.data = self.storage.load()
+
     def save_data(self):
-        """Save usage data to file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.data, f)
-            
+        """Persist limits, settings and any buffered usage"""
+        with self.lock, metrics.timer("save_seconds"):
+            self.storage.save(self.data)
+
+    def flush(self):
+        """Persist buffered usage"""
+        with self.lock, metrics.timer("save_seconds"):
+            self.storage.flush()
+
+    def flush_if_due(self):
+        """Flush buffered usage if it is older than the flush interval"""
+        if self.storage.due():
+            self.flush()
+
+    def close(self):
+        """Write everything out and release the storage backend"""
+        with self.lock:
+            self.storage.close(self.data)
+
     def update_app_usage(self, app_name, seconds):
         """Update usage time for an app"""
         today = datetime.now().strftime("%Y-%m-%d")
-        
-        if app_name not in self.data["usage"]:
-            self.data["usage"][app_name] = {}
-            
-        if today not in self.data["usage"][app_name]:
-            self.data["usage"][app_name][today] = 0
-            
-        self.data["usage"][app_name][today] += seconds
-        
+        with self.lock:
+            self.storage.add_usage(app_name, today, seconds)
+            if self.rollups is not None:
+                self.rollups.record(app_name, today, seconds)
+
+    def update_usage_batch(self, increments, date=None):
+        """Add {app_name: seconds} increments for one day under a single lock"""
+        if date is None:
+            date = datetime.now().strftime("%Y-%m-%d")
+        with self.lock, metrics.timer("usage_update_seconds"):
+            for app_name, seconds in increments.items():
+                self.storage.add_usage(app_name, date, seconds)
+                if self.rollups is not None:
+                    self.rollups.record(app_name, date, seconds)
+
     def get_today_usage(self, app_name):
         """Get today's usage for an app"""
         today = datetime.now().strftime("%Y-%m-%d")
-        return self.data["usage"].get(app_name, {}).get(today, 0)
-        
+        with self.lock:
+            return self.storage.get_usage(app_name, today)
+
+    def get_usage_range(self, app_name, days):
+        """Get usage for an app over the last n days, newest first"""
+        dates = get_date_range(days)
+        with self.lock:
+            stored = self.storage.get_usage_range(app_name, dates[-1], dates[0])
+        return {date: stored.get(date, 0) for date in dates}
+
+    def get_app_history(self, app_name):
+        """Get every recorded day of usage for an app, oldest first"""
+        return self.get_usage_between(app_name, "0001-01-01", "9999-12-31")
+
+    def get_usage_between(self, app_name, start_date, end_date):
+        """Get an app's recorded days from start_date to end_date inclusive, oldest first"""
+        with self.lock:
+            stored = self.storage.get_usage_range(app_name, start_date, end_date)
+        return dict(sorted(stored.items()))
+
     def get_weekly_usage(self, app_name):
         """Get weekly usage for an app"""
-        usage = {}
-        today = datetime.now()
-        
-        for i in range(7):
-            date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            usage[date] = self.data["usage"].get(app_name, {}).get(date, 0)
-            
-        return usage
-        
+        return self.get_usage_range(app_name, 7)
+
+    def get_usage_history(self, granularity, periods):
+        """Get (app_names, labels, totals) for the last n days, weeks or months
+
+        granularity is "day", "week" or "month"; totals is an
+        (apps x periods) array of seconds, oldest period first.
+        """
+        with self.lock:
+            if self.rollups is None:
+                # Imported on first use so NumPy stays off the startup path
+                from usage_rollups import UsageRollups
+                self.rollups = UsageRollups()
+                self.rollups.build(self.storage.iter_usage())
+            return self.rollups.last(granularity, periods)
+
+    def get_usage_apps(self):
+        """Get the names of all apps with recorded usage"""
+        with self.lock:
+            return self.storage.apps()
+
     def set_app_limit(self, app_name, limit_minutes):
         """Set daily time limit for an app"""
-        self.data["limits"][app_name] = limit_minutes
-        self.save_data()
-        
+        self.update_limits({app_name: limit_minutes})
+
+    def remove_app(self, app_name):
+        """Stop tracking an app and drop its usage history"""
+        if app_name in self.data["limits"]:
+            self.update_limits({}, [app_name])
+
+    def update_limits(self, limits, removed=()):
+        """Set {app_name: minutes} limits and remove apps with a single save"""
+        with self.lock:
+            for app_name in removed:
+                if app_name in self.data["limits"]:
+                    del self.data["limits"][app_name]
+                    self.removed_apps[app_name] = self.limits_version + 1
+                    self.storage.remove_app(app_name)
+                    if self.rollups is not None:
+                        self.rollups.remove_app(app_name)
+            self.data["limits"].update(limits)
+            self.limits_version += 1
+            self.save_data()
+
+    def removed_since(self, limits_version):
+        """Apps removed after limits_version, whose unsaved usage must not be written back"""
+        with self.lock:
+            return [app_name for app_name, version in self.removed_apps.items()
+                    if limits_version is None or version > limits_version]
+
+    def downsample_usage(self, app_name, start_date, end_date, bucket):
+        """Fold an app's days in [start_date, end_date] onto bucket(date)
+
+        Returns whether anything moved. Totals over any period that
+        contains both a day and its bucket are unchanged.
+        """
+        with self.lock:
+            usage = self.storage.get_usage_range(app_name, start_date, end_date)
+            folded = {}
+            for date, seconds in usage.items():
+                key = bucket(date)
+                folded[key] = folded.get(key, 0) + seconds
+            if folded == usage:
+                return False
+            self.storage.replace_usage(app_name, start_date, end_date, folded)
+            if self.rollups is not None:
+                for date in usage.keys() | folded.keys():
+                    change = folded.get(date, 0) - usage.get(date, 0)
+                    if change:
+                        self.rollups.record(app_name, date, change)
+            return True
+
+    def prune_app(self, app_name):
+        """Drop an app's usage history without touching limits"""
+        with self.lock:
+            self.storage.remove_app(app_name)
+            if self.rollups is not None:
+                self.rollups.remove_app(app_name)
+
     def get_app_limit(self, app_name):
         """Get daily time limit for an app"""
         return self.data["limits"].get(app_name, 0)
@@ -0,0 +1,348 @@
+"""Combine usage from several machines through a shared folder
+
+Each device owns a directory under the sync folder and only ever writes
+there, so folders synced with Syncthing, Dropbox or a network share never
+see conflicting writes:
+
+    <sync_dir>/<device_id>/00000001.full.json.gz    all counters
+    <sync_dir>/<device_id>/00000002.delta.json.gz   counters that grew since
+
+Counters are grow-only per (device, app, day), so merging is an
+element-wise max per device and files can be applied in any order, more
+than once, or after newer ones. Combined totals are the sum over devices.
+"""
+import gzip
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from usage_store import ColumnarUsage, day_key, epoch_day
+
+RECENT_DAYS = 8        # Usage is only ever added to today, so older days are settled
+COMPACT_EVERY = 50     # Write a full snapshot (and drop older files) every n exports
+SYNC_INTERVAL = 60.0
+POOL_MIN_BYTES = 1 << 20  # Below this much compressed input, a worker costs more than it saves
+
+
+def sync_files(device_dir):
+    """(seq, kind, path) for a device's sync files, oldest first"""
+    files = []
+    try:
+        names = os.listdir(device_dir)
+    except FileNotFoundError:
+        return files
+    for name in names:
+        parts = name.split(".")
+        if len(parts) == 4 and parts[1] in ("full", "delta") and parts[0].isdigit():
+            files.append((int(parts[0]), parts[1], os.path.join(device_dir, name)))
+    return sorted(files)
+
+
+def read_sync_state(state_file):
+    """An exporter's saved state, or None if it's missing or unreadable"""
+    try:
+        with open(state_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def read_device_updates(device_dir, since_seq):
+    """Max-merge a device's files newer than since_seq (may run in a pool worker)
+
+    Files are applied in seq order up to the first one that can't be read
+    yet, so a file still being synced holds back the ones after it instead
+    of being skipped for good. Returns (last_seq, {app_name: {epoch_day: seconds}}).
+    """
+    files = [entry for entry in sync_files(device_dir) if entry[0] > since_seq]
+    fulls = [seq for seq, kind, _ in files if kind == "full"]
+    if fulls:
+        # A full snapshot already holds everything in the files before it
+        files = [entry for entry in files if entry[0] >= fulls[-1]]
+    counters = {}
+    last_seq = since_seq
+    for seq, kind, path in files:
+        try:
+            with gzip.open(path, 'rt') as f:
+                payload = json.load(f)
+        except (OSError, ValueError, EOFError):
+            break  # Still being synced; it and the files after it are read on a later pass
+        for app_name, days in payload["usage"].items():
+            app_counters = counters.setdefault(app_name, {})
+            for day, seconds in days:
+                if seconds > app_counters.get(day, 0):
+                    app_counters[day] = seconds
+        last_seq = seq
+    return last_seq, counters
+
+
+class DeviceExporter:
+    """Writes this device's counters to its own directory as compact deltas"""
+
+    def __init__(self, data_manager, sync_dir, state_file):
+        self.data_manager = data_manager
+        self.sync_dir = sync_dir
+        self.state_file = state_file
+        self.state = {"device_id": None, "seq": 0, "recent": {}}
+        self.state.update(read_sync_state(state_file) or {})
+        if not self.state["device_id"]:
+            self.state["device_id"] = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.device_dir = os.path.join(sync_dir, self.state["device_id"])
+
+    @property
+    def device_id(self):
+        return self.state["device_id"]
+
+    def export(self):
+        """Write the counters that grew since the last export; returns the file or None"""
+        seq = self.state["seq"] + 1
+        full = self.state["seq"] == 0 or seq % COMPACT_EVERY == 0
+        cutoff = (date.today() - timedelta(days=RECENT_DAYS - 1)).isoformat()
+        recent = {}
+        usage = {}
+        if full:
+            rows = self.data_manager.storage.iter_usage()
+        else:
+            rows = ((app_name, day, seconds)
+                    for app_name in self.data_manager.get_usage_apps()
+                    for day, seconds in self.data_manager.get_usage_range(app_name, RECENT_DAYS).items())
+        with self.data_manager.lock:
+            for app_name, day, seconds in rows:
+                if not seconds:
+                    continue
+                if day >= cutoff:
+                    recent.setdefault(app_name, {})[day] = seconds
+                if full or seconds != self.state["recent"].get(app_name, {}).get(day):
+                    usage.setdefault(app_name, []).append([epoch_day(day), seconds])
+        self.state["recent"] = recent
+        if not usage and not full:
+            return None
+
+        os.makedirs(self.device_dir, exist_ok=True)
+        path = os.path.join(self.device_dir, f"{seq:08d}.{'full' if full else 'delta'}.json.gz")
+        payload = {"device": self.device_id, "host": socket.gethostname(), "seq": seq, "usage": usage}
+        tmp_path = os.path.join(self.device_dir, ".tmp-" + os.path.basename(path))
+        with gzip.open(tmp_path, 'wt') as f:
+            json.dump(payload, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        self.state["seq"] = seq
+        self.save_state()
+
+        if full:
+            # Readers that are behind start again from this snapshot
+            for old_seq, _, old_path in sync_files(self.device_dir):
+                if old_seq < seq:
+                    os.remove(old_path)
+        return path
+
+    def save_state(self):
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_file, self.state_file)
+
+
+class DeviceMerger:
+    """Grow-only counters from other devices, merged incrementally
+
+    Only files newer than the last one applied per device are read, and
+    combined totals are adjusted by how much each counter grew, so a
+    refresh costs the size of the new deltas rather than the histories.
+    """
+
+    def __init__(self, sync_dir, local_device_id=None, max_workers=None):
+        self.sync_dir = sync_dir
+        self.local_device_id = local_device_id
+        self.max_workers = max_workers
+        self.pool = None  # Started on the first large refresh and kept until close()
+        self.lock = threading.Lock()
+        self.counters = {}  # device_id -> ColumnarUsage of that device's counters
+        self.seen = {}      # device_id -> last seq applied
+        self.combined = ColumnarUsage()  # Sum over the other devices
+        self.rollups = None  # Built on the first history query
+
+    def pending(self):
+        """[(device_id, device_dir, since_seq, unread bytes)] for devices with unread files"""
+        try:
+            devices = sorted(os.listdir(self.sync_dir))
+        except FileNotFoundError:
+            return []
+        pending = []
+        for device_id in devices:
+            device_dir = os.path.join(self.sync_dir, device_id)
+            if device_id == self.local_device_id or not os.path.isdir(device_dir):
+                continue
+            since_seq = self.seen.get(device_id, 0)
+            unread = [path for seq, _, path in sync_files(device_dir) if seq > since_seq]
+            if unread:
+                pending.append((device_id, device_dir, since_seq, sum(file_size(path) for path in unread)))
+        return pending
+
+    def refresh(self):
+        """Apply new files from every other device; returns the devices updated"""
+        pending = self.pending()
+        if not pending:
+            return []
+        device_dirs = [device_dir for _, device_dir, _, _ in pending]
+        since_seqs = [since_seq for _, _, since_seq, _ in pending]
+        if len(pending) == 1 or sum(size for _, _, _, size in pending) < POOL_MIN_BYTES:
+            # The usual minute's deltas are a few KB; merge them right here
+            results = list(map(read_device_updates, device_dirs, since_seqs))
+        else:
+            # Decompressing and parsing a backlog is CPU-bound, so spread devices over processes
+            results = list(self.get_pool().map(read_device_updates, device_dirs, since_seqs))
+        with self.lock:
+            for (device_id, _, _, _), (last_seq, counters) in zip(pending, results):
+                self.apply(device_id, counters)
+                self.seen[device_id] = last_seq
+        return [device_id for device_id, _, _, _ in pending]
+
+    def get_pool(self):
+        if self.pool is None:
+            workers = self.max_workers or os.cpu_count() or 1
+            # spawn, since forking a process that runs Tk and the monitor thread is unsafe
+            self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def apply(self, device_id, counters):
+        """Max-merge one device's counters and fold the growth into the totals"""
+        device = self.counters.setdefault(device_id, ColumnarUsage())
+        for app_name, days in counters.items():
+            for day, seconds in days.items():
+                app_id = device.app_id(app_name, create=True)
+                grown = seconds - device.app_series(app_id).get(day)
+                if grown <= 0:
+                    continue
+                device.app_series(app_id).add(day, grown)
+                date_str = day_key(day)
+                self.combined.add(app_name, date_str, grown)
+                if self.rollups is not None:
+                    self.rollups.record(app_name, date_str, grown)
+
+    def exclude(self, device_id):
+        """Stop merging a device, dropping whatever was already merged from it"""
+        with self.lock:
+            self.local_device_id = device_id
+            self.seen.pop(device_id, None)
+            if self.counters.pop(device_id, None) is None:
+                return
+            # Counters only grow, so rebuild the sum rather than subtract
+            self.combined = ColumnarUsage()
+            for device in self.counters.values():
+                for app_name, date_str, seconds in device.rows():
+                    self.combined.add(app_name, date_str, seconds)
+            self.rollups = None
+
+    def get_usage(self, app_name, date_str):
+        with self.lock:
+            return self.combined.get_seconds(app_name, date_str)
+
+    def apps(self):
+        with self.lock:
+            return list(self.combined)
+
+    def get_usage_history(self, granularity, periods):
+        with self.lock:
+            if self.rollups is None:
+                from usage_rollups import UsageRollups
+                self.rollups = UsageRollups()
+                self.rollups.build(self.combined.rows())
+            return self.rollups.last(granularity, periods)
+
+
+class UsageSync:
+    """Periodically exports this device's usage and merges everyone else's"""
+
+    def __init__(self, data_manager, sync_dir, export=True, interval=SYNC_INTERVAL):
+        self.data_manager = data_manager
+        self.interval = interval
+        self.exporter = None
+        # The device id and export watermark live next to the data file
+        self.state_file = data_manager.data_file + ".sync"
+        if export:
+            self.exporter = DeviceExporter(data_manager, sync_dir, self.state_file)
+            local_device_id = self.exporter.device_id
+        else:
+            # The tracker exporting this machine's usage may not have saved its id yet
+            local_device_id = (read_sync_state(self.state_file) or {}).get("device_id")
+        # This machine's own files would count its usage a second time
+        self.merger = DeviceMerger(sync_dir, local_device_id)
+        self.stop_event = threading.Event()
+
+    def sync(self):
+        try:
+            if self.exporter:
+                self.exporter.export()
+            elif self.merger.local_device_id is None:
+                device_id = (read_sync_state(self.state_file) or {}).get("device_id")
+                if device_id:
+                    self.merger.exclude(device_id)
+            self.merger.refresh()
+        except OSError as e:
+            print(f"Error syncing usage: {e}")
+
+    def start(self):
+        def loop():
+            while True:
+                self.sync()
+                if self.stop_event.wait(self.interval):
+                    self.merger.close()
+                    return
+        threading.Thread(target=loop, daemon=True).start()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class CombinedUsage:
+    """DataManager stand-in for StatsFrame that adds the other devices' usage"""
+
+    def __init__(self, data_manager, merger):
+        self.data_manager = data_manager
+        self.merger = merger
+
+    def get_usage_apps(self):
+        apps = self.data_manager.get_usage_apps()
+        return apps + [app_name for app_name in self.merger.apps() if app_name not in apps]
+
+    def get_today_usage(self, app_name):
+        today = date.today().isoformat()
+        return self.data_manager.get_today_usage(app_name) + self.merger.get_usage(app_name, today)
+
+    def get_app_limit(self, app_name):
+        return self.data_manager.get_app_limit(app_name)
+
+    def get_usage_history(self, granularity, periods):
+        app_names, labels, totals = self.data_manager.get_usage_history(granularity, periods)
+        remote_names, remote_labels, remote_totals = self.merger.get_usage_history(granularity, periods)
+        if not remote_names or remote_labels != labels:
+            return app_names, labels, totals
+        rows = {app_name: i for i, app_name in enumerate(app_names)}
+        extra = [app_name for app_name in remote_names if app_name not in rows]
+        if extra:
+            import numpy as np
+            totals = np.vstack([totals, np.zeros((len(extra), len(labels)), dtype=totals.dtype)])
+            for app_name in extra:
+                rows[app_name] = len(rows)
+            app_names = app_names + extra
+        else:
+            totals = totals.copy()
+        for i, app_name in enumerate(remote_names):
+            totals[rows[app_name]] += remote_totals[i]
+        return app_names, labels, totals
@@ -0,0 +1,193 @@
+"""Versioned binary usage history, read through mmap
+
+Layout (all integers little-endian):
+
+    header   64 bytes: magic, format version, app count, and the offset and
+             length of the app index and of the metadata block
+    arrays   per app, one uint32 of seconds per day from its first to its
+             last recorded day
+    index    per app: first epoch day, day count, array offset, name
+    metadata JSON with limits, settings and the journal generation
+
+Opening a file reads the header and the app index; day arrays are only
+paged in when a query touches them.
+
+    python history_file.py import usage_data.json usage_data.hist
+    python history_file.py export usage_data.hist usage_data.json
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from usage_store import ColumnarUsage, DaySeries, json_default
+
+MAGIC = b"STTHIST\0"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQQQ")
+HEADER_SIZE = 64
+INDEX_ENTRY = struct.Struct("<iIQH")  # base epoch day, day count, array offset, name length
+
+
+class HistoryFormatError(ValueError):
+    pass
+
+
+class HistoryFile:
+    """Read-only view of a history file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise HistoryFormatError(f"{path} is empty")
+        try:
+            self._read_header()
+        except:
+            self.close()
+            raise
+
+    def _read_header(self):
+        if len(self.map) < HEADER_SIZE:
+            raise HistoryFormatError(f"{self.path} is truncated")
+        (magic, version, _, app_count, index_offset, index_length,
+         meta_offset, meta_length) = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise HistoryFormatError(f"{self.path} is not a usage history file")
+        if version > VERSION:
+            raise HistoryFormatError(f"{self.path} uses format version {version}; this build reads up to {VERSION}")
+        if max(index_offset + index_length, meta_offset + meta_length) > len(self.map):
+            raise HistoryFormatError(f"{self.path} is truncated")
+
+        self.index = {}  # app_name -> (base epoch day, day count, array offset)
+        offset = index_offset
+        for _ in range(app_count):
+            base, count, data_offset, name_length = INDEX_ENTRY.unpack_from(self.map, offset)
+            offset += INDEX_ENTRY.size
+            name = self.map[offset:offset + name_length].decode()
+            offset += name_length
+            if data_offset < HEADER_SIZE or data_offset + 4 * count > index_offset:
+                raise HistoryFormatError(f"{self.path} has a corrupt index entry for {name!r}")
+            self.index[name] = (base, count, data_offset)
+        self.meta = json.loads(self.map[meta_offset:meta_offset + meta_length])
+
+    def apps(self):
+        return list(self.index)
+
+    def get(self, app_name, day):
+        """Seconds for an app on one epoch day"""
+        entry = self.index.get(app_name)
+        if entry is None:
+            return 0
+        base, count, data_offset = entry
+        if not 0 <= day - base < count:
+            return 0
+        return struct.unpack_from("<I", self.map, data_offset + 4 * (day - base))[0]
+
+    def days(self, app_name, start=None, end=None):
+        """(first epoch day, array of seconds) for an app, clipped to [start, end]"""
+        entry = self.index.get(app_name)
+        if entry is None:
+            return 0, array("I")
+        base, count, data_offset = entry
+        lo = 0 if start is None else max(0, start - base)
+        hi = count if end is None else min(count, end - base + 1)
+        seconds = array("I")
+        if lo < hi:
+            seconds.frombytes(self.map[data_offset + 4 * lo:data_offset + 4 * hi])
+            if sys.byteorder == "big":
+                seconds.byteswap()
+        return base + lo, seconds
+
+    def series(self, app_name):
+        """The app's whole history as a DaySeries"""
+        series = DaySeries()
+        base, seconds = self.days(app_name)
+        if seconds:
+            series.base, series.seconds = base, seconds
+        return series
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def write_history_file(path, series, meta):
+    """Atomically write {app_name: DaySeries} and a metadata dict to path"""
+    tmp_path = path + ".tmp"
+    index = []
+    with open(tmp_path, 'wb') as f:
+        f.write(bytes(HEADER_SIZE))
+        for app_name, days in series.items():
+            if days.base is None:
+                continue
+            seconds = days.seconds
+            if sys.byteorder == "big":
+                seconds = array("I", seconds)
+                seconds.byteswap()
+            index.append((app_name.encode(), days.base, len(seconds), f.tell()))
+            f.write(seconds.tobytes())
+
+        index_offset = f.tell()
+        for name, base, count, data_offset in index:
+            f.write(INDEX_ENTRY.pack(base, count, data_offset, len(name)))
+            f.write(name)
+        meta_offset = f.tell()
+        meta_bytes = json.dumps(meta).encode()
+        f.write(meta_bytes)
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(index), index_offset,
+                            meta_offset - index_offset, meta_offset, len(meta_bytes)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def import_json(json_file, history_path):
+    """Convert a JSON snapshot (and its journal) into a history file"""
+    from storage import JsonStorage
+    source = JsonStorage(json_file)
+    data = source.load()
+    source.journal.close()
+    usage = data.pop("usage")
+    data.pop("journal_generation", None)
+    write_history_file(history_path, {app_name: usage.app_series(app_id)
+                                      for app_name, app_id in usage.app_ids.items()}, data)
+
+
+def export_json(history_path, json_file):
+    """Write a history file (and its journal) back out as a plain JSON snapshot"""
+    from storage import BinaryStorage
+    source = BinaryStorage(history_path, migrate_from=os.devnull)
+    data = source.load()
+    try:
+        data["usage"] = ColumnarUsage({app_name: source.series(app_name) for app_name in source.apps()})
+        tmp_file = json_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(json.dumps(data, default=json_default))
+        os.replace(tmp_file, json_file)
+    finally:
+        source.journal.close()
+        if source.history:
+            source.history.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("import", "export"):
+        print("usage: python history_file.py import <source.json> <target.hist>")
+        print("       python history_file.py export <source.hist> <target.json>")
+        sys.exit(1)
+    command, source, target = sys.argv[1:]
+    if os.path.exists(target):
+        print(f"{target} already exists")
+        sys.exit(1)
+    if command == "import":
+        import_json(source, target)
+    else:
+        export_json(source, target)
+    print(f"Converted {source} to {target}")
@@ -0,0 +1,188 @@
+import ctypes
+import ctypes.util
+import os
+import shutil
+import subprocess
+import time
+
+DEFAULT_IDLE_THRESHOLD = 300  # Seconds without input before the user counts as away
+
+
+class XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("eventMask", ctypes.c_ulong)
+    ]
+
+
+class X11IdleSource:
+    """Input idle time from the X server's MIT-SCREEN-SAVER extension
+
+    The server derives this from the same device events XInput delivers,
+    so one query is a single round trip with no event subscription.
+    """
+    name = "x11"
+    poll_interval = 2.0  # Slower than an active tick; waking up a second late costs nothing
+
+    def __init__(self):
+        x11_path = ctypes.util.find_library("X11")
+        xss_path = ctypes.util.find_library("Xss")
+        if not x11_path or not xss_path:
+            raise OSError("libX11 or libXss not found")
+        self.xlib = ctypes.cdll.LoadLibrary(x11_path)
+        self.xss = ctypes.cdll.LoadLibrary(xss_path)
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        self.xlib.XFree.argtypes = [ctypes.c_void_p]
+        self.xss.XScreenSaverQueryExtension.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+        self.xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+        self.xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+
+        self.display = self.xlib.XOpenDisplay(None)
+        if not self.display:
+            raise OSError("cannot open X display")
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not self.xss.XScreenSaverQueryExtension(self.display, ctypes.byref(event_base),
+                                                   ctypes.byref(error_base)):
+            self.xlib.XCloseDisplay(self.display)
+            raise OSError("X server lacks the MIT-SCREEN-SAVER extension")
+        self.root = self.xlib.XDefaultRootWindow(self.display)
+        self.info = self.xss.XScreenSaverAllocInfo()
+
+    def idle_seconds(self):
+        if not self.xss.XScreenSaverQueryInfo(self.display, self.root, self.info):
+            return 0.0
+        return self.info.contents.idle / 1000
+
+    def close(self):
+        if self.display:
+            self.xlib.XFree(self.info)
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+
+class LogindIdleSource:
+    """IdleHint of the login session, as set by the desktop or screen locker
+
+    Works on Wayland, where clients cannot query input idle time directly.
+    logind only reports idle once the session manager decides the user is,
+    so this source is coarser than X11's.
+    """
+    name = "logind"
+    poll_interval = 5.0
+
+    def __init__(self, session_id=None):
+        if not shutil.which("loginctl"):
+            raise OSError("loginctl not found")
+        self.session_id = session_id or os.environ.get("XDG_SESSION_ID", "auto")
+        self.idle_since = None  # Monotonic time the session went idle, None while active
+        self.queried = None
+        self.query()  # Fail now if the session can't be queried
+
+    def idle_seconds(self):
+        """Idle time from the last loginctl answer, refreshed once per poll_interval
+
+        The monitor checks idleness on every tick, and spawning loginctl
+        that often would cost more than the tick itself.
+        """
+        if self.queried is None or time.monotonic() - self.queried >= self.poll_interval:
+            self.query()
+        if self.idle_since is None:
+            return 0.0
+        return max(0.0, time.monotonic() - self.idle_since)
+
+    def query(self):
+        # Set first, so a failing loginctl is also only retried once per poll_interval
+        self.queried = time.monotonic()
+        self.idle_since = None  # Until loginctl answers, count the user as active
+        result = subprocess.run(
+            ["loginctl", "show-session", self.session_id,
+             "-p", "IdleHint", "-p", "IdleSinceHintMonotonic"],
+            capture_output=True, text=True, timeout=2)
+        if result.returncode != 0:
+            raise OSError(result.stderr.strip() or "loginctl failed")
+        props = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        if props.get("IdleHint") != "yes":
+            self.idle_since = None
+            return
+        # IdleSinceHintMonotonic is CLOCK_MONOTONIC in microseconds, the
+        # same clock as time.monotonic() on Linux
+        self.idle_since = int(props.get("IdleSinceHintMonotonic", 0)) / 1e6
+
+    def close(self):
+        pass
+
+
+class FakeIdleSource:
+    """Idle source driven by hand, for tests and benchmarks"""
+    name = "fake"
+    poll_interval = 0.05
+
+    def __init__(self, idle=0.0):
+        self.idle = idle
+
+    def set_idle(self, seconds):
+        self.idle = seconds
+
+    def idle_seconds(self):
+        return self.idle
+
+    def close(self):
+        pass
+
+
+def create_idle_source():
+    """Pick an idle source for this session, or None if none is available"""
+    sources = []
+    if os.environ.get("DISPLAY"):
+        sources.append(X11IdleSource)
+    sources.append(LogindIdleSource)
+    for source in sources:
+        try:
+            return source()
+        except (OSError, subprocess.SubprocessError, ValueError):
+            continue
+    return None
+
+
+class IdleDetector:
+    """Decides whether the user is away, based on a pluggable idle source
+
+    Without a source the user is never considered idle, which matches the
+    tracker's behaviour before idle detection existed.
+    """
+
+    def __init__(self, source=None, threshold=DEFAULT_IDLE_THRESHOLD):
+        self.source = source
+        self.threshold = threshold
+
+    def is_idle(self):
+        if self.source is None:
+            return False
+        try:
+            return self.source.idle_seconds() >= self.threshold
+        except (OSError, subprocess.SubprocessError, ValueError):
+            return False
+
+    def wait_for_activity(self, stop_event):
+        """Block until the user is back, polling only the idle source
+
+        Returns False if stop_event was set while waiting.
+        """
+        while self.is_idle():
+            if stop_event.wait(self.source.poll_interval):
+                return False
+        return True
+
+    def close(self):
+        if self.source:
+            self.source.close()
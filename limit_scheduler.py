@@ -0,0 +1,110 @@
+import time
+from metrics import metrics
+
+DEFAULT_THRESHOLDS = [80, 100]  # Percent of the daily limit; 100+ is a hard limit
+
+
+class LimitScheduler:
+    """Deadline-based limit checks for the active apps
+
+    Instead of comparing usage to the limit on every tick, the scheduler
+    works out when the first active app could cross its next threshold and
+    only re-evaluates once that deadline passes, or when the set of active
+    apps, the limits or the day change. Each threshold fires at most once
+    per day.
+    """
+
+    def __init__(self, data_manager, accumulator, notification_system):
+        self.data_manager = data_manager
+        self.accumulator = accumulator
+        self.notification_system = notification_system
+        self.active_apps = frozenset()
+        self.limits_version = None
+        self.day = None
+        self.deadline = None
+        self.fired = set()  # (app_name, percent) crossed today
+
+    def thresholds(self):
+        """Configured threshold percentages, lowest first"""
+        return sorted(self.data_manager.data["settings"].get("limit_thresholds", DEFAULT_THRESHOLDS))
+
+    def update(self, app_names):
+        """Called once per tick with the apps being credited (possibly none)"""
+        app_names = frozenset(app_names)
+        limits_version = self.data_manager.limits_version
+        if not self.new_day() and (app_names == self.active_apps and limits_version == self.limits_version
+                                   and (self.deadline is None or time.monotonic() < self.deadline)):
+            return
+
+        self.active_apps = app_names
+        self.limits_version = limits_version
+        with metrics.timer("limit_check_seconds"):
+            self.reschedule()
+
+    def new_day(self):
+        """Reset the fired thresholds when the day changes; returns whether it did"""
+        day = self.accumulator.current_day()
+        if day == self.day:
+            return False
+        self.day = day
+        self.fired = set()
+        return True
+
+    def check_now(self, app_names):
+        """Fire thresholds for apps credited outside the tick, e.g. from browser history"""
+        if self.new_day():
+            self.active_apps = frozenset()  # So the next tick reschedules for the new day
+        with metrics.timer("limit_check_seconds"):
+            for app_name in app_names:
+                self.check(app_name)
+
+    def reschedule(self):
+        """Fire any crossed thresholds and set the deadline for the next one"""
+        self.deadline = None
+        for app_name in self.active_apps:
+            remaining = self.check(app_name)
+            if remaining is None:
+                continue
+            deadline = time.monotonic() + remaining
+            if self.deadline is None or deadline < self.deadline:
+                self.deadline = deadline
+
+    def check(self, app_name):
+        """Fire crossed thresholds for one app; return seconds to its next one"""
+        daily_limit = self.data_manager.get_app_limit(app_name)
+        if not daily_limit:
+            return None
+
+        usage = self.accumulator.total(app_name)
+        crossed = None
+        remaining = None
+        for percent in self.thresholds():
+            if (app_name, percent) in self.fired:
+                continue
+            target = daily_limit * 60 * percent / 100  # Convert minutes to seconds
+            if usage < target:
+                # Usage grows by at most one second per second while the
+                # app is active, so this is the earliest it can cross
+                remaining = target - usage
+                break
+            self.fired.add((app_name, percent))
+            crossed = percent
+
+        # If several thresholds were passed at once, only report the highest
+        if crossed is not None:
+            self.notify(app_name, crossed)
+        return remaining
+
+    def notify(self, app_name, percent):
+        if percent >= 100:
+            self.notification_system.show_notification(
+                f"{app_name} Usage Limit",
+                f"You have exceeded your daily limit for {app_name}",
+                key=(app_name, "limit")
+            )
+        else:
+            self.notification_system.show_notification(
+                f"{app_name} Usage Warning",
+                f"You have used {percent}% of your daily limit for {app_name}",
+                key=(app_name, "warning")
+            )
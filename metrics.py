@@ -0,0 +1,216 @@
+import bisect
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "screentime_"
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Cumulative latency histogram in seconds"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Timer:
+    """Context manager that records its duration into a histogram"""
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """Counters, gauges and latency histograms for the tracker's hot paths
+
+    Everything is a no-op until enable() is called, so the instrumentation
+    can stay in place in production.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, value=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def timer(self, name):
+        """Time a block into the named histogram (shared no-op when disabled)"""
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name)
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, value in sorted(self.counters.items()):
+                self._header(lines, name, "counter")
+                lines.append(f"{PREFIX}{name} {value}")
+            for name, value in sorted(self.gauges.items()):
+                self._header(lines, name, "gauge")
+                lines.append(f"{PREFIX}{name} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                self._header(lines, name, "histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{PREFIX}{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}{name}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{PREFIX}{name}_sum {histogram.sum}")
+                lines.append(f"{PREFIX}{name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines, name, kind):
+        if name in self.help:
+            lines.append(f"# HELP {PREFIX}{name} {self.help[name]}")
+        lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+    def write_textfile(self, path):
+        """Atomically write the metrics, e.g. for node_exporter's textfile collector"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def start_textfile_writer(self, path, interval=15.0):
+        """Rewrite the metrics file every interval seconds on a daemon thread"""
+        def loop():
+            while True:
+                self.write_textfile(path)
+                time.sleep(interval)
+        threading.Thread(target=loop, daemon=True).start()
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """Serve /metrics on a local port for Prometheus to scrape"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+class SamplingProfiler:
+    """Samples every thread's stack and dumps collapsed stacks for flame graphs
+
+    The output is one "frame;frame;frame count" line per unique stack, the
+    format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.stacks = Counter()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join()
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while self.running:
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+# Shared registry used by the instrumented modules
+metrics = Metrics()
+metrics.describe("process_scan_seconds", "Time to apply process churn to the PID cache")
+metrics.describe("classify_seconds", "Time to classify a process not found in the memo cache")
+metrics.describe("usage_update_seconds", "Time to hand a usage batch to storage")
+metrics.describe("limit_check_seconds", "Time spent in the limit scheduler per tick")
+metrics.describe("save_seconds", "Time to write limits, settings and usage to storage")
+metrics.describe("ui_refresh_seconds", "Time to refresh the Progress tab")
+metrics.describe("monitor_errors_total", "Exceptions caught in the monitor loop")
+metrics.describe("tracked_processes", "Processes currently held in the PID cache")
+metrics.describe("monitor_idle", "1 while the monitor is sleeping because the user is idle")
+metrics.describe("idle_periods_total", "Times the monitor went to sleep on user idle")
+metrics.describe("browser_visits_total", "Browser history visits read")
+metrics.describe("browser_ingest_seconds", "Time to read new visits from every browser profile")
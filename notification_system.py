@@ -1,19 +1,131 @@
-from tkinter import messagebox
-import platform
-import os
+import shutil
+import subprocess
+import threading
+import time
+
+DEFAULT_RATE_LIMIT = 60.0  # Seconds between notifications with the same key
+
+
+class LogBackend:
+    """Writes notifications to stdout"""
+    name = "log"
+
+    def display(self, title, message):
+        print(f"{title}: {message}", flush=True)
+
+
+class DesktopBackend:
+    """freedesktop notifications via notify-send, or gdbus when it's missing
+
+    The helper is started without waiting for it, so a slow notification
+    daemon never holds up the caller.
+    """
+    name = "desktop"
 
-class NotificationSystem:
     def __init__(self):
-        self.system = platform.system()
+        self.notify_send = shutil.which("notify-send")
+        self.gdbus = shutil.which("gdbus")
+        if not self.notify_send and not self.gdbus:
+            raise OSError("neither notify-send nor gdbus is available")
+        self.children = []
+
+    def display(self, title, message):
+        if self.notify_send:
+            command = [self.notify_send, "--app-name=Digital Wellness Trainer", title, message]
+        else:
+            command = [self.gdbus, "call", "--session",
+                       "--dest", "org.freedesktop.Notifications",
+                       "--object-path", "/org/freedesktop/Notifications",
+                       "--method", "org.freedesktop.Notifications.Notify",
+                       "Digital Wellness Trainer", "0", "", title, message, "[]", "{}", "-1"]
+        # Reap helpers from earlier notifications
+        self.children = [child for child in self.children if child.poll() is None]
+        self.children.append(subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+
+
+class TkToastBackend:
+    """Non-modal toast in the corner of the screen; must run on the Tk thread"""
+    name = "toast"
+
+    def __init__(self, root, duration=8000):
+        self.root = root
+        self.duration = duration
+        self.toasts = []
+
+    def display(self, title, message):
+        import tkinter as tk
+        from ui_components import CustomStyle
+
+        toast = tk.Toplevel(self.root)
+        toast.overrideredirect(True)
+        toast.attributes("-topmost", True)
+        toast.configure(bg=CustomStyle.ACCENT_COLOR)
+        frame = tk.Frame(toast, bg=CustomStyle.CARD_BG, padx=14, pady=10)
+        frame.pack(padx=2, pady=2)
+        tk.Label(frame, text=title, bg=CustomStyle.CARD_BG, fg=CustomStyle.PRIMARY_COLOR,
+                 font=(CustomStyle.FONT_FAMILY, 12, "bold")).pack(anchor='w')
+        tk.Label(frame, text=message, bg=CustomStyle.CARD_BG, fg=CustomStyle.TEXT_COLOR,
+                 font=(CustomStyle.FONT_FAMILY, 10), justify='left', wraplength=320).pack(anchor='w')
+        toast.bind("<Button-1>", lambda event: self.dismiss(toast))
+        self.toasts.append(toast)
+        self.layout()
+        toast.after(self.duration, lambda: self.dismiss(toast))
+
+    def layout(self):
+        """Stack the open toasts upwards from the bottom-right corner"""
+        bottom = self.root.winfo_screenheight() - 60
+        for toast in reversed(self.toasts):
+            toast.update_idletasks()
+            width, height = toast.winfo_reqwidth(), toast.winfo_reqheight()
+            bottom -= height + 10
+            toast.geometry(f"+{self.root.winfo_screenwidth() - width - 20}+{bottom}")
+
+    def dismiss(self, toast):
+        if toast in self.toasts:
+            self.toasts.remove(toast)
+            toast.destroy()
+            self.layout()
+
+
+def create_backend(name, root=None):
+    """Backend named in settings ("toast", "desktop" or "log")"""
+    if name == "desktop":
+        try:
+            return DesktopBackend()
+        except OSError as e:
+            print(f"Desktop notifications unavailable ({e}); using the in-app toast")
+    if name == "log" or root is None:
+        return LogBackend()
+    return TkToastBackend(root)
+
+
+class NotificationSystem:
+    """Queues notifications from any thread and delivers them off the caller
+
+    show_notification only records the notification, so the monitor never
+    waits on the user. Notifications with the same key that arrive before
+    the previous one is shown replace it, and each key is shown at most
+    once per rate_limit seconds; the latest text wins.
+    """
+
+    def __init__(self, backend=None, rate_limit=DEFAULT_RATE_LIMIT):
         self.streak_count = 0
+        self.backend = backend
+        self.rate_limit = rate_limit
+        self.lock = threading.Lock()
+        self.pending = {}     # key -> (title, message, coalesced count), oldest first
+        self.last_shown = {}  # key -> monotonic time last delivered
+        self.root = None
 
-    def show_notification(self, title, message):
+    def show_notification(self, title, message, key=None):
         """Show a system notification with gamified messages"""
-        self.streak_count += 1
+        with self.lock:
+            self.streak_count += 1
+            streak_count = self.streak_count
 
         # Add gaming-inspired elements to the message
         emojis = ["🎮", "⭐", "🏆", "🌟", "💪", "🎯"]
-        emoji = emojis[self.streak_count % len(emojis)]
+        emoji = emojis[streak_count % len(emojis)]
 
         gamified_title = f"{emoji} {title}"
 
@@ -26,7 +138,58 @@ class NotificationSystem:
             "You're on a streak! Keep it up!"
         ]
 
-        gamified_message = f"{message}\n\n{motivational_messages[self.streak_count % len(motivational_messages)]}"
+        gamified_message = f"{message}\n\n{motivational_messages[streak_count % len(motivational_messages)]}"
+
+        key = key or title
+        with self.lock:
+            count = self.pending[key][2] + 1 if key in self.pending else 1
+            self.pending[key] = (gamified_title, gamified_message, count)
+
+    def drain(self):
+        """Deliver queued notifications that are past their rate limit"""
+        now = time.monotonic()
+        due = []
+        with self.lock:
+            for key, notification in list(self.pending.items()):
+                if now - self.last_shown.get(key, float("-inf")) >= self.rate_limit:
+                    due.append(notification)
+                    del self.pending[key]
+                    self.last_shown[key] = now
+        for title, message, count in due:
+            if count > 1:
+                message += f"\n\n({count - 1} earlier update{'s' if count > 2 else ''} merged)"
+            try:
+                self.display(title, message)
+            except Exception as e:
+                print(f"Error showing notification: {e}")
+
+    def display(self, title, message):
+        """Present a finished notification to the user"""
+        self.backend.display(title, message)
+
+    def attach(self, root, interval=250):
+        """Drain the queue on the Tk thread every interval milliseconds"""
+        self.root = root
+        if self.backend is None:
+            self.backend = TkToastBackend(root)
+
+        def poll():
+            self.drain()
+            root.after(interval, poll)
+        root.after(interval, poll)
+
+    def start(self, interval=1.0):
+        """Drain the queue on a daemon thread, for use without Tk"""
+        if self.backend is None:
+            self.backend = LogBackend()
+
+        def loop():
+            while True:
+                self.drain()
+                time.sleep(interval)
+        threading.Thread(target=loop, daemon=True).start()
 
-        # Use tkinter messagebox for all platforms in Replit environment
-        messagebox.showinfo(gamified_title, gamified_message)
\ No newline at end of file
+class ConsoleNotificationSystem(NotificationSystem):
+    """Notification system for headless mode that writes to stdout"""
+    def __init__(self, rate_limit=DEFAULT_RATE_LIMIT):
+        super().__init__(LogBackend(), rate_limit)
@@ -0,0 +1,258 @@
+import socket
+import struct
+import time
+import psutil
+from metrics import metrics
+
+# Linux process events connector (see linux/connector.h and linux/cn_proc.h)
+NETLINK_CONNECTOR = 11
+CN_IDX_PROC = 1
+CN_VAL_PROC = 1
+PROC_CN_MCAST_LISTEN = 1
+PROC_CN_MCAST_IGNORE = 2
+PROC_EVENT_FORK = 0x00000001
+PROC_EVENT_EXEC = 0x00000002
+PROC_EVENT_EXIT = 0x80000000
+NLMSG_DONE = 3
+
+NLMSG_HEADER = struct.Struct("=IHHII")
+CN_MSG_HEADER = struct.Struct("=IIIIHH")
+PROC_EVENT_HEADER = struct.Struct("=IIQ")
+PID_PAIR = struct.Struct("=II")
+
+
+def read_last_pid():
+    """The PID the kernel handed out most recently, or None off Linux"""
+    try:
+        with open("/proc/sys/kernel/ns_last_pid", 'rb') as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+class PollingBackend:
+    """Fallback backend that diffs the PID table between ticks
+
+    A PID that survives a poll may belong to a new process if it was freed
+    and handed out again in between. PIDs are allocated in increasing order
+    until they wrap, so only known PIDs the allocator has passed since the
+    last poll can have been reused; those started after the last poll are
+    reported like an exec. Without ns_last_pid, surviving PIDs' create
+    times are compared instead, but only on polls where PIDs appeared or
+    exited. A PID freed and handed straight back leaves the set unchanged;
+    its stale create time still catches it on the next poll that changes.
+    """
+    name = "polling"
+
+    def __init__(self, provider=psutil, last_pid=read_last_pid):
+        self.provider = provider
+        self.last_pid = last_pid
+        self.previous_last_pid = None
+        self.previous_poll = None
+        self.known = set()
+        self.create_times = {}  # pid -> create time, only kept when there's no ns_last_pid
+
+    def poll(self):
+        """Return (new, exited, exec'd) PID sets since the previous poll"""
+        now = time.time()
+        last_pid = self.last_pid()  # Read first, so PIDs allocated during the scan are rechecked next time
+        current = set(self.provider.pids())
+        new = current - self.known
+        exited = self.known - current
+
+        if last_pid is None:
+            reused = self._reused_by_create_time(current, new, exited)
+        elif self.previous_last_pid is None:
+            reused = set()
+        else:
+            start, end = self.previous_last_pid, last_pid
+            if 0 <= end - start < len(self.known):
+                reused = current.intersection(range(start + 1, end + 1))
+            elif end >= start:
+                reused = {pid for pid in current if start < pid <= end}
+            else:
+                reused = {pid for pid in current if pid > start or pid <= end}  # Wrapped
+            # Long-lived PIDs the allocator skipped over are in the range too
+            reused = {pid for pid in reused & self.known if self._started_since(pid, self.previous_poll)}
+        self.previous_last_pid = last_pid
+        self.previous_poll = now
+        self.known = current
+        return new, exited, reused
+
+    def _started_since(self, pid, timestamp):
+        try:
+            # create_time has clock-tick resolution, so allow for rounding
+            return self.provider.Process(pid).create_time() >= timestamp - 0.1
+        except psutil.Error:
+            return False
+
+    def _reused_by_create_time(self, current, new, exited):
+        if not new and not exited and self.create_times:
+            return set()  # Keep the old create times to compare against later
+        create_times = {}
+        reused = set()
+        for pid in current:
+            try:
+                create_times[pid] = self.provider.Process(pid).create_time()
+            except psutil.Error:
+                continue
+            if pid in self.create_times and create_times[pid] != self.create_times[pid]:
+                reused.add(pid)
+        self.create_times = create_times
+        return reused
+
+    def close(self):
+        pass
+
+
+class ProcConnectorBackend:
+    """Event-driven backend using the kernel's netlink process connector"""
+    name = "proc_connector"
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_CONNECTOR)
+        try:
+            self.sock.bind((0, CN_IDX_PROC))
+            self._send_control(PROC_CN_MCAST_LISTEN)
+            self.sock.setblocking(False)
+        except OSError:
+            self.sock.close()
+            raise
+        self.fallback = PollingBackend()
+        self.needs_resync = True
+
+    def _send_control(self, op):
+        payload = struct.pack("=I", op)
+        cn_msg = CN_MSG_HEADER.pack(CN_IDX_PROC, CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+        header = NLMSG_HEADER.pack(NLMSG_HEADER.size + len(cn_msg), NLMSG_DONE, 0, 0, 0)
+        self.sock.send(header + cn_msg)
+
+    def poll(self):
+        """Return (new, exited, exec'd) PID sets from queued kernel events"""
+        new, exited, execd = set(), set(), set()
+        while True:
+            try:
+                packet = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS: the kernel dropped events, so rescan once
+                self.needs_resync = True
+                continue
+            self._parse(packet, new, exited, execd)
+
+        if self.needs_resync:
+            # The full table scan doubles as the initial snapshot
+            self.needs_resync = False
+            return self.fallback.poll()
+
+        # Keep the fallback's view current so a later resync only reports churn
+        self.fallback.known |= new
+        self.fallback.known -= exited
+        return new - exited, exited, execd - exited
+
+    def _parse(self, packet, new, exited, execd):
+        offset = 0
+        while offset + NLMSG_HEADER.size <= len(packet):
+            length = NLMSG_HEADER.unpack_from(packet, offset)[0]
+            if length < NLMSG_HEADER.size:
+                break
+            event_offset = offset + NLMSG_HEADER.size + CN_MSG_HEADER.size
+            if event_offset + PROC_EVENT_HEADER.size <= offset + length:
+                what = PROC_EVENT_HEADER.unpack_from(packet, event_offset)[0]
+                data_offset = event_offset + PROC_EVENT_HEADER.size
+                if what == PROC_EVENT_FORK:
+                    # parent pid/tgid come first, then child pid/tgid
+                    pid, tgid = PID_PAIR.unpack_from(packet, data_offset + PID_PAIR.size)
+                    if pid == tgid:
+                        new.add(tgid)
+                        exited.discard(tgid)
+                elif what == PROC_EVENT_EXEC:
+                    pid, tgid = PID_PAIR.unpack_from(packet, data_offset)
+                    execd.add(tgid)
+                elif what == PROC_EVENT_EXIT:
+                    pid, tgid = PID_PAIR.unpack_from(packet, data_offset)
+                    if pid == tgid:
+                        exited.add(tgid)
+                        new.discard(tgid)
+                        execd.discard(tgid)
+            offset += (length + 3) & ~3
+
+    def close(self):
+        try:
+            self._send_control(PROC_CN_MCAST_IGNORE)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def create_backend():
+    """Pick the cheapest process discovery backend available on this host"""
+    if hasattr(socket, "AF_NETLINK"):
+        try:
+            return ProcConnectorBackend()
+        except OSError:
+            pass  # Needs CAP_NET_ADMIN; fall back to polling
+    return PollingBackend()
+
+
+class ProcessTracker:
+    """PID-keyed cache of classified processes, updated from process churn"""
+
+    def __init__(self, classify, backend=None, provider=psutil):
+        self.classify = classify
+        self.backend = backend or create_backend()
+        self.provider = provider  # psutil, or a fake process table in benchmarks
+        self.processes = {}  # pid -> (process_name, app_name) or None
+        self.matched = {}    # pid -> (process_name, app_name), matches only
+
+    def refresh(self):
+        """Apply process churn since the last tick to the cache"""
+        with metrics.timer("process_scan_seconds"):
+            new, exited, execd = self.backend.poll()
+
+            for pid in exited:
+                self.processes.pop(pid, None)
+                self.matched.pop(pid, None)
+
+            for pid in new | execd:
+                self._classify_pid(pid)
+        metrics.set("tracked_processes", len(self.processes))
+
+    def _classify_pid(self, pid):
+        try:
+            proc = self.provider.Process(pid)
+            with proc.oneshot():
+                name = proc.name()
+                try:
+                    cmdline = proc.cmdline()
+                except psutil.AccessDenied:
+                    cmdline = []
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            self.processes.pop(pid, None)
+            self.matched.pop(pid, None)
+            return
+        except psutil.AccessDenied:
+            name, cmdline = "", []
+
+        result = self.classify(name or "", cmdline or [])
+        self.processes[pid] = result
+        if result:
+            self.matched[pid] = result
+        else:
+            self.matched.pop(pid, None)
+
+    def reclassify(self):
+        """Re-run classification for every cached PID, e.g. after rules change"""
+        for pid in list(self.processes):
+            self._classify_pid(pid)
+
+    def apps(self):
+        """Return {app_name: [pid, ...]} for every running tracked app"""
+        apps = {}
+        for pid, (process_name, app_name) in self.matched.items():
+            apps.setdefault(app_name, []).append(pid)
+        return apps
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,134 @@
+"""Retention policy: full detail for recent days, coarser totals for older ones
+
+Usage older than the detail window is folded onto one day per week, and
+usage older than the weekly window onto the first of each month. A weekly
+bucket never spans two months (its day is the later of the Monday and the
+1st), so the weekly fold leaves both ISO-week and month totals unchanged.
+The monthly fold only keeps month totals: past the weekly window, a
+week's total is whatever days of it were folded in with a 1st, so weekly
+charts reaching back further than that (two years by default) show one
+spike per month. Recent days, and with them get_weekly_usage and the
+30-day chart, are never touched.
+
+Apps with no limit that aren't tracked by default and haven't been used
+within the detail window are dropped entirely.
+
+Passes run on a background thread and take the data lock one app at a
+time, so the monitor only ever waits for a single app's fold. Only days
+that crossed a window boundary since the previous pass are revisited;
+the first pass after startup covers the whole history.
+"""
+import threading
+from datetime import date, timedelta
+
+DEFAULT_DETAIL_DAYS = 90
+DEFAULT_WEEKLY_DAYS = 730  # Weekly charts stay exact this far back
+MIN_DETAIL_DAYS = 31  # Keeps the 30-day chart and get_weekly_usage at day detail
+RETENTION_INTERVAL = 3600.0
+START_DELAY = 60.0  # Let startup and the first chart finish before the first pass
+
+
+def week_bucket(day):
+    """Monday of the day's week, or the 1st if the month starts later in the week"""
+    return max(day - timedelta(days=day.weekday()), day.replace(day=1))
+
+
+def month_bucket(day):
+    return day.replace(day=1)
+
+
+class RetentionPolicy:
+    """Which day an entry on a given date is kept under, as of today"""
+
+    def __init__(self, detail_days=DEFAULT_DETAIL_DAYS, weekly_days=DEFAULT_WEEKLY_DAYS, today=None):
+        detail_days = max(detail_days, MIN_DETAIL_DAYS)
+        weekly_days = max(weekly_days, detail_days)
+        self.today = today or date.today()
+        self.detail_days = detail_days
+        self.detail_cutoff = self.today - timedelta(days=detail_days - 1)  # First day kept in full
+        self.weekly_cutoff = self.today - timedelta(days=weekly_days - 1)  # First day kept weekly
+
+    @classmethod
+    def from_settings(cls, settings, today=None):
+        return cls(settings.get("retention_detail_days", DEFAULT_DETAIL_DAYS),
+                   settings.get("retention_weekly_days", DEFAULT_WEEKLY_DAYS), today)
+
+    def bucket(self, date_str):
+        """"YYYY-MM-DD" key the usage on date_str is folded onto"""
+        day = date.fromisoformat(date_str)
+        if day >= self.detail_cutoff:
+            return date_str
+        if day >= self.weekly_cutoff:
+            return week_bucket(day).isoformat()
+        return month_bucket(day).isoformat()
+
+    def ranges(self, previous=None):
+        """[(start, end)] date ranges that need folding since a previous policy
+
+        A range starts on a bucket boundary, so buckets that were partly
+        folded last time are completed rather than split.
+        """
+        if previous is None:
+            return [(date.min.isoformat(), (self.detail_cutoff - timedelta(days=1)).isoformat())]
+        ranges = []
+        for start, end in ((month_bucket(previous.weekly_cutoff), self.weekly_cutoff),
+                           (week_bucket(previous.detail_cutoff), self.detail_cutoff)):
+            if start < end:
+                ranges.append((start.isoformat(), (end - timedelta(days=1)).isoformat()))
+        return ranges
+
+
+class RetentionEngine:
+    """Applies the retention policy to a DataManager in the background"""
+
+    def __init__(self, data_manager, keep_apps=(), downsample=True, interval=RETENTION_INTERVAL):
+        self.data_manager = data_manager
+        self.keep_apps = set(keep_apps)  # Tracked by default, so never orphaned
+        # Synced devices max-merge per day, so folded days would be counted twice there
+        self.downsample = downsample
+        self.interval = interval
+        self.previous = None  # Policy applied by the last pass
+        self.stop_event = threading.Event()
+
+    def run_once(self, today=None):
+        """One incremental pass; returns (apps folded, apps pruned)"""
+        settings = self.data_manager.data["settings"]
+        policy = RetentionPolicy.from_settings(settings, today)
+        if self.previous and (policy.detail_cutoff, policy.weekly_cutoff) == \
+                (self.previous.detail_cutoff, self.previous.weekly_cutoff):
+            return 0, 0  # Nothing crossed a boundary since the last pass
+        ranges = policy.ranges(self.previous) if self.downsample else []
+        folded = pruned = 0
+        for app_name in self.data_manager.get_usage_apps():
+            if self.stop_event.is_set():
+                return folded, pruned  # The next pass starts over from self.previous
+            if settings.get("retention_prune_orphans", True) and self.is_orphan(app_name, policy):
+                self.data_manager.prune_app(app_name)
+                pruned += 1
+                continue
+            for start, end in ranges:
+                if self.data_manager.downsample_usage(app_name, start, end, policy.bucket):
+                    folded += 1
+        self.previous = policy
+        return folded, pruned
+
+    def is_orphan(self, app_name, policy):
+        if app_name in self.keep_apps or app_name in self.data_manager.data["limits"]:
+            return False
+        return not any(self.data_manager.get_usage_range(app_name, policy.detail_days).values())
+
+    def start(self, delay=START_DELAY):
+        def loop():
+            if self.stop_event.wait(delay):
+                return
+            while True:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"Error applying retention policy: {e}")
+                if self.stop_event.wait(self.interval):
+                    return
+        threading.Thread(target=loop, daemon=True).start()
+
+    def stop(self):
+        self.stop_event.set()
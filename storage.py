@@ -0,0 +1,401 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from history_file import HistoryFile, import_json, write_history_file
+from usage_journal import UsageJournal
+from usage_store import ColumnarUsage, DaySeries, day_key, epoch_day, json_default
+
+
+def default_data():
+    """Empty data structure for a fresh install"""
+    return {
+        "usage": {},
+        "limits": {},
+        "settings": {
+            "notification_enabled": True
+        }
+    }
+
+
+def create_storage(data_file, flush_interval=5.0):
+    """Pick a storage backend from the data file's extension"""
+    extension = os.path.splitext(data_file)[1]
+    if extension in (".db", ".sqlite", ".sqlite3"):
+        return SQLiteStorage(data_file, flush_interval=flush_interval)
+    if extension == ".hist":
+        return BinaryStorage(data_file, flush_interval=flush_interval)
+    return JsonStorage(data_file, flush_interval=flush_interval)
+
+
+class JsonStorage:
+    """JSON snapshot plus append-only journal, with all usage held in memory
+
+    Usage is kept as a ColumnarUsage rather than nested dicts; it still
+    reads like one through data["usage"].
+    """
+
+    def __init__(self, data_file, flush_interval=5.0):
+        self.data_file = data_file
+        self.journal = UsageJournal(data_file + ".journal", flush_interval=flush_interval)
+        self.data = None
+
+    def load(self):
+        """Load the snapshot and replay the journal on top of it"""
+        if os.path.exists(self.data_file):
+            try:
+                with open(self.data_file, 'r') as f:
+                    self.data = json.load(f)
+            except:
+                self.data = default_data()
+        else:
+            self.data = default_data()
+        self.data["usage"] = ColumnarUsage(self.data.get("usage"))
+
+        snapshot_generation = self.data.get("journal_generation", 0)
+        if self.journal.replay(self.data["usage"], snapshot_generation):
+            # Fold replayed increments (or a torn/stale journal) into a fresh snapshot
+            self.save(self.data)
+        return self.data
+
+    def save(self, data):
+        """Write a full snapshot atomically and start a new journal generation"""
+        data["journal_generation"] = self.journal.generation
+        tmp_file = self.data_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            # One-shot dumps runs the C encoder; json.dump would use the Python one
+            f.write(json.dumps(data, default=json_default))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.data_file)
+        self.journal.rotate()
+
+    def flush(self):
+        """Persist buffered usage; compacts the journal once it grows large"""
+        self.journal.flush()
+        if self.journal.needs_compaction():
+            self.save(self.data)
+
+    def due(self):
+        """Whether buffered usage is older than the flush interval"""
+        return self.journal.due()
+
+    def close(self, data):
+        self.save(data)
+        self.journal.close()
+
+    def add_usage(self, app_name, date, seconds):
+        self.data["usage"].add(app_name, date, seconds)
+        self.journal.append(app_name, date, seconds)
+
+    def get_usage(self, app_name, date):
+        return self.data["usage"].get_seconds(app_name, date)
+
+    def get_usage_range(self, app_name, start_date, end_date):
+        """Usage per date for start_date <= date <= end_date (missing days omitted)"""
+        return self.data["usage"].get_range(app_name, start_date, end_date)
+
+    def apps(self):
+        return list(self.data["usage"].keys())
+
+    def iter_usage(self):
+        """Yield every (app_name, date, seconds) entry"""
+        return self.data["usage"].rows()
+
+    def replace_usage(self, app_name, start_date, end_date, usage):
+        """Clear an app's days in [start_date, end_date], then add {date: seconds}"""
+        columnar = self.data["usage"]
+        app_id = columnar.app_id(app_name)
+        if app_id is not None:
+            series = columnar.app_series(app_id)
+            for day, _ in list(series.items(epoch_day(start_date), epoch_day(end_date))):
+                series.set(day, 0)
+        for date, seconds in usage.items():
+            columnar.add(app_name, date, seconds)
+        # Like remove_app this is only made durable by the next snapshot
+
+    def remove_app(self, app_name):
+        self.data["usage"].pop(app_name, None)
+
+
+class BinaryStorage:
+    """mmap'd binary history file plus the usage journal for new increments
+
+    Startup reads only the file's header and app index. New usage goes to
+    the journal and a small in-memory overlay; the file itself is only
+    rewritten on save or journal compaction.
+    """
+
+    def __init__(self, history_file, flush_interval=5.0, migrate_from=None):
+        self.history_file = history_file
+        self.migrate_from = migrate_from
+        self.journal = UsageJournal(history_file + ".journal", flush_interval=flush_interval)
+        self.history = None
+        self.overlay = ColumnarUsage()  # Usage added since the file was written
+        self.removed = set()            # Apps whose on-disk history is dropped
+        self.data = None
+
+    def load(self):
+        """Map the history file, importing the sibling .json on first run"""
+        migrate_from = self.migrate_from
+        if migrate_from is None:
+            migrate_from = os.path.splitext(self.history_file)[0] + ".json"
+        if not os.path.exists(self.history_file) and os.path.exists(migrate_from):
+            import_json(migrate_from, self.history_file)
+
+        self.data = default_data()
+        del self.data["usage"]
+        snapshot_generation = 0
+        if os.path.exists(self.history_file):
+            self.history = HistoryFile(self.history_file)
+            self.data["limits"].update(self.history.meta.get("limits", {}))
+            self.data["settings"].update(self.history.meta.get("settings", {}))
+            snapshot_generation = self.history.meta.get("journal_generation", 0)
+
+        if self.journal.replay(self.overlay, snapshot_generation):
+            self.save(self.data)
+        return self.data
+
+    def save(self, data):
+        """Rewrite the history file with the overlay folded in"""
+        if (self.history is not None and not self.overlay and not self.removed
+                and self.history.meta.get("limits") == data["limits"]
+                and self.history.meta.get("settings") == data["settings"]):
+            return  # The file is already current
+        meta = {
+            "limits": data["limits"],
+            "settings": data["settings"],
+            "journal_generation": self.journal.generation
+        }
+        write_history_file(self.history_file, {app_name: self.series(app_name) for app_name in self.apps()}, meta)
+        old_history, self.history = self.history, HistoryFile(self.history_file)
+        if old_history:
+            old_history.close()
+        self.overlay = ColumnarUsage()
+        self.removed = set()
+        self.journal.rotate()
+
+    def flush(self):
+        """Persist buffered usage; compacts the journal once it grows large"""
+        self.journal.flush()
+        if self.journal.needs_compaction():
+            self.save(self.data)
+
+    def due(self):
+        """Whether buffered usage is older than the flush interval"""
+        return self.journal.due()
+
+    def close(self, data):
+        self.save(data)
+        self.journal.close()
+        self.history.close()
+
+    def _on_disk(self, app_name):
+        return self.history is not None and app_name not in self.removed
+
+    def series(self, app_name):
+        """An app's full history (file plus overlay) as a DaySeries"""
+        series = self.history.series(app_name) if self._on_disk(app_name) else DaySeries()
+        if app_name in self.overlay:
+            for date, seconds in self.overlay[app_name].items():
+                series.add(epoch_day(date), seconds)
+        return series
+
+    def add_usage(self, app_name, date, seconds):
+        self.overlay.add(app_name, date, seconds)
+        self.journal.append(app_name, date, seconds)
+
+    def get_usage(self, app_name, date):
+        stored = self.history.get(app_name, epoch_day(date)) if self._on_disk(app_name) else 0
+        return stored + self.overlay.get_seconds(app_name, date)
+
+    def get_usage_range(self, app_name, start_date, end_date):
+        """Usage per date for start_date <= date <= end_date (missing days omitted)"""
+        usage = {}
+        if self._on_disk(app_name):
+            base, seconds = self.history.days(app_name, epoch_day(start_date), epoch_day(end_date))
+            usage = {day_key(base + offset): value for offset, value in enumerate(seconds) if value}
+        for date, seconds in self.overlay.get_range(app_name, start_date, end_date).items():
+            usage[date] = usage.get(date, 0) + seconds
+        return usage
+
+    def apps(self):
+        apps = [app_name for app_name in self.history.apps() if app_name not in self.removed] if self.history else []
+        return apps + [app_name for app_name in self.overlay if not (self._on_disk(app_name) and app_name in self.history.index)]
+
+    def iter_usage(self):
+        """Yield every (app_name, date, seconds) entry"""
+        for app_name in self.apps():
+            for day, seconds in self.series(app_name).items():
+                yield app_name, day_key(day), seconds
+
+    def replace_usage(self, app_name, start_date, end_date, usage):
+        """Clear an app's days in [start_date, end_date], then add {date: seconds}
+
+        The file can't be edited in place, so the app's whole history moves
+        to the overlay until the next save.
+        """
+        series = self.series(app_name)
+        for day, _ in list(series.items(epoch_day(start_date), epoch_day(end_date))):
+            series.set(day, 0)
+        for date, seconds in usage.items():
+            series.add(epoch_day(date), seconds)
+        self.overlay[app_name] = series
+        self.removed.add(app_name)
+
+    def remove_app(self, app_name):
+        self.overlay.pop(app_name, None)
+        self.removed.add(app_name)
+
+
+class SQLiteStorage:
+    """SQLite backend: usage rows keyed by (app, day), limits and settings tables
+
+    Usage upserts run inside an open transaction that is committed once per
+    flush interval, so WAL writes are grouped the same way as the journal.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS usage (
+            app TEXT NOT NULL,
+            day TEXT NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY (app, day)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS limits (
+            app TEXT PRIMARY KEY,
+            minutes INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    # Statements are kept as constants so sqlite3's statement cache reuses them
+    UPSERT_USAGE = ("INSERT INTO usage (app, day, seconds) VALUES (?, ?, ?) "
+                    "ON CONFLICT (app, day) DO UPDATE SET seconds = seconds + excluded.seconds")
+    SELECT_USAGE = "SELECT seconds FROM usage WHERE app = ? AND day = ?"
+    SELECT_RANGE = "SELECT day, seconds FROM usage WHERE app = ? AND day BETWEEN ? AND ?"
+    SELECT_APPS = "SELECT DISTINCT app FROM usage"
+    SELECT_ALL = "SELECT app, day, seconds FROM usage"
+    DELETE_APP = "DELETE FROM usage WHERE app = ?"
+    DELETE_RANGE = "DELETE FROM usage WHERE app = ? AND day BETWEEN ? AND ?"
+
+    def __init__(self, db_file, flush_interval=5.0, migrate_from=None):
+        self.db_file = db_file
+        self.flush_interval = flush_interval
+        self.migrate_from = migrate_from
+        self.lock = threading.RLock()
+        self.last_commit = time.monotonic()
+        self.app_names = set()
+        self.conn = None
+
+    def load(self):
+        """Open the database, importing the JSON file the first time"""
+        is_new = not os.path.exists(self.db_file)
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+        migrate_from = self.migrate_from
+        if migrate_from is None:
+            migrate_from = os.path.splitext(self.db_file)[0] + ".json"
+        if is_new and os.path.exists(migrate_from):
+            self.import_json(migrate_from)
+
+        data = default_data()
+        del data["usage"]
+        for app_name, minutes in self.conn.execute("SELECT app, minutes FROM limits"):
+            data["limits"][app_name] = minutes
+        for key, value in self.conn.execute("SELECT key, value FROM settings"):
+            data["settings"][key] = json.loads(value)
+        self.app_names = {row[0] for row in self.conn.execute(self.SELECT_APPS)}
+        return data
+
+    def import_json(self, json_file):
+        """Copy a JSON snapshot (and its journal) into the database"""
+        source = JsonStorage(json_file)
+        data = source.load()
+        source.journal.close()
+        with self.lock, self.conn:
+            self.conn.executemany(self.UPSERT_USAGE, source.iter_usage())
+            self._write_meta(data)
+
+    def _write_meta(self, data):
+        self.conn.execute("DELETE FROM limits")
+        self.conn.executemany("INSERT INTO limits (app, minutes) VALUES (?, ?)",
+                              data["limits"].items())
+        self.conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                              ((key, json.dumps(value)) for key, value in data["settings"].items()))
+
+    def save(self, data):
+        """Write limits and settings, committing any pending usage with them"""
+        with self.lock, self.conn:
+            self._write_meta(data)
+        self.last_commit = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            self.conn.commit()
+        self.last_commit = time.monotonic()
+
+    def due(self):
+        """Whether uncommitted usage is older than the flush interval"""
+        return self.conn.in_transaction and time.monotonic() - self.last_commit >= self.flush_interval
+
+    def close(self, data):
+        self.save(data)
+        with self.lock:
+            self.conn.close()
+
+    def add_usage(self, app_name, date, seconds):
+        with self.lock:
+            self.conn.execute(self.UPSERT_USAGE, (app_name, date, seconds))
+        self.app_names.add(app_name)
+
+    def get_usage(self, app_name, date):
+        with self.lock:
+            row = self.conn.execute(self.SELECT_USAGE, (app_name, date)).fetchone()
+        return row[0] if row else 0
+
+    def get_usage_range(self, app_name, start_date, end_date):
+        """Usage per date for start_date <= date <= end_date (missing days omitted)"""
+        with self.lock:
+            return dict(self.conn.execute(self.SELECT_RANGE, (app_name, start_date, end_date)))
+
+    def apps(self):
+        return list(self.app_names)
+
+    def iter_usage(self):
+        """Yield every (app_name, date, seconds) entry"""
+        with self.lock:
+            rows = self.conn.execute(self.SELECT_ALL).fetchall()
+        return iter(rows)
+
+    def replace_usage(self, app_name, start_date, end_date, usage):
+        """Clear an app's days in [start_date, end_date], then add {date: seconds}"""
+        with self.lock:
+            self.conn.execute(self.DELETE_RANGE, (app_name, start_date, end_date))
+            self.conn.executemany(self.UPSERT_USAGE, ((app_name, date, seconds) for date, seconds in usage.items()))
+
+    def remove_app(self, app_name):
+        with self.lock:
+            self.conn.execute(self.DELETE_APP, (app_name,))
+        self.app_names.discard(app_name)
+
+
+if __name__ == "__main__":
+    # Usage: python storage.py usage_data.json usage_data.db
+    if len(sys.argv) != 3:
+        print("usage: python storage.py <source.json> <target.db>")
+        sys.exit(1)
+    if os.path.exists(sys.argv[2]):
+        print(f"{sys.argv[2]} already exists")
+        sys.exit(1)
+    target = SQLiteStorage(sys.argv[2], migrate_from=sys.argv[1])
+    target.close(target.load())
+    print(f"Migrated {sys.argv[1]} to {sys.argv[2]}")
@@ -0,0 +1,16 @@
+import pytest
+
+
+class RecordingBackend:
+    """Notification backend that keeps the titles it was asked to show"""
+
+    def __init__(self):
+        self.shown = []
+
+    def display(self, title, message):
+        self.shown.append(title)
+
+
+@pytest.fixture
+def recording_backend():
+    return RecordingBackend()
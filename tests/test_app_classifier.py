@@ -0,0 +1,23 @@
+from app_classifier import AppClassifier
+from usage_monitor import TRACKED_APPS
+
+
+def test_short_user_app_does_not_claim_a_longer_match():
+    classifier = AppClassifier()
+    classifier.update_rules(TRACKED_APPS, ["Go"])
+    assert classifier.classify("google-chrome", []) == ("chrome", "Google Chrome")
+    assert classifier.classify("go", []) == ("go", "Go")
+
+
+def test_longest_keyword_wins_at_the_same_offset():
+    classifier = AppClassifier()
+    classifier.update_rules({"msedge": "Microsoft Edge", "msedgewebview": "Edge WebView"})
+    assert classifier.classify("msedgewebview2", []) == ("msedgewebview", "Edge WebView")
+    assert classifier.classify("msedge", []) == ("msedge", "Microsoft Edge")
+
+
+def test_longest_site_wins_in_the_cmdline():
+    classifier = AppClassifier()
+    classifier.update_rules({"chrome": "Google Chrome", "youtube": "YouTube"}, ["tube.com"])
+    cmdline = ["/usr/bin/chrome", "https://www.youtube.com/watch"]
+    assert classifier.classify("chrome", cmdline) == ("youtube", "YouTube")
@@ -0,0 +1,64 @@
+import sqlite3
+from datetime import datetime
+import pytest
+from browser_history import CHROMIUM_EPOCH_OFFSET, BrowserHistoryIngester
+from data_manager import DataManager
+from notification_system import NotificationSystem
+from usage_monitor import UsageMonitor
+
+
+def chromium_time(timestamp):
+    return int((timestamp + CHROMIUM_EPOCH_OFFSET) * 1000000)
+
+
+def make_chromium_history(path, visits):
+    """History database with Chromium's urls/visits tables; visits are (url, start, seconds)"""
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT)")
+    db.execute("CREATE TABLE visits (id INTEGER PRIMARY KEY, url INTEGER, visit_time INTEGER, visit_duration INTEGER)")
+    for url, started, seconds in visits:
+        url_id = db.execute("INSERT INTO urls (url) VALUES (?)", (url,)).lastrowid
+        db.execute("INSERT INTO visits (url, visit_time, visit_duration) VALUES (?, ?, ?)",
+                   (url_id, chromium_time(started), seconds * 1000000))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def noon():
+    return datetime.now().replace(hour=12, minute=0, second=0, microsecond=0).timestamp()
+
+
+def test_ingest_credits_tracked_sites_once(tmp_path, noon):
+    history = str(tmp_path / "History")
+    make_chromium_history(history, [("https://www.youtube.com/watch?v=1", noon - 600, 120),
+                                    ("https://example.com/", noon - 400, 300)])
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    ingester = BrowserHistoryIngester(data_manager, lambda: {"youtube.com": "YouTube"},
+                                      str(tmp_path / "state"), profiles=[("chromium", history)])
+
+    today = datetime.fromtimestamp(noon).strftime("%Y-%m-%d")
+    assert ingester.ingest(noon) == {today: {"YouTube": 120}}
+    assert ingester.ingest(noon + 60) == {}
+    assert data_manager.storage.get_usage("YouTube", today) == 120
+    data_manager.close()
+
+
+def test_ingested_site_usage_fires_its_limit(tmp_path, noon, recording_backend):
+    history = str(tmp_path / "History")
+    make_chromium_history(history, [("https://www.youtube.com/watch?v=1", noon - 600, 120)])
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    data_manager.set_app_limit("YouTube", 1)
+    notifications = NotificationSystem(recording_backend)
+    monitor = UsageMonitor(data_manager, notifications)
+    monitor.browser_history.profiles = [("chromium", history)]
+
+    monitor.limit_scheduler.update({})  # A tick with nothing running caches today's totals
+    assert monitor.accumulator.total("YouTube") == 0
+    monitor.browser_history.ingest(noon)
+    monitor.apply_site_credits()
+    notifications.drain()
+
+    assert monitor.accumulator.total("YouTube") == 120
+    assert [title for title in recording_backend.shown if "YouTube Usage Limit" in title]
+    data_manager.close()
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+from device_sync import DeviceMerger, read_device_updates
+
+
+def write_sync_file(device_dir, seq, kind, usage):
+    os.makedirs(device_dir, exist_ok=True)
+    path = os.path.join(device_dir, f"{seq:08d}.{kind}.json.gz")
+    with gzip.open(path, 'wt') as f:
+        json.dump({"device": "other", "seq": seq, "usage": usage}, f)
+    return path
+
+
+def test_unreadable_file_holds_back_the_ones_after_it(tmp_path):
+    device_dir = str(tmp_path / "other")
+    write_sync_file(device_dir, 1, "full", {"YouTube": [[20000, 60]]})
+    partial = write_sync_file(device_dir, 2, "delta", {"YouTube": [[20000, 120]]})
+    write_sync_file(device_dir, 3, "delta", {"YouTube": [[20000, 180]]})
+    with open(partial, 'wb') as f:
+        f.write(b"\x1f\x8b still syncing")
+
+    last_seq, counters = read_device_updates(device_dir, 0)
+    assert last_seq == 1
+    assert counters == {"YouTube": {20000: 60}}
+
+
+def test_merger_picks_up_a_file_once_it_has_synced(tmp_path):
+    device_dir = str(tmp_path / "other")
+    write_sync_file(device_dir, 1, "full", {"YouTube": [[20000, 60]]})
+    partial = os.path.join(device_dir, "00000002.delta.json.gz")
+    with open(partial, 'wb') as f:
+        f.write(b"")
+    write_sync_file(device_dir, 3, "delta", {"Netflix": [[20000, 30]]})
+
+    merger = DeviceMerger(str(tmp_path))
+    merger.refresh()
+    assert merger.seen["other"] == 1
+    assert merger.combined.get_seconds("Netflix", "2024-10-04") == 0
+
+    write_sync_file(device_dir, 2, "delta", {"YouTube": [[20000, 120]]})
+    merger.refresh()
+    assert merger.seen["other"] == 3
+    assert merger.combined.get_seconds("YouTube", "2024-10-04") == 120
+    assert merger.combined.get_seconds("Netflix", "2024-10-04") == 30
+    assert merger.pool is None  # Small deltas never start worker processes
+
+
+def test_client_of_the_local_tracker_never_merges_its_own_device(tmp_path):
+    from data_manager import DataManager
+    from device_sync import CombinedUsage, UsageSync
+    sync_dir = str(tmp_path / "sync")
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    data_manager.update_app_usage("YouTube", 600)
+    UsageSync(data_manager, sync_dir).sync()  # The headless tracker exporting
+
+    client_sync = UsageSync(data_manager, sync_dir, export=False)  # A window attached to it
+    client_sync.sync()
+    combined = CombinedUsage(data_manager, client_sync.merger)
+    assert combined.get_today_usage("YouTube") == 600
+    data_manager.close()
+
+
+def test_own_device_merged_before_its_id_was_saved_is_dropped(tmp_path):
+    from data_manager import DataManager
+    from device_sync import UsageSync
+    sync_dir = str(tmp_path / "sync")
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    data_manager.update_usage_batch({"YouTube": 600}, "2024-10-04")
+    client_sync = UsageSync(data_manager, sync_dir, export=False)
+    assert client_sync.merger.local_device_id is None
+    write_sync_file(str(tmp_path / "sync" / "other"), 1, "full", {"YouTube": [[20000, 60]]})
+
+    exporter_sync = UsageSync(data_manager, sync_dir)
+    exporter_sync.exporter.export()
+    client_sync.merger.refresh()  # Merges this machine's files too
+    assert client_sync.merger.combined.get_seconds("YouTube", "2024-10-04") == 660
+    client_sync.sync()
+    assert client_sync.merger.combined.get_seconds("YouTube", "2024-10-04") == 60
+    data_manager.close()
+
+
+def test_truncated_state_file_does_not_stop_sync(tmp_path):
+    from data_manager import DataManager
+    from device_sync import UsageSync
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    with open(data_manager.data_file + ".sync", 'w') as f:
+        f.write('{"device_id": "lapt')
+    sync = UsageSync(data_manager, str(tmp_path / "sync"))
+    assert sync.exporter.device_id
+    data_manager.close()
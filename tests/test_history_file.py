@@ -0,0 +1,86 @@
+import os
+import struct
+import pytest
+from data_manager import DataManager
+from history_file import (HEADER, HEADER_SIZE, INDEX_ENTRY, HistoryFile, HistoryFormatError,
+                          write_history_file)
+from storage import BinaryStorage
+from usage_store import DaySeries, epoch_day
+
+
+def series(pairs):
+    return DaySeries.from_dates(list(pairs.items()))
+
+
+def test_record_layout_round_trip(tmp_path):
+    path = str(tmp_path / "usage.hist")
+    write_history_file(path, {"YouTube": series({"2024-03-01": 600, "2024-03-04": 60}),
+                              "Firefox": series({"2023-12-31": 30})},
+                       {"limits": {"YouTube": 45}, "settings": {}})
+    with open(path, 'rb') as f:
+        raw = f.read()
+    magic, version, _, app_count, index_offset, _, meta_offset, _ = HEADER.unpack_from(raw, 0)
+    assert (magic, version, app_count) == (b"STTHIST\0", 1, 2)
+    base, count, data_offset, name_length = INDEX_ENTRY.unpack_from(raw, index_offset)
+    assert raw[index_offset + INDEX_ENTRY.size:][:name_length] == b"YouTube"
+    assert (base, count, data_offset) == (epoch_day("2024-03-01"), 4, HEADER_SIZE)
+    assert struct.unpack_from("<4I", raw, data_offset) == (600, 0, 0, 60)
+
+    history = HistoryFile(path)
+    assert history.apps() == ["YouTube", "Firefox"]
+    assert history.get("YouTube", epoch_day("2024-03-04")) == 60
+    assert history.get("YouTube", epoch_day("2024-03-05")) == 0
+    start, seconds = history.days("YouTube", epoch_day("2024-03-02"), epoch_day("2024-03-10"))
+    assert (start, list(seconds)) == (epoch_day("2024-03-02"), [0, 0, 60])
+    assert history.meta["limits"] == {"YouTube": 45}
+    history.close()
+
+
+@pytest.mark.parametrize("keep", [0, 10, HEADER_SIZE, -1])
+def test_truncated_file_is_rejected(tmp_path, keep):
+    path = str(tmp_path / "usage.hist")
+    write_history_file(path, {"YouTube": series({"2024-03-01": 600})}, {"limits": {}, "settings": {}})
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.truncate(keep if keep >= 0 else size - 1)
+    with pytest.raises(HistoryFormatError):
+        HistoryFile(path)
+
+
+def test_storage_remaps_after_the_file_grows(tmp_path):
+    path = str(tmp_path / "usage.hist")
+    storage = BinaryStorage(path)
+    data = storage.load()
+    storage.add_usage("YouTube", "2024-03-01", 600)
+    storage.save(data)
+    first_map = storage.history.map
+    size = os.path.getsize(path)
+
+    storage.add_usage("YouTube", "2024-06-01", 60)
+    storage.add_usage("Netflix", "2024-06-01", 30)
+    storage.journal.compact_bytes = 1  # Force compaction on the next flush
+    storage.flush()
+
+    assert os.path.getsize(path) > size
+    assert storage.history.map is not first_map and first_map.closed
+    assert not storage.overlay
+    assert storage.get_usage_range("YouTube", "2024-01-01", "2024-12-31") == {"2024-03-01": 600, "2024-06-01": 60}
+    assert storage.get_usage("Netflix", "2024-06-01") == 30
+    storage.close(data)
+
+
+def test_data_manager_reopens_a_hist_file_with_journaled_usage(tmp_path):
+    path = str(tmp_path / "usage.hist")
+    data_manager = DataManager(path)
+    assert isinstance(data_manager.storage, BinaryStorage)
+    data_manager.update_usage_batch({"YouTube": 600}, "2024-03-01")
+    data_manager.set_app_limit("YouTube", 45)
+    data_manager.update_usage_batch({"YouTube": 60}, "2024-03-02")
+    data_manager.flush()  # Journaled, not yet folded into the file
+    data_manager.storage.journal.close()
+    data_manager.storage.history.close()
+
+    reopened = DataManager(path)
+    assert reopened.get_app_history("YouTube") == {"2024-03-01": 600, "2024-03-02": 60}
+    assert reopened.get_app_limit("YouTube") == 45
+    reopened.close()
@@ -0,0 +1,91 @@
+import subprocess
+import threading
+import time
+import idle_detector
+from idle_detector import FakeIdleSource, IdleDetector, LogindIdleSource
+
+
+def test_idle_only_past_threshold():
+    source = FakeIdleSource()
+    detector = IdleDetector(source, threshold=300)
+    assert not detector.is_idle()
+    source.set_idle(299)
+    assert not detector.is_idle()
+    source.set_idle(300)
+    assert detector.is_idle()
+
+
+def test_no_source_is_never_idle():
+    assert not IdleDetector(None).is_idle()
+
+
+def test_source_errors_count_as_active():
+    class BrokenSource(FakeIdleSource):
+        def idle_seconds(self):
+            raise OSError("display went away")
+    assert not IdleDetector(BrokenSource(), threshold=0).is_idle()
+
+
+def test_wait_for_activity_returns_when_user_is_back():
+    source = FakeIdleSource(idle=600)
+    detector = IdleDetector(source, threshold=300)
+    threading.Timer(0.2, source.set_idle, args=(0,)).start()
+    started = time.monotonic()
+    assert detector.wait_for_activity(threading.Event())
+    assert time.monotonic() - started >= 0.2
+
+
+def test_wait_for_activity_stops_with_the_monitor():
+    detector = IdleDetector(FakeIdleSource(idle=600), threshold=300)
+    stop_event = threading.Event()
+    threading.Timer(0.2, stop_event.set).start()
+    assert not detector.wait_for_activity(stop_event)
+
+
+def test_sleep_polls_slower_than_an_active_tick():
+    from tick_scheduler import TickScheduler
+    base_interval = TickScheduler().base_interval
+    assert idle_detector.X11IdleSource.poll_interval > base_interval
+    assert LogindIdleSource.poll_interval > base_interval
+
+
+def test_logind_queries_once_per_poll_interval(monkeypatch):
+    calls = []
+
+    def run(args, **kwargs):
+        calls.append(args)
+        since = int((time.monotonic() - 400) * 1e6)
+        return subprocess.CompletedProcess(args, 0, f"IdleHint=yes\nIdleSinceHintMonotonic={since}\n", "")
+
+    monkeypatch.setattr(idle_detector.shutil, "which", lambda name: "/usr/bin/loginctl")
+    monkeypatch.setattr(idle_detector.subprocess, "run", run)
+    source = LogindIdleSource("1")
+    detector = IdleDetector(source, threshold=300)
+    for _ in range(100):
+        assert detector.is_idle()
+    assert len(calls) == 1
+
+    source.queried -= source.poll_interval
+    assert source.idle_seconds() >= 400
+    assert len(calls) == 2
+
+
+def test_logind_failures_are_retried_once_per_poll_interval(monkeypatch):
+    calls = []
+    failing = [False]
+
+    def run(args, **kwargs):
+        calls.append(args)
+        if failing[0]:
+            return subprocess.CompletedProcess(args, 1, "", "Failed to get session")
+        return subprocess.CompletedProcess(args, 0, "IdleHint=no\n", "")
+
+    monkeypatch.setattr(idle_detector.shutil, "which", lambda name: "/usr/bin/loginctl")
+    monkeypatch.setattr(idle_detector.subprocess, "run", run)
+    source = LogindIdleSource("1")
+    detector = IdleDetector(source, threshold=300)
+    failing[0] = True
+    source.queried -= source.poll_interval
+    for _ in range(100):
+        assert not detector.is_idle()
+    assert len(calls) == 2
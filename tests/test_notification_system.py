@@ -0,0 +1,26 @@
+from limit_scheduler import LimitScheduler
+from notification_system import NotificationSystem
+
+
+def test_limit_is_not_held_back_by_the_warning(recording_backend):
+    notifications = NotificationSystem(recording_backend, rate_limit=60)
+    scheduler = LimitScheduler(None, None, notifications)
+
+    scheduler.notify("YouTube", 80)
+    notifications.drain()
+    scheduler.notify("YouTube", 100)
+    notifications.drain()
+
+    assert len(recording_backend.shown) == 2
+    assert recording_backend.shown[1].endswith("YouTube Usage Limit")
+
+
+def test_same_key_is_coalesced_and_rate_limited(recording_backend):
+    notifications = NotificationSystem(recording_backend, rate_limit=60)
+    notifications.show_notification("Break", "first", key="break")
+    notifications.drain()
+    notifications.show_notification("Break", "second", key="break")
+    notifications.show_notification("Break", "third", key="break")
+    notifications.drain()
+    assert len(recording_backend.shown) == 1
+    assert len(notifications.pending) == 1
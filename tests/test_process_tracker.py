@@ -0,0 +1,52 @@
+import psutil
+from process_tracker import PollingBackend
+
+
+class CountingTable:
+    """psutil stand-in that counts create_time() calls"""
+
+    def __init__(self, pids):
+        self.processes = {pid: float(pid) for pid in pids}  # pid -> create time
+        self.create_time_calls = 0
+
+    def pids(self):
+        return list(self.processes)
+
+    def Process(self, pid):
+        table = self
+
+        class Process:
+            def create_time(self):
+                table.create_time_calls += 1
+                if pid not in table.processes:
+                    raise psutil.NoSuchProcess(pid)
+                return table.processes[pid]
+        return Process()
+
+
+def polling_backend(table):
+    return PollingBackend(table, last_pid=lambda: None)
+
+
+def test_unchanged_pid_set_skips_create_time():
+    table = CountingTable(range(1, 101))
+    backend = polling_backend(table)
+    backend.poll()
+    calls = table.create_time_calls
+
+    for _ in range(10):
+        assert backend.poll() == (set(), set(), set())
+    assert table.create_time_calls == calls
+
+
+def test_reused_pid_is_reported_when_the_set_changes():
+    table = CountingTable(range(1, 11))
+    backend = polling_backend(table)
+    backend.poll()
+
+    table.processes[5] = 500.0  # Freed and handed straight back
+    assert backend.poll() == (set(), set(), set())
+
+    table.processes[11] = 11.0
+    assert backend.poll() == ({11}, set(), {5})
+    assert backend.poll() == (set(), set(), set())
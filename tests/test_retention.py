@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+from data_manager import DataManager
+from retention import RetentionEngine, RetentionPolicy, week_bucket
+
+TODAY = date(2024, 6, 15)
+
+
+def totals(data_manager, period):
+    result = {}
+    for app_name, day, seconds in data_manager.storage.iter_usage():
+        key = period(date.fromisoformat(day))
+        result[key] = result.get(key, 0) + seconds
+    return result
+
+
+def iso_week(day):
+    return day.isocalendar()[:2]
+
+
+def month(day):
+    return day.year, day.month
+
+
+def make_history(tmp_path, days):
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    for i in range(days):
+        day = TODAY - timedelta(days=i)
+        data_manager.update_usage_batch({"YouTube": 60 + i % 7}, day.isoformat())
+    return data_manager
+
+
+def test_week_buckets_never_span_two_months():
+    assert week_bucket(date(2024, 1, 31)) == date(2024, 1, 29)
+    assert week_bucket(date(2024, 2, 3)) == date(2024, 2, 1)
+    assert week_bucket(date(2024, 2, 5)) == date(2024, 2, 5)
+
+
+def test_weekly_fold_keeps_week_and_month_totals(tmp_path):
+    data_manager = make_history(tmp_path, 700)
+    weeks, months = totals(data_manager, iso_week), totals(data_manager, month)
+    folded, _ = RetentionEngine(data_manager, ["YouTube"]).run_once(TODAY)
+    assert folded
+    policy = RetentionPolicy(today=TODAY)
+    assert all(date.fromisoformat(day) >= policy.detail_cutoff or
+               date.fromisoformat(day) == week_bucket(date.fromisoformat(day))
+               for _, day, _ in data_manager.storage.iter_usage())
+    assert totals(data_manager, iso_week) == weeks
+    assert totals(data_manager, month) == months
+    data_manager.close()
+
+
+def test_monthly_fold_keeps_month_totals_past_the_weekly_window(tmp_path):
+    data_manager = make_history(tmp_path, 1000)
+    weeks, months = totals(data_manager, iso_week), totals(data_manager, month)
+    RetentionEngine(data_manager, ["YouTube"]).run_once(TODAY)
+    policy = RetentionPolicy(today=TODAY)
+    assert totals(data_manager, month) == months
+    folded_weeks = totals(data_manager, iso_week)
+    assert {week: seconds for week, seconds in folded_weeks.items()
+            if date.fromisocalendar(*week, 1) >= policy.weekly_cutoff} == \
+        {week: seconds for week, seconds in weeks.items()
+         if date.fromisocalendar(*week, 1) >= policy.weekly_cutoff}
+    data_manager.close()
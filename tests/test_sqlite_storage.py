@@ -0,0 +1,63 @@
+from data_manager import DataManager
+from storage import SQLiteStorage
+
+
+def test_round_trip_through_close_and_reopen(tmp_path):
+    path = str(tmp_path / "usage.db")
+    data_manager = DataManager(path)
+    assert isinstance(data_manager.storage, SQLiteStorage)
+    data_manager.update_usage_batch({"YouTube": 600, "Firefox": 30}, "2024-03-01")
+    data_manager.update_usage_batch({"YouTube": 60}, "2024-03-01")
+    data_manager.update_usage_batch({"YouTube": 120}, "2024-03-02")
+    data_manager.set_app_limit("YouTube", 45)
+    data_manager.data["settings"]["limit_thresholds"] = [50, 100]
+    data_manager.close()
+
+    reopened = DataManager(path)
+    assert sorted(reopened.get_usage_apps()) == ["Firefox", "YouTube"]
+    assert reopened.get_app_history("YouTube") == {"2024-03-01": 660, "2024-03-02": 120}
+    assert reopened.get_app_limit("YouTube") == 45
+    assert reopened.data["settings"]["limit_thresholds"] == [50, 100]
+    reopened.close()
+
+
+def test_flushed_usage_is_visible_to_a_fresh_connection(tmp_path):
+    path = str(tmp_path / "usage.db")
+    data_manager = DataManager(path)
+    data_manager.update_usage_batch({"YouTube": 600}, "2024-03-01")
+    data_manager.flush()
+
+    reader = SQLiteStorage(path)
+    reader.load()
+    assert reader.get_usage("YouTube", "2024-03-01") == 600
+    reader.close({"limits": {}, "settings": {}})
+    data_manager.close()
+
+
+def test_removed_apps_and_replaced_ranges_stay_that_way(tmp_path):
+    path = str(tmp_path / "usage.db")
+    data_manager = DataManager(path)
+    data_manager.set_app_limit("Spotify", 30)
+    data_manager.update_usage_batch({"Spotify": 100, "YouTube": 10}, "2024-03-04")
+    data_manager.update_usage_batch({"YouTube": 20}, "2024-03-05")
+    data_manager.remove_app("Spotify")
+    data_manager.storage.replace_usage("YouTube", "2024-03-04", "2024-03-10", {"2024-03-04": 30})
+    data_manager.close()
+
+    reopened = DataManager(path)
+    assert reopened.get_usage_apps() == ["YouTube"]
+    assert reopened.get_app_history("YouTube") == {"2024-03-04": 30}
+    assert "Spotify" not in reopened.data["limits"]
+    reopened.close()
+
+
+def test_first_open_imports_the_sibling_json_file(tmp_path):
+    json_manager = DataManager(str(tmp_path / "usage.json"))
+    json_manager.update_usage_batch({"YouTube": 600}, "2024-03-01")
+    json_manager.set_app_limit("YouTube", 45)
+    json_manager.close()
+
+    data_manager = DataManager(str(tmp_path / "usage.db"))
+    assert data_manager.get_app_history("YouTube") == {"2024-03-01": 600}
+    assert data_manager.get_app_limit("YouTube") == 45
+    data_manager.close()
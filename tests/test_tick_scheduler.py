@@ -0,0 +1,70 @@
+import pytest
+import tick_scheduler
+from tick_scheduler import TickScheduler
+
+
+class FakeClock:
+    """Monotonic clock that only moves when a wait sleeps on it"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def wait(self, timeout):
+        self.now += timeout
+        return False  # Never stopped
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tick_scheduler.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def tick(scheduler, clock, changed=False):
+    """One monitor loop iteration: wait, measure, adapt; returns the credited seconds"""
+    scheduler.wait(clock)
+    elapsed = scheduler.elapsed()
+    scheduler.adapt(changed)
+    return elapsed
+
+
+def back_off(scheduler, clock):
+    for _ in range(100):
+        tick(scheduler, clock)
+    assert scheduler.interval == scheduler.max_interval
+
+
+def test_backs_off_while_nothing_changes(clock):
+    scheduler = TickScheduler()
+    scheduler.start()
+    intervals = [tick(scheduler, clock) for _ in range(30)]
+    assert intervals[0] == pytest.approx(1.0)
+    assert intervals == sorted(intervals)
+    back_off(scheduler, clock)
+    assert scheduler.gaps == 0
+
+
+def test_switch_pulls_in_the_next_tick(clock):
+    scheduler = TickScheduler()
+    scheduler.start()
+    back_off(scheduler, clock)
+    assert tick(scheduler, clock, changed=True) == pytest.approx(5.0)  # The sleep already under way
+    started = clock.now
+    elapsed = tick(scheduler, clock)
+    assert clock.now - started == pytest.approx(0.5)
+    assert elapsed == pytest.approx(0.5)
+    assert scheduler.gaps == 0
+
+
+def test_elapsed_is_clamped_by_the_interval_it_was_scheduled_with(clock):
+    scheduler = TickScheduler()
+    scheduler.start()
+    back_off(scheduler, clock)
+    scheduler.wait(clock)
+    clock.now += 3600  # Suspended
+    assert scheduler.elapsed() == pytest.approx(5.0)
+    assert scheduler.gaps == 1
+
@@ -0,0 +1,30 @@
+from data_manager import DataManager
+from usage_accumulator import UsageAccumulator
+
+
+def test_removed_app_is_not_written_back_by_the_next_flush(tmp_path):
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    data_manager.set_app_limit("Spotify", 30)
+    accumulator = UsageAccumulator(data_manager)
+    accumulator.add_many({"Spotify": 90, "Firefox": 30})
+    accumulator.flush()
+    accumulator.add_many({"Spotify": 10.5, "Firefox": 5})
+
+    data_manager.remove_app("Spotify")
+    accumulator.flush()
+
+    assert data_manager.get_usage_apps() == ["Firefox"]
+    assert data_manager.get_today_usage("Firefox") == 35
+    assert accumulator.total("Spotify") == 0
+    data_manager.close()
+
+
+def test_pending_seconds_count_towards_the_total(tmp_path):
+    data_manager = DataManager(str(tmp_path / "usage_data.json"))
+    accumulator = UsageAccumulator(data_manager)
+    accumulator.add("Firefox", 2.5)
+    assert accumulator.total("Firefox") == 2.5
+    accumulator.flush()
+    assert data_manager.get_today_usage("Firefox") == 2
+    assert accumulator.total("Firefox") == 2.5
+    data_manager.close()
@@ -0,0 +1,51 @@
+import csv
+import sys
+import pytest
+import usage_export
+from data_manager import DataFileLock, DataManager
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = str(tmp_path / "usage_data.json")
+    data_manager = DataManager(path)
+    data_manager.update_usage_batch({"YouTube": 600, "Netflix": 120}, "2024-03-01")
+    data_manager.update_usage_batch({"YouTube": 300}, "2024-03-02")
+    data_manager.update_usage_batch({"YouTube": 60}, "2024-03-03")
+    data_manager.close()
+    return path
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr(sys, "argv", ["usage_export.py", *args])
+    usage_export.main()
+
+
+def test_usage_rows_reads_only_the_requested_days(data_file):
+    data_manager = DataManager(data_file)
+    rows = list(usage_export.usage_rows(data_manager, ["YouTube"], since="2024-03-02", until="2024-03-02"))
+    data_manager.close()
+    assert rows == [("2024-03-02", "YouTube", 300, 5.0, 0)]
+
+
+def test_main_exports_and_releases_the_data_file(data_file, tmp_path, monkeypatch):
+    output = str(tmp_path / "usage.csv")
+    run_main(monkeypatch, output, "--data-file", data_file, "--socket", str(tmp_path / "none.sock"),
+             "--since", "2024-03-02")
+    with open(output, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == usage_export.COLUMNS
+    assert [row[:3] for row in rows[1:]] == [["2024-03-02", "YouTube", "300"], ["2024-03-03", "YouTube", "60"]]
+    DataFileLock(data_file).acquire().release()  # Not left locked
+
+
+def test_main_refuses_while_a_tracker_has_the_file(data_file, tmp_path, monkeypatch):
+    output = str(tmp_path / "usage.csv")
+    tracker_lock = DataFileLock(data_file).acquire()
+    try:
+        with pytest.raises(SystemExit) as exit_info:
+            run_main(monkeypatch, output, "--data-file", data_file, "--socket", str(tmp_path / "none.sock"))
+    finally:
+        tracker_lock.release()
+    assert exit_info.value.code == 1
+    assert not (tmp_path / "usage.csv").exists()
@@ -0,0 +1,101 @@
+import json
+import usage_journal
+from storage import JsonStorage
+from usage_journal import UsageJournal
+
+
+def open_storage(tmp_path):
+    storage = JsonStorage(str(tmp_path / "usage_data.json"))
+    storage.load()
+    return storage
+
+
+def crash(storage):
+    """Drop the storage without a final save, as a killed process would"""
+    if storage.journal.file:
+        storage.journal.file.close()
+
+
+def test_replay_restores_flushed_usage_after_a_crash(tmp_path):
+    storage = open_storage(tmp_path)
+    storage.add_usage("YouTube", "2024-03-01", 600)
+    storage.add_usage("YouTube", "2024-03-01", 60)
+    storage.add_usage("Firefox", "2024-03-02", 30)
+    storage.flush()
+    storage.add_usage("YouTube", "2024-03-01", 5)  # Buffered, lost in the crash
+    crash(storage)
+
+    reloaded = open_storage(tmp_path)
+    assert reloaded.get_usage("YouTube", "2024-03-01") == 660
+    assert reloaded.get_usage("Firefox", "2024-03-02") == 30
+    reloaded.close(reloaded.data)
+
+
+def test_torn_last_record_is_dropped(tmp_path):
+    storage = open_storage(tmp_path)
+    storage.add_usage("YouTube", "2024-03-01", 600)
+    storage.flush()
+    storage.journal.file.write('["YouTube", "2024-03-01", 6')  # Cut off mid-append
+    crash(storage)
+
+    reloaded = open_storage(tmp_path)
+    assert reloaded.get_usage("YouTube", "2024-03-01") == 600
+    # The replay was folded into a snapshot and the journal started over
+    with open(reloaded.journal.path) as f:
+        assert f.read().splitlines() == [json.dumps({"generation": reloaded.journal.generation})]
+    crash(reloaded)
+    again = open_storage(tmp_path)
+    assert again.get_usage("YouTube", "2024-03-01") == 600
+    again.close(again.data)
+
+
+def test_compaction_rolls_the_generation_without_double_counting(tmp_path):
+    storage = open_storage(tmp_path)
+    storage.journal.compact_bytes = 1
+    generation = storage.journal.generation
+    storage.add_usage("YouTube", "2024-03-01", 600)
+    storage.flush()  # Compacts into a snapshot
+    assert storage.journal.generation == generation + 1
+    storage.add_usage("YouTube", "2024-03-01", 60)
+    storage.journal.compact_bytes = 1024 * 1024
+    storage.flush()
+    crash(storage)
+
+    reloaded = open_storage(tmp_path)
+    assert reloaded.get_usage("YouTube", "2024-03-01") == 660
+    reloaded.close(reloaded.data)
+
+
+def test_journal_older_than_the_snapshot_is_ignored(tmp_path, monkeypatch):
+    storage = open_storage(tmp_path)
+    storage.add_usage("YouTube", "2024-03-01", 600)
+    storage.flush()
+    # Crash after the snapshot was replaced but before the journal rotated
+    monkeypatch.setattr(storage.journal, "rotate", lambda: None)
+    storage.save(storage.data)
+    crash(storage)
+
+    reloaded = open_storage(tmp_path)
+    assert reloaded.get_usage("YouTube", "2024-03-01") == 600
+    reloaded.close(reloaded.data)
+
+
+def test_one_fsync_per_flush(tmp_path, monkeypatch):
+    fsyncs = []
+    monkeypatch.setattr(usage_journal.os, "fsync", fsyncs.append)
+    journal = UsageJournal(str(tmp_path / "journal"))
+    journal.replay({}, 0)
+    for i in range(100):
+        journal.append("YouTube", "2024-03-01", 1)
+        journal.append(f"App {i % 3}", "2024-03-01", 1)
+    journal.flush()
+    journal.flush()  # Nothing buffered
+    assert len(fsyncs) == 1
+
+    with open(journal.path) as f:
+        lines = f.read().splitlines()
+    assert json.loads(lines[0]) == {"generation": 1}
+    assert sorted(json.loads(line) for line in lines[1:]) == [
+        ["App 0", "2024-03-01", 34], ["App 1", "2024-03-01", 33], ["App 2", "2024-03-01", 33],
+        ["YouTube", "2024-03-01", 100]]
+    journal.close()
@@ -0,0 +1,94 @@
+import json
+import pytest
+from usage_store import MAX_SECONDS, ColumnarUsage, DaySeries, epoch_day, json_default
+
+
+def test_view_reads_like_the_nested_dict():
+    usage = ColumnarUsage({"YouTube": {"2024-03-02": 60, "2024-03-01": 600}})
+    assert usage["YouTube"]["2024-03-01"] == 600
+    assert usage["YouTube"].get("2024-03-05", 0) == 0
+    assert usage.get("Netflix") is None
+    assert "YouTube" in usage and "Netflix" not in usage
+    with pytest.raises(KeyError):
+        usage["YouTube"]["2024-03-05"]
+    assert dict(usage["YouTube"]) == {"2024-03-01": 600, "2024-03-02": 60}
+    assert len(usage["YouTube"]) == 2
+
+
+def test_writes_through_the_view():
+    usage = ColumnarUsage()
+    app_usage = usage.setdefault("YouTube", {})
+    app_usage["2024-03-01"] = app_usage.get("2024-03-01", 0) + 30
+    usage.setdefault("YouTube", {})["2024-03-01"] += 30
+    assert usage.get_seconds("YouTube", "2024-03-01") == 60
+
+
+def test_range_queries_skip_empty_days():
+    usage = ColumnarUsage()
+    for date, seconds in [("2024-03-01", 600), ("2024-03-03", 60), ("2024-03-10", 5)]:
+        usage.add("YouTube", date, seconds)
+    assert usage.get_range("YouTube", "2024-03-02", "2024-03-10") == {"2024-03-03": 60, "2024-03-10": 5}
+    assert usage.get_range("YouTube", "2024-04-01", "2024-04-30") == {}
+    assert usage.get_range("Netflix", "2024-03-01", "2024-03-31") == {}
+
+
+def test_remove_days_and_apps():
+    usage = ColumnarUsage({"YouTube": {"2024-03-01": 600, "2024-03-02": 60}, "Netflix": {"2024-03-01": 5}})
+    del usage["YouTube"]["2024-03-01"]
+    assert dict(usage["YouTube"]) == {"2024-03-02": 60}
+    with pytest.raises(KeyError):
+        del usage["YouTube"]["2024-03-01"]
+    del usage["Netflix"]
+    assert list(usage) == ["YouTube"]
+    usage.add("Netflix", "2024-03-05", 1)  # A removed app comes back empty
+    assert dict(usage["Netflix"]) == {"2024-03-05": 1}
+    assert usage.pop("Spotify", None) is None
+
+
+def test_iteration_keeps_app_order_and_sorts_days():
+    usage = ColumnarUsage({"Netflix": {"2024-03-05": 1, "2024-03-01": 2}})
+    usage.add("YouTube", "2024-02-01", 3)
+    usage.add("Firefox", "2024-01-01", 4)
+    assert list(usage) == ["Netflix", "YouTube", "Firefox"]
+    assert list(usage["Netflix"]) == ["2024-03-01", "2024-03-05"]
+    assert list(usage.rows()) == [("Netflix", "2024-03-01", 2), ("Netflix", "2024-03-05", 1),
+                                  ("YouTube", "2024-02-01", 3), ("Firefox", "2024-01-01", 4)]
+
+
+def test_series_grows_past_its_preallocated_days():
+    series = DaySeries.from_dates([("2024-03-02", 10), ("2024-03-04", 20)])
+    assert (series.base, len(series.seconds)) == (epoch_day("2024-03-02"), 3)
+    series.add(epoch_day("2024-02-28"), 1)
+    series.add(epoch_day("2024-03-10"), 2)
+    assert series.base == epoch_day("2024-02-28")
+    assert list(series.items()) == [(epoch_day("2024-02-28"), 1), (epoch_day("2024-03-02"), 10),
+                                    (epoch_day("2024-03-04"), 20), (epoch_day("2024-03-10"), 2)]
+    assert series.get(epoch_day("2024-03-11")) == 0
+
+
+def test_loaded_dicts_convert_lazily_and_round_trip():
+    raw = {"YouTube": {"2024-03-01": 600}, "Netflix": {"2024-03-02": 5}}
+    usage = ColumnarUsage(json.loads(json.dumps(raw)))
+    assert all(type(series) is dict for series in usage.series)
+    usage.add("YouTube", "2024-03-01", 60)
+    assert type(usage.series[usage.app_id("YouTube")]) is DaySeries
+    assert type(usage.series[usage.app_id("Netflix")]) is dict
+    assert json.loads(json.dumps(usage, default=json_default)) == {
+        "YouTube": {"2024-03-01": 660}, "Netflix": {"2024-03-02": 5}}
+
+
+def test_values_outside_uint32_are_rejected():
+    series = DaySeries()
+    day = epoch_day("2024-03-01")
+    series.add(day, MAX_SECONDS)
+    with pytest.raises(ValueError):
+        series.add(day, 1)
+    with pytest.raises(ValueError):
+        series.add(epoch_day("2024-03-02"), -1)
+    with pytest.raises(ValueError):
+        series.set(day, MAX_SECONDS + 1)
+    assert list(series.items()) == [(day, MAX_SECONDS)]
+    with pytest.raises(ValueError):
+        DaySeries.from_dates([("2024-03-01", MAX_SECONDS), ("2024-03-01", 1)])
+    with pytest.raises(ValueError):
+        ColumnarUsage({"YouTube": {"2024-03-01": 2 ** 40}}).get_seconds("YouTube", "2024-03-01")
@@ -0,0 +1,85 @@
+import time
+
+
+class TickScheduler:
+    """Paces monitor ticks on the monotonic clock and measures the time between them
+
+    Ticks are scheduled against absolute deadlines, so time spent scanning
+    does not push later ticks back, and each tick reports the real elapsed
+    time to attribute. The interval adapts: it drops to min_interval when
+    the active app changes and backs off towards max_interval while
+    nothing changes.
+    """
+
+    def __init__(self, interval=1.0, min_interval=0.5, max_interval=5.0,
+                 backoff=1.5, settle_ticks=5, max_gap_ticks=3):
+        self.base_interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.settle_ticks = settle_ticks
+        self.max_gap_ticks = max_gap_ticks
+        self.interval = interval
+        self.stable_ticks = 0
+        self.last_tick = None
+        self.next_tick = None
+        self.tick_interval = interval  # Interval next_tick was scheduled with
+        self.gaps = 0
+
+    def start(self):
+        now = time.monotonic()
+        self.interval = self.base_interval
+        self.stable_ticks = 0
+        self.last_tick = now
+        self.schedule(now + self.interval)
+
+    def schedule(self, next_tick):
+        self.next_tick = next_tick
+        self.tick_interval = self.interval
+
+    def elapsed(self):
+        """Seconds since the previous tick, clamped across stalls and suspend"""
+        now = time.monotonic()
+        elapsed = now - self.last_tick
+        self.last_tick = now
+        # Compare with the interval this tick was scheduled with; adapt()
+        # may have changed self.interval since
+        if elapsed > self.tick_interval * self.max_gap_ticks:
+            # The process was stopped or the machine slept; nobody was
+            # observed in between, so credit at most one interval
+            self.gaps += 1
+            return self.tick_interval
+        return elapsed
+
+    def adapt(self, changed):
+        """Tick faster around app switches and slower while nothing changes"""
+        if changed:
+            self.interval = self.min_interval
+            self.stable_ticks = 0
+            if self.last_tick is not None and self.last_tick + self.interval < self.next_tick:
+                # Don't sit out a backed-off sleep right after a switch
+                self.schedule(self.last_tick + self.interval)
+            return
+        self.stable_ticks += 1
+        if self.stable_ticks >= self.settle_ticks:
+            if self.interval < self.base_interval:
+                self.interval = self.base_interval
+            else:
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+            self.stable_ticks = 0
+
+    def wait(self, stop_event, deadline=None):
+        """Sleep until the next tick (or an earlier monotonic deadline)
+
+        Returns False if stop_event was set while waiting.
+        """
+        wake = self.next_tick if deadline is None else min(self.next_tick, deadline)
+        if stop_event.wait(max(0.0, wake - time.monotonic())):
+            return False
+        now = time.monotonic()
+        if now >= self.next_tick:
+            self.schedule(self.next_tick + self.interval)
+            if self.next_tick < now:
+                # Fell more than a tick behind; resync instead of bursting
+                self.schedule(now + self.interval)
+        return True
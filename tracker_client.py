@@ -0,0 +1,110 @@
+import json
+import socket
+import threading
+import numpy as np
+from tracker_service import default_socket_path
+
+
+class TrackerClient:
+    """Blocking client for the tracker service's line-delimited JSON protocol"""
+
+    def __init__(self, socket_path=None, timeout=5.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(self.socket_path)
+        self.reader = self.sock.makefile('rb')
+        self.lock = threading.Lock()
+
+    def call(self, method, *args):
+        with self.lock:
+            self.sock.sendall(json.dumps([method, *args], separators=(",", ":")).encode() + b"\n")
+            line = self.reader.readline()
+        if not line:
+            raise ConnectionError("tracker service closed the connection")
+        ok, result = json.loads(line)
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+class RemoteDataManager:
+    """DataManager stand-in that reads and writes through the tracker service
+
+    Lets the Tk UI attach to a headless tracker; closing the UI does not
+    stop tracking. Limits and settings are fetched once and cached until
+    this client changes them or load_data() is called.
+    """
+
+    def __init__(self, socket_path=None):
+        self.client = TrackerClient(socket_path)
+        self.cached_data = None
+
+    @property
+    def data(self):
+        if self.cached_data is None:
+            self.cached_data = self.client.call("get_data")
+        return self.cached_data
+
+    @property
+    def data_file(self):
+        """The service's data file, so sync state next to it can be shared"""
+        return self.client.call("get_data_file")
+
+    @property
+    def limits_version(self):
+        return self.client.call("get_limits_version")
+
+    def load_data(self):
+        """Drop the cached limits and settings so the next read refetches them"""
+        self.cached_data = None
+
+    def save_data(self):
+        pass  # The service persists every change itself
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.client.close()
+
+    def get_today_usage(self, app_name):
+        return self.client.call("get_today_usage", app_name)
+
+    def get_usage_range(self, app_name, days):
+        return self.client.call("get_usage_range", app_name, days)
+
+    def get_weekly_usage(self, app_name):
+        return self.client.call("get_weekly_usage", app_name)
+
+    def get_app_history(self, app_name):
+        return self.client.call("get_app_history", app_name)
+
+    def get_usage_between(self, app_name, start_date, end_date):
+        return self.client.call("get_usage_between", app_name, start_date, end_date)
+
+    def get_usage_history(self, granularity, periods):
+        app_names, labels, totals = self.client.call("get_usage_history", granularity, periods)
+        return app_names, labels, np.array(totals, dtype=np.int64).reshape(len(app_names), periods)
+
+    def get_usage_apps(self):
+        return self.client.call("get_usage_apps")
+
+    def get_app_limit(self, app_name):
+        return self.client.call("get_app_limit", app_name)
+
+    def set_app_limit(self, app_name, limit_minutes):
+        self.client.call("set_app_limit", app_name, limit_minutes)
+        self.cached_data = None
+
+    def remove_app(self, app_name):
+        self.client.call("remove_app", app_name)
+        self.cached_data = None
+
+    def update_limits(self, limits, removed=()):
+        self.client.call("update_limits", limits, list(removed))
+        self.cached_data = None
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+import threading
+
+# Requests are one JSON array per line: [method, *args]
+# Replies are one JSON array per line: [true, result] or [false, error]
+SERVICE_METHODS = {
+    "get_today_usage",
+    "get_usage_range",
+    "get_weekly_usage",
+    "get_app_history",
+    "get_usage_between",
+    "get_usage_history",
+    "get_usage_apps",
+    "get_app_limit",
+    "set_app_limit",
+    "remove_app",
+    "update_limits",
+    "get_data",
+    "get_limits_version",
+    "get_data_file"
+}
+
+
+def default_socket_path():
+    """Per-user socket location for the tracker service"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"screen_time_tracker-{os.getuid()}.sock")
+
+
+def service_running(socket_path):
+    """Whether a tracker service is accepting connections on socket_path"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+class TrackerService:
+    """Headless tracker: runs the usage monitor and serves DataManager over a Unix socket"""
+
+    def __init__(self, data_manager, usage_monitor, socket_path=None):
+        self.data_manager = data_manager
+        self.usage_monitor = usage_monitor
+        self.socket_path = socket_path or default_socket_path()
+        self.monitor_thread = None
+        self.stopped = None
+        self.bound = False
+
+    def call(self, method, args):
+        """Dispatch one request to the DataManager"""
+        if method not in SERVICE_METHODS:
+            raise ValueError(f"unknown method {method!r}")
+        if method == "get_data":
+            with self.data_manager.lock:
+                return {"limits": dict(self.data_manager.data["limits"]),
+                        "settings": dict(self.data_manager.data["settings"])}
+        if method == "get_limits_version":
+            return self.data_manager.limits_version
+        if method == "get_data_file":
+            # Absolute, since the client may run from another directory
+            return os.path.abspath(self.data_manager.data_file)
+        result = getattr(self.data_manager, method)(*args)
+        if method == "get_usage_history":
+            app_names, labels, totals = result
+            return [app_names, labels, totals.tolist()]
+        return result
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    method, *args = json.loads(line)
+                    reply = [True, self.call(method, args)]
+                except Exception as e:
+                    reply = [False, str(e)]
+                writer.write(json.dumps(reply, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        self.stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopped.set)
+
+        if os.path.exists(self.socket_path):
+            if service_running(self.socket_path):
+                raise RuntimeError(f"Tracker service already running on {self.socket_path}")
+            os.unlink(self.socket_path)  # Stale socket from a previous run
+        server = await asyncio.start_unix_server(self.handle_client, path=self.socket_path)
+        self.bound = True
+        os.chmod(self.socket_path, 0o600)
+        print(f"Tracker service listening on {self.socket_path}", flush=True)
+
+        async with server:
+            await self.stopped.wait()
+
+    def run(self):
+        """Start monitoring and serve requests until SIGINT/SIGTERM"""
+        self.monitor_thread = threading.Thread(target=self.usage_monitor.start_monitoring, daemon=True)
+        self.monitor_thread.start()
+        try:
+            asyncio.run(self.serve())
+        finally:
+            self.usage_monitor.stop_monitoring()
+            self.monitor_thread.join(timeout=2)  # Let the monitor flush its last batch
+            self.data_manager.close()
+            if self.bound and os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
@@ -1,8 +1,9 @@
+import os
 import tkinter as tk
 from tkinter import ttk, font
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from datetime import datetime, timedelta
+from metrics import metrics
+from utils import PrefixIndex
 
 class CustomStyle:
     """Custom styling for the application with gamified elements"""
@@ -65,10 +66,79 @@ class CustomStyle:
                       foreground=CustomStyle.TEXT_COLOR,
                       insertcolor=CustomStyle.TEXT_COLOR)
 
+EMOJI_MAP = {
+    "Google Chrome": "🌐",
+    "Firefox": "🦊",
+    "Microsoft Edge": "📱",
+    "Netflix": "🎬",
+    "YouTube": "▶️",
+    "Amazon Prime": "📺",
+    "Twitch": "🎮",
+    "Instagram": "📸",
+    "Twitter": "🐦",
+    "Facebook": "👥"
+}
+
+class AppUsageRow:
+    """Widgets for one app in Today's Progress, created once and updated in place"""
+    def __init__(self, parent, app_name):
+        self.frame = ttk.Frame(parent, style="Card.TFrame")
+        self.frame.pack(fill='x', pady=5, padx=10)
+
+        emoji = EMOJI_MAP.get(app_name, "📱")
+        ttk.Label(self.frame, 
+                 text=f"{emoji} {app_name}", 
+                 style="Subtitle.TLabel").pack(side='left', padx=5)
+
+        self.progress_label = ttk.Label(self.frame, style="Subtitle.TLabel")
+        self.progress_label.pack(side='right', padx=5)
+
+        self.progress_frame = None
+        self.progress = None
+        self.state = None
+
+    def update(self, usage_minutes, limit):
+        """Refresh text and progress; no-op if the displayed values are unchanged"""
+        state = (round(usage_minutes, 1), limit)
+        if state == self.state:
+            return
+        self.state = state
+
+        progress_text = f"⏱️ {usage_minutes:.1f}m / {limit}m"
+        if limit > 0:
+            progress_percent = min(100, (usage_minutes / limit) * 100)
+            level = int(progress_percent / 20) + 1
+            progress_text += f" (Level {level})"
+        self.progress_label.configure(text=progress_text)
+
+        if limit > 0:
+            if self.progress_frame is None:
+                self.progress_frame = ttk.Frame(self.frame, style="Card.TFrame")
+                self.progress = ttk.Progressbar(self.progress_frame, 
+                                       mode='determinate',
+                                       style="Horizontal.TProgressbar")
+                self.progress.pack(fill='x', padx=5)
+            if not self.progress_frame.winfo_manager():
+                self.progress_frame.pack(fill='x', pady=5)
+            self.progress['value'] = progress_percent
+        elif self.progress_frame is not None:
+            self.progress_frame.pack_forget()
+
+    def destroy(self):
+        self.frame.destroy()
+
 class StatsFrame(ttk.Frame):
     def __init__(self, parent, data_manager):
         super().__init__(parent, style="TFrame")
         self.data_manager = data_manager
+        self.app_rows = {}  # app_name -> AppUsageRow
+        self.lines = {}     # app_name -> Line2D
+        self.chart_dates = None
+        self.chart_data = None
+        self.background = None
+        self.canvas = None  # Built the first time the chart is shown
+        self.chart_scheduled = False
+        self.on_chart_ready = None
         self.setup_ui()
 
     def setup_ui(self):
@@ -94,104 +164,264 @@ class StatsFrame(ttk.Frame):
                  text="📊 Your Journey", 
                  style="Title.TLabel").pack(side='left')
 
+        self.chart_frame = ttk.Frame(self, style="Card.TFrame")
+        self.chart_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        self.chart_frame.bind("<Map>", self.on_chart_mapped)
+
+    def on_chart_mapped(self, event):
+        """Build the chart just after the window first paints"""
+        if self.canvas is None and not self.chart_scheduled:
+            self.chart_scheduled = True
+            self.after(10, self.build_chart)
+
+    def build_chart(self):
+        """Create the matplotlib figure; matplotlib is only imported here"""
+        import matplotlib.style
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
         # Configure matplotlib style
-        plt.style.use('dark_background')
-        self.fig, self.ax = plt.subplots(figsize=(10, 5))
+        matplotlib.style.use('dark_background')
+        self.fig = Figure(figsize=(10, 5))
+        self.ax = self.fig.add_subplot()
         self.fig.patch.set_facecolor(CustomStyle.BG_COLOR)
         self.ax.set_facecolor(CustomStyle.CARD_BG)
+        self.ax.set_xlabel('Date', fontsize=12, color=CustomStyle.TEXT_COLOR)
+        self.ax.set_ylabel('Minutes', fontsize=12, color=CustomStyle.TEXT_COLOR)
+        self.ax.tick_params(axis='both', colors=CustomStyle.TEXT_COLOR)
+        self.ax.grid(True, alpha=0.2, color=CustomStyle.SECONDARY_COLOR)
+        self.ax.set_ylim(0, 1)
 
-        chart_frame = ttk.Frame(self, style="Card.TFrame")
-        chart_frame.pack(fill='both', expand=True, padx=10, pady=5)
-
-        self.canvas = FigureCanvasTkAgg(self.fig, master=chart_frame)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
         self.canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+        self.update_chart()
+        if self.on_chart_ready:
+            self.on_chart_ready()
 
     def update_stats(self):
         """Update statistics display"""
-        for widget in self.today_usage_frame.winfo_children():
-            widget.destroy()
-
-        row = 0
-        for app_name in self.data_manager.data["usage"].keys():
-            usage_seconds = self.data_manager.get_today_usage(app_name)
-            usage_minutes = usage_seconds / 60
-            limit = self.data_manager.get_app_limit(app_name)
-
-            app_frame = ttk.Frame(self.today_usage_frame, style="Card.TFrame")
-            app_frame.pack(fill='x', pady=5, padx=10)
-
-            emoji_map = {
-                "Google Chrome": "🌐",
-                "Firefox": "🦊",
-                "Microsoft Edge": "📱",
-                "Netflix": "🎬",
-                "YouTube": "▶️",
-                "Amazon Prime": "📺",
-                "Twitch": "🎮",
-                "Instagram": "📸",
-                "Twitter": "🐦",
-                "Facebook": "👥"
-            }
-            emoji = emoji_map.get(app_name, "📱")
-
-            ttk.Label(app_frame, 
-                     text=f"{emoji} {app_name}", 
-                     style="Subtitle.TLabel").pack(side='left', padx=5)
-
-            progress_text = f"⏱️ {usage_minutes:.1f}m / {limit}m"
-            if limit > 0:
-                progress_percent = min(100, (usage_minutes / limit) * 100)
-                level = int(progress_percent / 20) + 1
-                progress_text += f" (Level {level})"
+        with metrics.timer("ui_refresh_seconds"):
+            self.refresh_stats()
 
-            ttk.Label(app_frame, 
-                     text=progress_text,
-                     style="Subtitle.TLabel").pack(side='right', padx=5)
+    def refresh_stats(self):
+        """Refresh today's rows and the weekly chart"""
+        usage_apps = self.data_manager.get_usage_apps()
 
-            if limit > 0:
-                progress_frame = ttk.Frame(app_frame, style="Card.TFrame")
-                progress_frame.pack(fill='x', pady=5)
+        for app_name in list(self.app_rows):
+            if app_name not in usage_apps:
+                self.app_rows.pop(app_name).destroy()
 
-                progress = ttk.Progressbar(progress_frame, 
-                                       mode='determinate',
-                                       style="Horizontal.TProgressbar")
-                progress['value'] = min(100, (usage_minutes / limit) * 100)
-                progress.pack(fill='x', padx=5)
-
-            row += 1
-
-        # Update chart
-        self.ax.clear()
-        for i, app_name in enumerate(self.data_manager.data["usage"].keys()):
-            weekly_usage = self.data_manager.get_weekly_usage(app_name)
-            dates = list(weekly_usage.keys())
-            minutes = [seconds/60 for seconds in weekly_usage.values()]
-
-            color = CustomStyle.CHART_COLORS[i % len(CustomStyle.CHART_COLORS)]
-            self.ax.plot(dates, minutes, 
-                        label=app_name,
-                        color=color,
-                        marker='o',
-                        linewidth=3,
-                        markerfacecolor=color,
-                        markeredgecolor='white',
-                        markeredgewidth=2,
-                        markersize=8)
-
-        self.ax.set_xlabel('Date', fontsize=12, color=CustomStyle.TEXT_COLOR)
-        self.ax.set_ylabel('Minutes', fontsize=12, color=CustomStyle.TEXT_COLOR)
-        self.ax.legend(frameon=True, facecolor=CustomStyle.CARD_BG, 
-                      edgecolor=CustomStyle.SECONDARY_COLOR)
-        self.ax.tick_params(axis='both', colors=CustomStyle.TEXT_COLOR)
-        self.ax.grid(True, alpha=0.2, color=CustomStyle.SECONDARY_COLOR)
+        for app_name in usage_apps:
+            usage_seconds = self.data_manager.get_today_usage(app_name)
+            limit = self.data_manager.get_app_limit(app_name)
 
-        self.fig.tight_layout()
-        self.canvas.draw()
+            row = self.app_rows.get(app_name)
+            if row is None:
+                row = self.app_rows[app_name] = AppUsageRow(self.today_usage_frame, app_name)
+            row.update(usage_seconds / 60, limit)
+
+        self.update_chart()
+
+    def update_chart(self):
+        """Update the weekly chart, redrawing only what changed"""
+        if self.canvas is None:
+            return  # Not shown yet; build_chart fills it in
+        app_names, labels, totals = self.data_manager.get_usage_history("day", 7)
+        # Newest day first, as the chart has always been laid out
+        dates = labels[::-1] if app_names else None
+        minutes = (totals[:, ::-1] / 60).tolist()
+        chart_data = dict(zip(app_names, minutes))
+
+        if chart_data == self.chart_data:
+            return
+        self.chart_data = chart_data
+
+        full_redraw = False
+        if dates is not None and dates != self.chart_dates:
+            self.chart_dates = dates
+            self.ax.set_xticks(range(len(dates)))
+            self.ax.set_xticklabels(dates)
+            self.ax.set_xlim(-0.5, len(dates) - 0.5)
+            full_redraw = True
+
+        if set(chart_data) != set(self.lines):
+            for app_name in list(self.lines):
+                if app_name not in chart_data:
+                    self.lines.pop(app_name).remove()
+            for i, app_name in enumerate(chart_data):
+                if app_name in self.lines:
+                    continue
+                color = CustomStyle.CHART_COLORS[i % len(CustomStyle.CHART_COLORS)]
+                self.lines[app_name], = self.ax.plot([], [], 
+                            label=app_name,
+                            color=color,
+                            marker='o',
+                            linewidth=3,
+                            markerfacecolor=color,
+                            markeredgecolor='white',
+                            markeredgewidth=2,
+                            markersize=8,
+                            animated=True)
+            if self.lines:
+                self.ax.legend(frameon=True, facecolor=CustomStyle.CARD_BG, 
+                              edgecolor=CustomStyle.SECONDARY_COLOR)
+            elif self.ax.get_legend():
+                self.ax.get_legend().remove()
+            full_redraw = True
+
+        for app_name, minutes in chart_data.items():
+            self.lines[app_name].set_data(range(len(minutes)), minutes)
+
+        # Rescale only when the data outgrows the axis or shrinks well below it
+        peak = max((max(minutes) for minutes in chart_data.values()), default=0)
+        top = self.ax.get_ylim()[1]
+        if peak > top or peak < top / 2:
+            self.ax.set_ylim(0, max(1, peak * 1.1))
+            full_redraw = True
+
+        if full_redraw or self.background is None:
+            self.fig.tight_layout()
+            self.canvas.draw_idle()
+        else:
+            # Only the lines changed: blit them over the cached background
+            self.canvas.restore_region(self.background)
+            self.draw_lines()
+            self.canvas.blit(self.ax.bbox)
+
+    def on_draw(self, event):
+        """Cache the static chart background after each full draw"""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+
+class LimitRow:
+    """One reusable row of the limits list, rebound to a different app on scroll"""
+    def __init__(self, parent, settings):
+        self.settings = settings
+        self.app_name = None
+        self.state = None
+        self.binding = False
+
+        self.frame = ttk.Frame(parent, style="Card.TFrame")
+        self.label = ttk.Label(self.frame, style="Subtitle.TLabel", width=28)
+        self.label.pack(side='left', padx=5)
+
+        self.limit_var = tk.StringVar()
+        self.limit_var.trace_add("write", self.on_edit)
+        ttk.Entry(self.frame,
+                  textvariable=self.limit_var,
+                  width=10,
+                  style="TEntry").pack(side='left', padx=10)
+
+        ttk.Label(self.frame,
+                 text="minutes",
+                 style="Subtitle.TLabel").pack(side='left')
+
+        self.remove_button = ttk.Button(self.frame,
+                                        style="TButton",
+                                        command=lambda: self.settings.toggle_remove(self.app_name))
+        self.remove_button.pack(side='left', padx=10)
+
+    def show(self, app_name):
+        """Bind the row to an app; widgets are only touched if something changed"""
+        state = (app_name, self.settings.limit_text(app_name),
+                 app_name in self.settings.staged_removals,
+                 app_name in self.settings.staged_limits)
+        if state == self.state:
+            return
+        self.state = state
+        self.app_name = app_name
+        _, limit_text, removing, edited = state
+
+        marker = "🗑️" if removing else ("✏️" if edited else "🎮")
+        self.label.configure(text=f"{marker} {app_name}")
+        if self.limit_var.get() != limit_text:
+            self.binding = True
+            self.limit_var.set(limit_text)
+            self.binding = False
+        self.remove_button.configure(text="Undo" if removing else "Remove")
+
+    def on_edit(self, *args):
+        if not self.binding and self.app_name is not None:
+            self.settings.stage_limit(self.app_name, self.limit_var.get())
+            self.state = None
+            self.show(self.app_name)
+
+class VirtualList(ttk.Frame):
+    """Scrollable list that only creates widgets for the visible rows
+
+    A fixed pool of rows is rebound to whichever items are in view, so
+    hundreds of apps cost the same to display as a dozen.
+    """
+    def __init__(self, parent, make_row, visible_rows=10):
+        super().__init__(parent, style="Card.TFrame")
+        self.items = []
+        self.first = 0
+        self.body = ttk.Frame(self, style="Card.TFrame")
+        self.body.pack(side='left', fill='both', expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.on_scroll)
+        self.scrollbar.pack(side='right', fill='y')
+        self.rows = [make_row(self.body) for _ in range(visible_rows)]
+        # The pointer is nearly always over a row, and wheel events go to the
+        # widget under it, so every widget in the list gets the bindings
+        self.bind_wheel(self)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", lambda event: self.scroll_to(self.first - 1))
+        widget.bind("<Button-5>", lambda event: self.scroll_to(self.first + 1))
+        for child in widget.winfo_children():
+            self.bind_wheel(child)
+
+    def set_items(self, items):
+        self.items = items
+        self.scroll_to(self.first)
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.items)))
+        elif unit == "pages":
+            self.scroll_to(self.first + int(amount) * len(self.rows))
+        else:
+            self.scroll_to(self.first + int(amount))
+
+    def on_wheel(self, event):
+        self.scroll_to(self.first - (1 if event.delta > 0 else -1))
+
+    def scroll_to(self, first):
+        self.first = max(0, min(first, len(self.items) - len(self.rows)))
+        self.refresh()
+
+    def refresh(self):
+        """Rebind the row pool to the items in view"""
+        visible = self.items[self.first:self.first + len(self.rows)]
+        for i, row in enumerate(self.rows):
+            if i < len(visible):
+                row.show(visible[i])
+                if not row.frame.winfo_manager():
+                    row.frame.pack(fill='x', pady=5, padx=10)
+            elif row.frame.winfo_manager():
+                row.frame.pack_forget()
+        if self.items:
+            self.scrollbar.set(self.first / len(self.items),
+                               (self.first + len(visible)) / len(self.items))
+        else:
+            self.scrollbar.set(0, 1)
 
 class SettingsFrame(ttk.Frame):
     def __init__(self, parent, data_manager):
         super().__init__(parent, style="TFrame")
         self.data_manager = data_manager
+        self.limits = {}
+        self.staged_limits = {}     # app_name -> limit text, saved on commit
+        self.staged_removals = set()
+        self.filtered_apps = []
+        self.search_index = PrefixIndex()
         self.setup_ui()
 
     def setup_ui(self):
@@ -255,75 +485,167 @@ class SettingsFrame(ttk.Frame):
         ttk.Label(self, text="⏱️ Time Limits", 
                  style="Title.TLabel").pack(anchor='w', pady=(20,10))
 
-        self.limits_frame = ttk.Frame(self, style="Card.TFrame")
-        self.limits_frame.pack(fill='x')
+        search_frame = ttk.Frame(self, style="Card.TFrame")
+        search_frame.pack(fill='x', padx=10, pady=5)
+
+        ttk.Label(search_frame,
+                 text="🔍",
+                 style="Subtitle.TLabel").pack(side='left', padx=5)
+
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.apply_filter)
+        ttk.Entry(search_frame,
+                  textvariable=self.search_var,
+                  width=30,
+                  style="TEntry").pack(side='left', padx=(0,10))
+
+        self.limits_list = VirtualList(self, lambda parent: LimitRow(parent, self))
+        self.limits_list.pack(fill='x', padx=10)
+
+        # Edits are staged and written in one go
+        commit_frame = ttk.Frame(self, style="Card.TFrame")
+        commit_frame.pack(fill='x', padx=10, pady=5)
+
+        ttk.Button(commit_frame,
+                  text="Save Changes",
+                  style="TButton",
+                  command=self.commit_changes).pack(side='left', padx=5, pady=5)
+
+        ttk.Button(commit_frame,
+                  text="Discard",
+                  style="TButton",
+                  command=self.discard_changes).pack(side='left', padx=5)
+
+        self.pending_label = ttk.Label(commit_frame, text="", style="Subtitle.TLabel")
+        self.pending_label.pack(side='left', padx=10)
 
         self.update_limits_ui()
 
+        # Export section
+        ttk.Label(self, text="📤 Export Your Data", 
+                 style="Title.TLabel").pack(anchor='w', pady=(20,10))
+
+        export_frame = ttk.Frame(self, style="Card.TFrame")
+        export_frame.pack(fill='x', padx=10, pady=5)
+
+        ttk.Button(export_frame,
+                  text="Export...",
+                  style="TButton",
+                  command=self.export_data).pack(side='left', padx=5, pady=5)
+
+        self.export_status = ttk.Label(export_frame, text="", style="Subtitle.TLabel")
+        self.export_status.pack(side='left', padx=10)
+
     def add_popular_app(self, app_name):
-        """Add a popular app to tracking"""
-        if app_name not in self.data_manager.data["limits"]:
-            self.data_manager.set_app_limit(app_name, 60)  # Default 1 hour limit
-            self.update_limits_ui()
+        """Stage a popular app for tracking"""
+        if app_name not in self.tracked_apps():
+            self.staged_limits[app_name] = "60"  # Default 1 hour limit
+            self.stage_changed(app_name)
 
     def add_new_app(self):
-        """Add new app to track"""
+        """Stage a new app to track"""
         new_app = self.new_app_var.get().strip()
         if new_app:
-            self.data_manager.set_app_limit(new_app, 0)
+            if new_app not in self.tracked_apps():
+                self.staged_limits[new_app] = "0"
+                self.stage_changed(new_app)
             self.new_app_var.set("")
-            self.update_limits_ui()
-
-    def update_limits_ui(self):
-        """Update the limits UI"""
-        for widget in self.limits_frame.winfo_children():
-            widget.destroy()
-
-        for app_name in self.data_manager.data["limits"].keys():
-            app_frame = ttk.Frame(self.limits_frame, style="Card.TFrame")
-            app_frame.pack(fill='x', pady=5, padx=10)
-
-            ttk.Label(app_frame, 
-                     text=f"🎮 {app_name}",
-                     style="Subtitle.TLabel").pack(side='left', padx=5)
 
-            limit_var = tk.StringVar(value=str(self.data_manager.get_app_limit(app_name)))
-            limit_entry = ttk.Entry(app_frame,
-                                  textvariable=limit_var,
-                                  width=10,
-                                  style="TEntry")
-            limit_entry.pack(side='left', padx=10)
+    def tracked_apps(self):
+        """Saved apps plus staged additions"""
+        return set(self.data_manager.data["limits"]) | set(self.staged_limits)
 
-            ttk.Label(app_frame,
-                     text="minutes",
-                     style="Subtitle.TLabel").pack(side='left')
+    def stage_changed(self, new_app=None):
+        if new_app:
+            self.search_index.add(new_app)
+        self.apply_filter()
+        self.update_pending_label()
 
-            ttk.Button(app_frame,
-                      text="Save",
-                      style="TButton",
-                      command=lambda a=app_name, v=limit_var: self.save_limit(a, v)).pack(side='left', padx=10)
+    def update_limits_ui(self):
+        """Reload saved limits and rebuild the search index"""
+        self.limits = dict(self.data_manager.data["limits"])
+        self.search_index = PrefixIndex(self.tracked_apps())
+        self.apply_filter()
+        self.update_pending_label()
+
+    def apply_filter(self, *args):
+        """Show the apps matching the search box"""
+        query = self.search_var.get().strip()
+        if query:
+            tracked = self.tracked_apps()
+            self.filtered_apps = [app_name for app_name in self.search_index.search(query) if app_name in tracked]
+        else:
+            self.filtered_apps = sorted(self.tracked_apps(), key=str.lower)
+        self.limits_list.set_items(self.filtered_apps)
+
+    def limit_text(self, app_name):
+        if app_name in self.staged_limits:
+            return self.staged_limits[app_name]
+        return str(self.limits.get(app_name, 0))
+
+    def stage_limit(self, app_name, text):
+        """Called by a row when its entry is edited"""
+        if text == str(self.limits.get(app_name)) and app_name in self.limits:
+            self.staged_limits.pop(app_name, None)
+        else:
+            self.staged_limits[app_name] = text
+        self.update_pending_label()
+
+    def toggle_remove(self, app_name):
+        if app_name in self.staged_removals:
+            self.staged_removals.discard(app_name)
+        elif app_name in self.limits:
+            self.staged_removals.add(app_name)
+        else:
+            # Staged addition that was never saved
+            self.staged_limits.pop(app_name, None)
+            self.apply_filter()
+        self.limits_list.refresh()
+        self.update_pending_label()
+
+    def update_pending_label(self):
+        count = len(self.staged_limits) + len(self.staged_removals)
+        self.pending_label.configure(text=f"✏️ {count} unsaved change{'s' if count != 1 else ''}" if count else "")
+
+    def commit_changes(self):
+        """Save every staged edit with one DataManager call"""
+        limits = {}
+        for app_name, text in self.staged_limits.items():
+            if app_name in self.staged_removals:
+                continue
+            try:
+                limits[app_name] = int(text)
+            except ValueError:
+                self.pending_label.configure(text=f"❌ {app_name}: limit must be a whole number")
+                return
+        if limits or self.staged_removals:
+            self.data_manager.update_limits(limits, sorted(self.staged_removals))
+        self.discard_changes()
+
+    def discard_changes(self):
+        self.staged_limits = {}
+        self.staged_removals = set()
+        self.update_limits_ui()
 
-            ttk.Button(app_frame,
-                      text="Remove",
-                      style="TButton",
-                      command=lambda a=app_name: self.remove_app(a)).pack(side='left')
-
-    def save_limit(self, app_name, limit_var):
-        """Save app time limit"""
-        try:
-            limit = int(limit_var.get())
-            self.data_manager.set_app_limit(app_name, limit)
-        except ValueError:
-            pass
-
-    def remove_app(self, app_name):
-        """Remove app from tracking"""
-        if app_name in self.data_manager.data["limits"]:
-            del self.data_manager.data["limits"][app_name]
-            if app_name in self.data_manager.data["usage"]:
-                del self.data_manager.data["usage"][app_name]
-            self.data_manager.save_data()
-            self.update_limits_ui()
-
-# Apply custom styling
-CustomStyle.apply()
\ No newline at end of file
+    def export_data(self):
+        """Export history or a chart report on a worker thread"""
+        from tkinter import filedialog
+        from usage_export import ExportJob
+
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson"), ("Parquet", "*.parquet"),
+                       ("PNG report", "*.png"), ("SVG report", "*.svg")])
+        if not path:
+            return
+        self.export_status.configure(text="⏳ Exporting...")
+        self.poll_export(ExportJob(self.data_manager, path))
+
+    def poll_export(self, job):
+        if not job.done():
+            self.after(200, self.poll_export, job)
+        elif job.error:
+            self.export_status.configure(text=f"❌ Export failed: {job.error}")
+        else:
+            self.export_status.configure(text=f"✅ Saved {os.path.basename(job.path)}")
@@ -0,0 +1,97 @@
+import time
+from datetime import datetime, timedelta
+
+
+class UsageAccumulator:
+    """Per-thread usage counters flushed to DataManager in batches
+
+    Only the owning (monitor) thread touches the counters; DataManager is
+    reached through update_usage_batch, which takes its lock once per flush.
+    """
+
+    def __init__(self, data_manager, flush_interval=5.0):
+        self.data_manager = data_manager
+        self.flush_interval = flush_interval
+        self.pending = {}  # app_name -> seconds not yet flushed
+        self.totals = {}   # app_name -> today's total, including pending
+        self.day = None
+        self.day_end = 0
+        self.limits_version = None
+        self.last_flush = time.monotonic()
+
+    def current_day(self):
+        """Today's date key, recomputed only when midnight passes"""
+        now = time.time()
+        if now >= self.day_end:
+            # Usage counted before midnight belongs to the old day
+            self.flush()
+            today = datetime.now()
+            self.day = today.strftime("%Y-%m-%d")
+            midnight = datetime.combine(today.date() + timedelta(days=1), datetime.min.time())
+            self.day_end = midnight.timestamp()
+            self.totals = {}
+        return self.day
+
+    def add(self, app_name, seconds):
+        """Count seconds of usage for an app"""
+        total = self.total(app_name)
+        self.pending[app_name] = self.pending.get(app_name, 0) + seconds
+        self.totals[app_name] = total + seconds
+
+    def add_many(self, increments):
+        """Count one tick's seconds for several apps at once"""
+        for app_name, seconds in increments.items():
+            self.add(app_name, seconds)
+
+    def total(self, app_name):
+        """Today's running total for an app, including unflushed seconds"""
+        self.current_day()
+        self.check_limits_version()
+        if app_name not in self.totals:
+            stored = self.data_manager.get_today_usage(app_name)
+            self.totals[app_name] = stored + self.pending.get(app_name, 0)
+        return self.totals[app_name]
+
+    def check_limits_version(self):
+        """Drop totals, and the unflushed seconds of removed apps, after a limits change"""
+        limits_version = self.data_manager.limits_version
+        if limits_version == self.limits_version:
+            return
+        # Apps may have been removed along with their history; flushing
+        # their pending seconds would bring them back
+        for app_name in self.data_manager.removed_since(self.limits_version):
+            self.pending.pop(app_name, None)
+        self.limits_version = limits_version
+        self.totals = {}
+
+    def invalidate(self, app_names):
+        """Forget cached totals for apps whose stored usage changed behind our back"""
+        for app_name in app_names:
+            self.totals.pop(app_name, None)
+
+    def flush(self):
+        """Hand all whole pending seconds to DataManager as one batch
+
+        Fractional seconds from tick attribution stay pending until they
+        add up to a whole second.
+        """
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return
+        self.check_limits_version()
+        batch = {}
+        remainder = {}
+        for app_name, seconds in self.pending.items():
+            whole = int(seconds)
+            if whole:
+                batch[app_name] = whole
+            if seconds > whole:
+                remainder[app_name] = seconds - whole
+        self.pending = remainder
+        if batch:
+            self.data_manager.update_usage_batch(batch, self.day)
+
+    def flush_if_due(self):
+        """Flush if the pending seconds are older than the flush interval"""
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
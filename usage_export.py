@@ -0,0 +1,209 @@
+"""Export usage history as CSV, NDJSON or Parquet, and chart reports as PNG/SVG
+
+Rows are produced one app at a time and written as they are generated,
+so memory stays flat however long the history is.
+
+    python usage_export.py usage.csv
+    python usage_export.py usage.parquet --since 2024-01-01
+    python usage_export.py report.svg --granularity week --periods 12
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+from itertools import islice
+
+COLUMNS = ["date", "app", "seconds", "minutes", "limit_minutes"]
+TABLE_FORMATS = (".csv", ".ndjson", ".jsonl", ".parquet")
+REPORT_FORMATS = (".png", ".svg")
+PARQUET_BATCH = 10000
+
+
+def usage_rows(data_manager, apps=None, since=None, until=None):
+    """Yield (date, app, seconds, minutes, limit_minutes) per app and day"""
+    for app_name in apps or sorted(data_manager.get_usage_apps()):
+        limit = data_manager.get_app_limit(app_name)
+        for date, seconds in data_manager.get_usage_between(app_name, since or "0001-01-01",
+                                                             until or "9999-12-31").items():
+            yield date, app_name, seconds, round(seconds / 60, 2), limit
+
+
+def batched(rows, size):
+    """Group an iterator into lists of up to size items"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def write_csv(rows, path):
+    count = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_ndjson(rows, path):
+    count = 0
+    with open(path, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(COLUMNS, row)), separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+
+def write_parquet(rows, path):
+    """Write row groups of PARQUET_BATCH rows; needs pyarrow"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    schema = pa.schema([("date", pa.string()), ("app", pa.string()), ("seconds", pa.int64()),
+                        ("minutes", pa.float64()), ("limit_minutes", pa.int64())])
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for batch in batched(rows, PARQUET_BATCH):
+            columns = list(zip(*batch))
+            writer.write_batch(pa.record_batch([list(column) for column in columns], schema=schema))
+            count += len(batch)
+    return count
+
+
+WRITERS = {
+    ".csv": write_csv,
+    ".ndjson": write_ndjson,
+    ".jsonl": write_ndjson,
+    ".parquet": write_parquet
+}
+
+
+def export_usage(data_manager, path, since=None, until=None):
+    """Stream usage history to path; the format follows the extension"""
+    writer = WRITERS.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        raise ValueError(f"unsupported export format: {path}")
+    tmp_path = path + ".tmp"
+    try:
+        count = writer(usage_rows(data_manager, since=since, until=until), tmp_path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def render_report(data_manager, path, granularity="day", periods=30):
+    """Draw a usage chart off-screen with the app's styling and save it as PNG or SVG"""
+    import matplotlib.style
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from ui_components import CustomStyle
+
+    app_names, labels, totals = data_manager.get_usage_history(granularity, periods)
+    with matplotlib.style.context('dark_background'):
+        fig = Figure(figsize=(12, 6))
+        FigureCanvasAgg(fig)  # Agg needs no display, so this also works headless
+        fig.patch.set_facecolor(CustomStyle.BG_COLOR)
+        ax = fig.add_subplot()
+        ax.set_facecolor(CustomStyle.CARD_BG)
+        ax.set_title(f"Screen time, last {periods} {granularity}s", color=CustomStyle.TEXT_COLOR)
+        ax.set_xlabel(granularity.capitalize(), fontsize=12, color=CustomStyle.TEXT_COLOR)
+        ax.set_ylabel('Minutes', fontsize=12, color=CustomStyle.TEXT_COLOR)
+        ax.tick_params(axis='both', colors=CustomStyle.TEXT_COLOR)
+        ax.grid(True, alpha=0.2, color=CustomStyle.SECONDARY_COLOR)
+        for i, app_name in enumerate(app_names):
+            if not totals[i].any():
+                continue
+            color = CustomStyle.CHART_COLORS[i % len(CustomStyle.CHART_COLORS)]
+            ax.plot(range(len(labels)), totals[i] / 60, label=app_name, color=color,
+                    marker='o', linewidth=3, markerfacecolor=color,
+                    markeredgecolor='white', markeredgewidth=2, markersize=6)
+        step = max(1, len(labels) // 12)
+        ax.set_xticks(range(0, len(labels), step))
+        ax.set_xticklabels(labels[::step], rotation=45, ha='right')
+        if ax.get_lines():
+            ax.legend(frameon=True, facecolor=CustomStyle.CARD_BG, edgecolor=CustomStyle.SECONDARY_COLOR)
+        fig.tight_layout()
+        fig.savefig(path, facecolor=fig.get_facecolor())
+    return len(app_names)
+
+
+def export(data_manager, path, **options):
+    """Write a table export or a chart report, depending on the extension"""
+    if os.path.splitext(path)[1].lower() in REPORT_FORMATS:
+        return render_report(data_manager, path, options.get("granularity", "day"), options.get("periods", 30))
+    return export_usage(data_manager, path, options.get("since"), options.get("until"))
+
+
+class ExportJob:
+    """Runs an export on a worker thread; poll done() from the Tk thread"""
+
+    def __init__(self, data_manager, path, **options):
+        self.path = path
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(data_manager, path, options), daemon=True)
+        self.thread.start()
+
+    def run(self, data_manager, path, options):
+        try:
+            self.result = export(data_manager, path, **options)
+        except Exception as e:
+            self.error = e
+
+    def done(self):
+        return not self.thread.is_alive()
+
+
+def main():
+    from tracker_service import default_socket_path, service_running
+
+    parser = argparse.ArgumentParser(description="Export screen time history")
+    parser.add_argument("output", help=f"file to write: {', '.join(TABLE_FORMATS + REPORT_FORMATS)}")
+    parser.add_argument("--data-file", default="usage_data.json", help="data file when no tracker service is running")
+    parser.add_argument("--socket", default=default_socket_path(), help="tracker service socket")
+    parser.add_argument("--since", help="first date to export (YYYY-MM-DD)")
+    parser.add_argument("--until", help="last date to export (YYYY-MM-DD)")
+    parser.add_argument("--granularity", choices=["day", "week", "month"], default="day", help="report periods")
+    parser.add_argument("--periods", type=int, default=30, help="number of periods in a report")
+    args = parser.parse_args()
+
+    # Read through the running tracker if there is one, so its data file isn't opened twice
+    file_lock = None
+    if service_running(args.socket):
+        from tracker_client import RemoteDataManager
+        data_manager = RemoteDataManager(args.socket)
+    else:
+        from data_manager import DataFileLock, DataManager
+        try:
+            # Closing a DataManager writes its file, which would clobber an open tracker window's
+            file_lock = DataFileLock(args.data_file).acquire()
+        except RuntimeError as e:
+            print(f"{e}; close it, or run the tracker with --headless to export while it runs")
+            sys.exit(1)
+        data_manager = DataManager(args.data_file)
+    try:
+        count = export(data_manager, args.output, since=args.since, until=args.until,
+                       granularity=args.granularity, periods=args.periods)
+    except (RuntimeError, ValueError) as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        data_manager.close()
+        if file_lock:
+            file_lock.release()
+    print(f"Wrote {count} {'apps' if args.output.lower().endswith(REPORT_FORMATS) else 'rows'} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+
+
+class UsageJournal:
+    """Append-only write-ahead log of usage increments
+
+    Increments are coalesced in memory and appended in groups with a
+    single fsync, so a crash loses at most ``flush_interval`` seconds.
+    Each journal file starts with a generation header; a snapshot that
+    has folded in generation N makes any journal of generation <= N stale.
+    """
+
+    def __init__(self, path, flush_interval=5.0, compact_bytes=1024 * 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.compact_bytes = compact_bytes
+        self.generation = 0
+        self.pending = {}  # (app_name, date) -> seconds
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.file = None
+
+    def replay(self, usage, snapshot_generation):
+        """Apply journaled increments newer than the snapshot to usage
+
+        Returns True if anything was replayed or the journal needs rewriting.
+        """
+        self.generation = snapshot_generation + 1
+        if not os.path.exists(self.path):
+            return False
+
+        dirty = False
+        with open(self.path, 'r') as f:
+            try:
+                header = json.loads(f.readline())
+                generation = header["generation"]
+            except (ValueError, KeyError, TypeError):
+                return True
+
+            if generation <= snapshot_generation:
+                return True  # Already folded into the snapshot
+
+            self.generation = generation
+            for line in f:
+                try:
+                    app_name, date, seconds = json.loads(line)
+                except (ValueError, TypeError):
+                    return True  # Torn tail from a crash mid-append
+                app_usage = usage.setdefault(app_name, {})
+                app_usage[date] = app_usage.get(date, 0) + seconds
+                dirty = True
+        return dirty
+
+    def append(self, app_name, date, seconds):
+        """Buffer an increment; it reaches disk on the next flush"""
+        with self.lock:
+            key = (app_name, date)
+            self.pending[key] = self.pending.get(key, 0) + seconds
+
+    def due(self):
+        """Whether the buffered increments are older than the flush interval"""
+        return bool(self.pending) and time.monotonic() - self.last_flush >= self.flush_interval
+
+    def flush(self):
+        """Append all buffered increments with one write and one fsync"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+            if not pending:
+                return
+
+            if self.file is None:
+                self.file = open(self.path, 'a')
+                if self.file.tell() == 0:
+                    self.file.write(json.dumps({"generation": self.generation}) + "\n")
+
+            lines = [json.dumps([app_name, date, seconds]) for (app_name, date), seconds in pending.items()]
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def needs_compaction(self):
+        """Whether the journal has grown enough to fold into a snapshot"""
+        return self.file is not None and self.file.tell() >= self.compact_bytes
+
+    def rotate(self):
+        """Start a new, empty journal generation after a snapshot was written
+
+        Increments buffered before the snapshot are dropped, since the
+        snapshot already contains them.
+        """
+        with self.lock:
+            self.pending = {}
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.generation += 1
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps({"generation": self.generation}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def close(self):
+        """Flush outstanding increments and close the journal file"""
+        self.flush()
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
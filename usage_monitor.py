@@ -1,73 +1,153 @@
-import time
-import psutil
-from datetime import datetime
+import queue
+import threading
+from metrics import metrics
+from app_classifier import AppClassifier
+from attribution import DEFAULT_POLICY, create_policy
+from idle_detector import DEFAULT_IDLE_THRESHOLD, IdleDetector, create_idle_source
+from limit_scheduler import LimitScheduler
+from process_tracker import ProcessTracker
+from tick_scheduler import TickScheduler
+from usage_accumulator import UsageAccumulator
+
+TRACKED_APPS = {
+    "chrome": "Google Chrome",
+    "firefox": "Firefox",
+    "msedge": "Microsoft Edge",
+    "netflix": "Netflix",
+    "youtube": "YouTube"
+}
 
 class UsageMonitor:
     def __init__(self, data_manager, notification_system):
         self.data_manager = data_manager
         self.notification_system = notification_system
         self.running = False
-        self.tracked_apps = {
-            "chrome": "Google Chrome",
-            "firefox": "Firefox",
-            "msedge": "Microsoft Edge",
-            "netflix": "Netflix",
-            "youtube": "YouTube"
-        }
-
-    def get_active_window_process(self):
-        """Get the currently active window process name"""
+        self.stop_event = threading.Event()
+        self.tracked_apps = dict(TRACKED_APPS)
+        self.classifier = AppClassifier()
+        self.classifier.update_rules(self.tracked_apps)
+        self.rules_version = None
+        self.accumulator = UsageAccumulator(data_manager)
+        self.limit_scheduler = LimitScheduler(data_manager, self.accumulator, notification_system)
+        self.process_tracker = ProcessTracker(self.classifier.classify)
+        self.tick_scheduler = TickScheduler()
+        threshold = data_manager.data["settings"].get("idle_threshold", DEFAULT_IDLE_THRESHOLD)
+        self.idle_detector = IdleDetector(create_idle_source(), threshold)
+        self.idle = False
+        self.attribution = create_policy(data_manager.data["settings"].get("attribution_policy", DEFAULT_POLICY))
+        self.browser_history = None
+        self.site_credits = queue.SimpleQueue()  # {date: {app_name: seconds}} from the ingester thread
+        if data_manager.data["settings"].get("browser_history", True):
+            from browser_history import BrowserHistoryIngester
+            self.browser_history = BrowserHistoryIngester(data_manager, self.site_domains,
+                                                          data_manager.data_file + ".browser",
+                                                          on_credit=self.site_credits.put)
+            # Sites are counted from history, so don't also count them from cmdlines
+            self.classifier.match_sites = False
+
+    def refresh_rules(self):
+        """Recompile classification rules when the tracked app set changes"""
+        limits_version = self.data_manager.limits_version
+        if limits_version == self.rules_version:
+            return
+        self.rules_version = limits_version
+        if self.classifier.update_rules(self.tracked_apps, list(self.data_manager.data["limits"])):
+            self.process_tracker.reclassify()
+
+    def site_domains(self):
+        """{domain: app_name} for the tracked sites"""
+        return {domain: app_name for domain, (_, app_name) in self.classifier.site_rules.items()}
+
+    def get_active_apps(self):
+        """Get {app_name: share of the tick} for the tracked apps in use"""
         try:
-            for proc in psutil.process_iter(['name', 'cmdline']):
-                try:
-                    process_name = proc.info['name'].lower()
-                    cmdline = proc.info.get('cmdline', [])
-
-                    # Check for browser processes with specific URLs
-                    if cmdline:
-                        for arg in cmdline:
-                            if isinstance(arg, str):
-                                if 'youtube.com' in arg.lower():
-                                    return 'youtube', 'YouTube'
-                                if 'netflix.com' in arg.lower():
-                                    return 'netflix', 'Netflix'
-
-                    # Check for browser processes
-                    for app_name in ['chrome', 'firefox', 'msedge']:
-                        if app_name in process_name:
-                            return app_name, self.tracked_apps[app_name]
-
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            return None, None
+            self.refresh_rules()
+            self.process_tracker.refresh()
+            return self.attribution.shares(self.process_tracker)
         except Exception as e:
-            print(f"Error in get_active_window_process: {e}")
-            return None, None
+            metrics.inc("monitor_errors_total")
+            print(f"Error in get_active_apps: {e}")
+            return {}
 
     def start_monitoring(self):
         """Start monitoring app usage"""
         self.running = True
+        self.stop_event.clear()
+        self.tick_scheduler.start()
+        if self.browser_history:
+            self.browser_history.start(self.stop_event)
+        previous_shares = {}
         while self.running:
-            process_name, app_name = self.get_active_window_process()
+            if self.idle_detector.is_idle():
+                # Nobody is at the machine: stop scanning and counting
+                self.sleep_until_active()
+                previous_shares = {}
+                continue
+
+            shares = self.get_active_apps()
+
+            # Update usage time with the real time since the last tick
+            self.accumulator.add_many(self.attribute(previous_shares, shares, self.tick_scheduler.elapsed()))
+            self.tick_scheduler.adapt(changed=shares.keys() != previous_shares.keys())
+            previous_shares = shares
 
-            if process_name and app_name:
-                current_time = datetime.now()
+            # Notify when an active app crosses a limit threshold
+            self.limit_scheduler.update(shares)
+            self.apply_site_credits()
 
-                # Update usage time
-                self.data_manager.update_app_usage(app_name, 1)  # Add 1 second
+            self.accumulator.flush_if_due()
+            self.data_manager.flush_if_due()
+            if not self.tick_scheduler.wait(self.stop_event, self.limit_scheduler.deadline):
+                break
 
-                # Check limits and notify if exceeded
-                daily_limit = self.data_manager.get_app_limit(app_name)
-                if daily_limit:
-                    current_usage = self.data_manager.get_today_usage(app_name)
-                    if current_usage >= daily_limit * 60:  # Convert minutes to seconds
-                        self.notification_system.show_notification(
-                            f"{app_name} Usage Limit",
-                            f"You have exceeded your daily limit for {app_name}"
-                        )
+        # Hand over whatever was counted since the last batch
+        self.accumulator.flush()
 
-            time.sleep(1)  # Check every second
+    def apply_site_credits(self):
+        """Check limits for sites the browser history ingester credited since the last tick
+
+        The ingester writes to DataManager directly, so the accumulator's
+        cached totals for those apps are stale and are re-read first.
+        """
+        app_names = set()
+        while True:
+            try:
+                credited = self.site_credits.get_nowait()
+            except queue.Empty:
+                break
+            for increments in credited.values():
+                app_names.update(increments)
+        if app_names:
+            self.accumulator.invalidate(app_names)
+            self.limit_scheduler.check_now(app_names)
+
+    def sleep_until_active(self):
+        """Low-frequency sleeping state that only polls the idle source"""
+        self.idle = True
+        metrics.set("monitor_idle", 1)
+        metrics.inc("idle_periods_total")
+        self.accumulator.flush()
+        self.data_manager.flush()
+        self.idle_detector.wait_for_activity(self.stop_event)
+        self.idle = False
+        metrics.set("monitor_idle", 0)
+        # Don't credit the time spent away to whatever app is open
+        self.tick_scheduler.start()
+
+    def attribute(self, previous_shares, shares, elapsed):
+        """Split the interval between two ticks by the shares seen at its ends
+
+        Any change happened somewhere in between, so each end counts for
+        half; an app with the same share at both ends gets exactly that.
+        """
+        increments = {}
+        for app_name in previous_shares.keys() | shares.keys():
+            share = (previous_shares.get(app_name, 0) + shares.get(app_name, 0)) / 2
+            if share > 0:
+                increments[app_name] = elapsed * share
+        return increments
 
     def stop_monitoring(self):
         """Stop monitoring app usage"""
-        self.running = False
\ No newline at end of file
+        self.running = False
+        self.stop_event.set()
\ No newline at end of file
@@ -0,0 +1,120 @@
+from datetime import date
+import numpy as np
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def period_index(granularity, day):
+    """Integer period for a date: days since 0001-01-01, ISO weeks, or months"""
+    if granularity == "day":
+        return day.toordinal()
+    if granularity == "week":
+        # date(1, 1, 1) is a Monday, so this lines up with ISO weeks
+        return (day.toordinal() - 1) // 7
+    return day.year * 12 + day.month - 1
+
+
+def period_label(granularity, index):
+    """Human-readable label for a period index"""
+    if granularity == "day":
+        return date.fromordinal(index).strftime("%Y-%m-%d")
+    if granularity == "week":
+        year, week, _ = date.fromordinal(index * 7 + 1).isocalendar()
+        return f"{year}-W{week:02d}"
+    year, month = divmod(index, 12)
+    return f"{year}-{month + 1:02d}"
+
+
+class RollupSeries:
+    """Dense (app x period) totals for one granularity, grown on demand"""
+
+    def __init__(self):
+        self.base = None  # Period index of column 0
+        self.totals = np.zeros((0, 0), dtype=np.int64)
+
+    def add(self, app_id, index, seconds):
+        if self.base is None:
+            self.base = index
+        if index < self.base:
+            shift = self.base - index
+            self.totals = np.pad(self.totals, ((0, 0), (shift, 0)))
+            self.base = index
+        column = index - self.base
+        rows, columns = self.totals.shape
+        if app_id >= rows or column >= columns:
+            # Grow geometrically so appends stay amortised O(1)
+            new_rows = max(rows, app_id + 1) if app_id < rows else max(app_id + 1, rows * 2)
+            new_columns = max(columns, column + 1) if column < columns else max(column + 1, columns * 2)
+            self.totals = np.pad(self.totals, ((0, new_rows - rows), (0, new_columns - columns)))
+        self.totals[app_id, column] += seconds
+
+    def last(self, app_ids, periods, end_index):
+        """Totals for the given app rows over the periods ending at end_index"""
+        result = np.zeros((len(app_ids), periods), dtype=np.int64)
+        if self.base is None or not len(app_ids):
+            return result
+        start_index = end_index - periods + 1
+        lo = max(start_index, self.base)
+        hi = min(end_index + 1, self.base + self.totals.shape[1])
+        if lo >= hi:
+            return result
+        rows = np.asarray(app_ids)
+        in_range = rows < self.totals.shape[0]
+        result[in_range, lo - start_index:hi - start_index] = \
+            self.totals[rows[in_range], lo - self.base:hi - self.base]
+        return result
+
+    def clear_row(self, app_id):
+        if app_id < self.totals.shape[0]:
+            self.totals[app_id, :] = 0
+
+
+class UsageRollups:
+    """Per-app usage totals at day, ISO-week and month granularity
+
+    Totals are updated incrementally as usage is recorded, so history
+    queries slice arrays instead of rescanning raw per-day entries.
+    """
+
+    def __init__(self):
+        self.app_ids = {}  # app_name -> row in every series
+        self.next_id = 0
+        self.series = {granularity: RollupSeries() for granularity in GRANULARITIES}
+        self.period_cache = {}  # "YYYY-MM-DD" -> period index per granularity
+
+    def build(self, rows):
+        """Load (app_name, "YYYY-MM-DD", seconds) rows from storage"""
+        for app_name, date_str, seconds in rows:
+            self.record(app_name, date_str, seconds)
+
+    def record(self, app_name, date_str, seconds):
+        """Add seconds of usage on a date to every granularity"""
+        app_id = self.app_ids.get(app_name)
+        if app_id is None:
+            app_id = self.app_ids[app_name] = self.next_id
+            self.next_id += 1
+        indexes = self.period_cache.get(date_str)
+        if indexes is None:
+            day = date.fromisoformat(date_str)
+            indexes = self.period_cache[date_str] = [period_index(granularity, day) for granularity in GRANULARITIES]
+        for granularity, index in zip(GRANULARITIES, indexes):
+            self.series[granularity].add(app_id, index, seconds)
+
+    def remove_app(self, app_name):
+        app_id = self.app_ids.pop(app_name, None)
+        if app_id is not None:
+            # Rows are not reused, just zeroed, so other ids stay valid
+            for series in self.series.values():
+                series.clear_row(app_id)
+
+    def last(self, granularity, periods, end=None):
+        """Return (app_names, labels, totals) for the last n periods
+
+        totals is an (apps x periods) int64 array of seconds, oldest
+        period first.
+        """
+        end_index = period_index(granularity, end or date.today())
+        app_names = list(self.app_ids)
+        app_ids = list(self.app_ids.values())
+        labels = [period_label(granularity, index) for index in range(end_index - periods + 1, end_index + 1)]
+        return app_names, labels, self.series[granularity].last(app_ids, periods, end_index)
@@ -0,0 +1,254 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+from datetime import date
+from functools import lru_cache
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=8192)
+def epoch_day(date_str):
+    """Days since 1970-01-01 for a "YYYY-MM-DD" key"""
+    return date.fromisoformat(date_str).toordinal() - EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=8192)
+def day_key(day):
+    """"YYYY-MM-DD" key for an epoch day"""
+    return date.fromordinal(day + EPOCH_ORDINAL).isoformat()
+
+
+def is_date_key(key):
+    return len(key) == 10 and key[4] == "-" and key[7] == "-"
+
+
+MAX_SECONDS = 2 ** 32 - 1  # A day's counter is a uint32
+
+
+def out_of_range(day, seconds):
+    return ValueError(f"{seconds} seconds on {day_key(day)} doesn't fit a day's counter (0..{MAX_SECONDS})")
+
+
+class DaySeries:
+    """Seconds per day for one app in a contiguous uint32 array
+
+    Slot i holds epoch day base + i; a zero slot means no usage that day.
+    A total that would leave 0..MAX_SECONDS raises ValueError without
+    changing any day.
+    """
+    __slots__ = ("base", "seconds")
+
+    def __init__(self):
+        self.base = None
+        self.seconds = array("I")
+
+    @classmethod
+    def from_dates(cls, pairs):
+        """Build from ("YYYY-MM-DD", seconds) pairs in any order, sized up front"""
+        series = cls()
+        if not pairs:
+            return series
+        dates, values = zip(*pairs)
+        days = list(map(epoch_day, dates))
+        base = series.base = min(days)
+        seconds = series.seconds = array("I", bytes(4 * (max(days) - base + 1)))
+        for day, value in zip(days, values):
+            try:
+                seconds[day - base] += value
+            except OverflowError:
+                raise out_of_range(day, seconds[day - base] + value) from None
+        return series
+
+    def _slot(self, day):
+        """Index for day, growing the array to cover it"""
+        if self.base is None:
+            self.base = day
+        if day < self.base:
+            self.seconds = array("I", bytes(4 * (self.base - day))) + self.seconds
+            self.base = day
+        offset = day - self.base
+        if offset >= len(self.seconds):
+            self.seconds.extend(array("I", bytes(4 * (offset + 1 - len(self.seconds)))))
+        return offset
+
+    def add(self, day, seconds):
+        offset = self._slot(day)  # May replace self.seconds
+        try:
+            self.seconds[offset] += seconds
+        except OverflowError:
+            raise out_of_range(day, self.seconds[offset] + seconds) from None
+
+    def set(self, day, seconds):
+        if seconds or self.get(day):
+            if not 0 <= seconds <= MAX_SECONDS:
+                raise out_of_range(day, seconds)
+            offset = self._slot(day)
+            self.seconds[offset] = seconds
+
+    def get(self, day):
+        if self.base is None:
+            return 0
+        offset = day - self.base
+        if 0 <= offset < len(self.seconds):
+            return self.seconds[offset]
+        return 0
+
+    def items(self, start=None, end=None):
+        """Yield (epoch_day, seconds) for days with usage in [start, end]"""
+        if self.base is None:
+            return
+        base = self.base
+        if start is None and end is None:
+            for offset, seconds in enumerate(self.seconds):
+                if seconds:
+                    yield base + offset, seconds
+            return
+        lo = 0 if start is None else max(0, start - base)
+        hi = len(self.seconds) if end is None else min(len(self.seconds), end - base + 1)
+        for offset in range(lo, hi):
+            seconds = self.seconds[offset]
+            if seconds:
+                yield base + offset, seconds
+
+    def __len__(self):
+        return len(self.seconds) - self.seconds.count(0)
+
+
+def json_default(obj):
+    """json.dump default= hook that writes the usage views as plain objects"""
+    if isinstance(obj, ColumnarUsage):
+        return obj.to_json()
+    if isinstance(obj, AppUsageView):
+        return dict(obj.items())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class AppUsageView(MutableMapping):
+    """{"YYYY-MM-DD": seconds} view of one app's DaySeries"""
+
+    def __init__(self, series):
+        self.series = series
+
+    def __getitem__(self, date_str):
+        seconds = self.series.get(epoch_day(date_str)) if is_date_key(date_str) else 0
+        if not seconds:
+            raise KeyError(date_str)
+        return seconds
+
+    def __setitem__(self, date_str, seconds):
+        self.series.set(epoch_day(date_str), seconds)
+
+    def __delitem__(self, date_str):
+        self[date_str]  # KeyError if absent
+        self.series.set(epoch_day(date_str), 0)
+
+    def __iter__(self):
+        for day, _ in self.series.items():
+            yield day_key(day)
+
+    def __len__(self):
+        return len(self.series)
+
+    def items(self):
+        return [(day_key(day), seconds) for day, seconds in self.series.items()]
+
+
+class ColumnarUsage(MutableMapping):
+    """Usage history with interned app ids and per-app day arrays
+
+    Behaves like the {app_name: {"YYYY-MM-DD": seconds}} dict it replaces,
+    so code that reads data["usage"] keeps working, while the storage
+    backend uses the id/epoch-day methods directly.
+
+    Plain per-day dicts, as json.load produces them, are kept as they are
+    and only turned into a DaySeries when the app is first touched, so
+    loading a snapshot costs no more than parsing it.
+    """
+
+    def __init__(self, usage=None):
+        self.app_ids = {}  # app_name -> index into series
+        self.series = []   # DaySeries (or a not yet converted dict) per app id; None once removed
+        for app_name, days in (usage or {}).items():
+            if type(days) is dict:
+                self.series.append(days)  # Converted by app_series on first use
+                self.app_ids[sys.intern(app_name)] = len(self.series) - 1
+            else:
+                self[app_name] = days
+
+    def app_series(self, app_id):
+        """The DaySeries for an app id, converting a loaded dict on first use"""
+        series = self.series[app_id]
+        if type(series) is dict:
+            series = self.series[app_id] = DaySeries.from_dates(list(series.items()))
+        return series
+
+    def app_id(self, app_name, create=False):
+        app_id = self.app_ids.get(app_name)
+        if app_id is None and create:
+            app_id = self.app_ids[sys.intern(app_name)] = len(self.series)
+            self.series.append(DaySeries())
+        return app_id
+
+    def add(self, app_name, date_str, seconds):
+        self.app_series(self.app_id(app_name, create=True)).add(epoch_day(date_str), seconds)
+
+    def get_seconds(self, app_name, date_str):
+        app_id = self.app_ids.get(app_name)
+        if app_id is None:
+            return 0
+        return self.app_series(app_id).get(epoch_day(date_str))
+
+    def get_range(self, app_name, start_date, end_date):
+        """Usage per date for start_date <= date <= end_date (missing days omitted)"""
+        app_id = self.app_ids.get(app_name)
+        if app_id is None:
+            return {}
+        days = self.app_series(app_id).items(epoch_day(start_date), epoch_day(end_date))
+        return {day_key(day): seconds for day, seconds in days}
+
+    def rows(self):
+        """Yield every (app_name, date, seconds) entry"""
+        for app_name, app_id in self.app_ids.items():
+            for day, seconds in self.app_series(app_id).items():
+                yield app_name, day_key(day), seconds
+
+    def __getitem__(self, app_name):
+        return AppUsageView(self.app_series(self.app_ids[app_name]))
+
+    def __setitem__(self, app_name, days):
+        app_id = self.app_id(app_name, create=True)
+        if isinstance(days, DaySeries):
+            self.series[app_id] = days
+            return
+        self.series[app_id] = DaySeries.from_dates(list(days.items()))
+
+    def __delitem__(self, app_name):
+        app_id = self.app_ids.pop(app_name)
+        self.series[app_id] = None  # Ids are never reused
+
+    def __iter__(self):
+        return iter(list(self.app_ids))
+
+    def __len__(self):
+        return len(self.app_ids)
+
+    def setdefault(self, app_name, default=None):
+        """Like dict.setdefault, but returns the live view for new apps too"""
+        if app_name not in self.app_ids:
+            self[app_name] = default or {}
+        return self[app_name]
+
+    def items(self):
+        return [(app_name, self[app_name]) for app_name in self.app_ids]
+
+    def to_json(self):
+        """{app_name: {"YYYY-MM-DD": seconds}}, reusing dicts that were never converted"""
+        usage = {}
+        for app_name, app_id in self.app_ids.items():
+            series = self.series[app_id]
+            if type(series) is dict:
+                usage[app_name] = series
+            else:
+                usage[app_name] = {day_key(day): seconds for day, seconds in series.items()}
+        return usage
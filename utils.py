@@ -1,3 +1,4 @@
+import bisect
 from datetime import datetime, timedelta
 
 def format_time(seconds):
@@ -18,3 +19,29 @@ def get_date_range(days):
 def calculate_percentage(value, total):
     """Calculate percentage with safe division"""
     return (value / total * 100) if total > 0 else 0
+
+class PrefixIndex:
+    """Case-insensitive prefix search over names and the words in them"""
+    def __init__(self, names=()):
+        # Sorted (lowercased word or name, name)
+        self.keys = sorted((key, name) for name in names for key in self.words(name))
+
+    @staticmethod
+    def words(name):
+        lowered = name.lower()
+        return {lowered, *lowered.split()}
+
+    def add(self, name):
+        for key in self.words(name):
+            bisect.insort(self.keys, (key, name))
+
+    def search(self, prefix):
+        """Names with a word (or the whole name) starting with prefix, sorted"""
+        prefix = prefix.lower().strip()
+        start = bisect.bisect_left(self.keys, (prefix, ""))
+        matches = set()
+        for key, name in self.keys[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.add(name)
+        return sorted(matches, key=str.lower)